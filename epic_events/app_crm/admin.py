@@ -1,6 +1,6 @@
 # app_crm/admin.py
 # created 08/03/2022 at 09:07 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 22/03/2022 at 10:39 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:53 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/admin.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.5"
+__version__ = "0.2.6"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -20,20 +20,78 @@ __status__ = "Development"
 # third party imports
 
 # django imports
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 
 # local application imports
+from .forms import CRMImportForm
 from .models import (
     Customer,
     Contract,
-    Event
+    Event,
+    ImportCheckpoint
 )
 
 # other imports & constants
+# rejected rows listed on the import page
+MAX_ERRORS = 100
+
+
+class ImportAdminMixin:
+    """
+    "Import" button of the changelist, merging an uploaded CSV or NDJSON
+    file into the table (see app_crm.importing).
+    """
+    change_list_template = 'admin/app_crm/change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path('import/', self.admin_site.admin_view(self.import_rows),
+                 name=f'{opts.app_label}_{opts.model_name}_import'),
+            *super().get_urls(),
+        ]
+
+    def import_rows(self, request):
+        """ Merge an uploaded file, the rejected rows are listed """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = CRMImportForm(self.model, request.POST or None,
+                             request.FILES or None)
+        errors, rejected = [], 0
+        opts = self.model._meta
+        if request.method == 'POST' and form.is_valid():
+            try:
+                checkpoint, errors = form.save()
+            except UnicodeDecodeError:
+                form.add_error('file', "The file is not UTF-8.")
+            else:
+                rejected = checkpoint.rejected
+                self.message_user(
+                    request, f"{checkpoint.merged} "
+                             f"{opts.verbose_name_plural} merged, "
+                             f"{checkpoint.rejected} rows rejected.",
+                    messages.SUCCESS)
+                if not errors:
+                    return redirect(f'admin:{opts.app_label}_'
+                                    f'{opts.model_name}_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f"Import {opts.verbose_name_plural}",
+            'opts': opts,
+            'form': form,
+            'errors': errors[:MAX_ERRORS],
+            'hidden_errors': max(0, rejected - MAX_ERRORS),
+        }
+        return TemplateResponse(request, 'admin/app_crm/import.html',
+                                context)
 
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(ImportAdminMixin, admin.ModelAdmin):
     fieldsets = (
         ("Prospect/Customer informations",
          {'fields': ('first_name', 'last_name', 'email',
@@ -68,7 +126,7 @@ class CustomerAdmin(admin.ModelAdmin):
 
 
 @admin.register(Contract)
-class ContractAdmin(admin.ModelAdmin):
+class ContractAdmin(ImportAdminMixin, admin.ModelAdmin):
     fieldsets = (
         ("Contract informations",
          {'fields': ('customer', 'amount', 'payment_due_date')}),
@@ -100,7 +158,7 @@ class ContractAdmin(admin.ModelAdmin):
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(ImportAdminMixin, admin.ModelAdmin):
     fieldsets = (
         ("Event informations",
          {'fields': ('event_name', 'event_date', 'attendees')}),
@@ -128,3 +186,10 @@ class EventAdmin(admin.ModelAdmin):
     @staticmethod
     def customer_last_name(obj):
         return obj.contract.customer.last_name
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('key', 'rows', 'merged', 'rejected', 'finished',
+                    'date_updated')
+    readonly_fields = ('date_created', 'date_updated')
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class AppCrmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_crm'
+
+    def ready(self):
+        # keeps the VisibleObject table in sync with the saves and deletes
+        from . import visibility  # noqa: F401
+        # keeps the KPI summary tables in sync with the saves and deletes
+        from . import kpi  # noqa: F401
+        # creates the full-text search indexes after migrate
+        from . import search  # noqa: F401
+        # times the SQL queries of the requests for Server-Timing
+        from . import timing  # noqa: F401
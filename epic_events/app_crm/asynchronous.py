@@ -0,0 +1,206 @@
+# app_crm/asynchronous.py
+# created 18/10/2026 at 23:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 20:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/asynchronous.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# third party imports
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+
+# django imports
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+from django.utils.decorators import sync_and_async_middleware
+
+# local application imports
+from epic_events.streaming import AsyncStreamingResponse
+
+# other imports & constants
+URLCONF = getattr(settings, 'ASGI_URLCONF', None)
+# threads running the reads, each with its database connection
+READ_THREADS = getattr(settings, 'ASGI_READ_THREADS', 10)
+# viewset actions served by async views
+READ_ACTIONS = ('list', 'retrieve')
+STREAM_ACTIONS = ('export',)
+# parts of a stream waiting for the event loop
+STREAM_BUFFER = 2
+# end of the parts of a stream
+END = object()
+
+
+@functools.lru_cache(maxsize=None)
+def read_executor():
+    """ The pool of READ_THREADS threads of the reads, one per process """
+    return ThreadPoolExecutor(max_workers=READ_THREADS,
+                              thread_name_prefix='asgi-read')
+
+
+def read(view, request, args, kwargs):
+    """
+    Run the viewset `view` and render its response. Called in a thread
+    of read_executor, whose database connection is checked and closed as
+    a WSGI worker does around a request.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+async def stream_parts(response):
+    """
+    The parts of the streaming `response`, iterated by a single task of
+    read_executor (the transaction and the cursor of an export are bound
+    to the database connection of its thread) and handed over to the
+    event loop STREAM_BUFFER at most at a time: the memory used does not
+    grow with the export. The task stops when the parts are no longer
+    read, e.g. once the client is gone.
+    """
+    loop = asyncio.get_running_loop()
+    parts = asyncio.Queue(STREAM_BUFFER)
+    stopped = threading.Event()
+
+    def put(part):
+        asyncio.run_coroutine_threadsafe(parts.put(part), loop).result()
+
+    def produce():
+        close_old_connections()
+        try:
+            for part in response:
+                put(part)
+                if stopped.is_set():
+                    return
+            put(END)
+        except Exception as error:
+            if not stopped.is_set():
+                put(error)
+        finally:
+            response.close()
+            close_old_connections()
+
+    producing = loop.run_in_executor(
+        read_executor(), contextvars.copy_context().run, produce)
+    try:
+        while True:
+            part = await parts.get()
+            if part is END:
+                return
+            if isinstance(part, Exception):
+                raise part
+            yield part
+    finally:
+        # at most one more part is put once the queue is emptied
+        stopped.set()
+        while not parts.empty():
+            parts.get_nowait()
+        await producing
+
+
+def async_reads(view):
+    """
+    Async version of a viewset `view`, for the ASGI server.
+
+    Django 4.0 has no async ORM and DRF no async views, and the JWT
+    authentication may query the database (revocations, user states):
+    the reads run the whole DRF view (authentication, permissions,
+    scoped queries, rendering) on read_executor, off the event loop. A
+    slow query holds one of its READ_THREADS threads, and at most as
+    many database connections are opened. The writes run in the thread
+    of the request, as sync views do under ASGI.
+    """
+    run_write = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            # with the contextvars of the request (timer, replica...)
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                read_executor(), context.run, read, view, request, args,
+                kwargs)
+        return await run_write(request, *args, **kwargs)
+    return async_view
+
+
+def async_streams(view):
+    """
+    Async version of a viewset `view` streaming its response, for the
+    ASGI server: the view runs as a read (see async_reads), and its
+    streaming response is sent by the event loop as an
+    AsyncStreamingResponse of stream_parts.
+    """
+    run_view = async_reads(view)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        response = await run_view(request, *args, **kwargs)
+        if not response.streaming:
+            return response
+        streamed = AsyncStreamingResponse(stream_parts(response),
+                                          status=response.status_code)
+        for header, value in response.items():
+            streamed[header] = value
+        return streamed
+    return async_view
+
+
+def read_path(urlpatterns):
+    """
+    `urlpatterns` with the list and retrieve routes made async, and the
+    export ones streamed by the event loop
+    """
+    patterns = []
+    for pattern in urlpatterns:
+        action = getattr(pattern.callback, 'actions', {}).get('get')
+        if action in READ_ACTIONS:
+            callback = async_reads(pattern.callback)
+        elif action in STREAM_ACTIONS:
+            callback = async_streams(pattern.callback)
+        else:
+            callback = None
+        if callback is not None:
+            pattern = URLPattern(pattern.pattern, callback,
+                                 pattern.default_args, pattern.name)
+        patterns.append(pattern)
+    return patterns
+
+
+@sync_and_async_middleware
+def asgi_urlconf(get_response):
+    """
+    Resolve the requests of the ASGI server with the ASGI_URLCONF
+    setting, whose CRM reads are async (see read_path). The middleware
+    before it support async requests, so it is only called with an
+    async get_response under ASGI: the WSGI requests keep ROOT_URLCONF.
+    """
+    if not asyncio.iscoroutinefunction(get_response) or URLCONF is None:
+        return get_response
+
+    async def middleware(request):
+        request.urlconf = URLCONF
+        return await get_response(request)
+    return middleware
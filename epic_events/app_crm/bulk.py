@@ -0,0 +1,319 @@
+# app_crm/bulk.py
+# created 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/bulk.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.2"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+from rest_framework import exceptions, serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+# django imports
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import router, transaction
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+# local application imports
+from . import kpi, visibility
+
+# other imports & constants
+MAX_ITEMS = getattr(settings, 'BULK_CREATE_MAX_ITEMS', 5000)
+BATCH_SIZE = 1000
+
+
+def as_pk(value):
+    """ The integer primary key `value` stands for, or None """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def preload(fields, items):
+    """
+    Load the objects the PreloadedPrimaryKeyRelatedField of `fields`
+    refer to in `items`, with one query per field.
+    """
+    preloaded = {}
+    for name, field in fields.items():
+        if (not isinstance(field, PreloadedPrimaryKeyRelatedField)
+                or field.read_only):
+            continue
+        pks = {as_pk(item.get(name)) for item in items
+               if isinstance(item, dict)} - {None}
+        preloaded[name] = field.get_queryset().in_bulk(pks)
+    return preloaded
+
+
+def apply_changes(instance, attrs):
+    """
+    Set `attrs` on `instance` and send pre_save, whose receivers can
+    change fields too (check_sales_contact).
+    Return the {attname: value} of the columns whose value changed.
+    """
+    before = {field.attname: getattr(instance, field.attname)
+              for field in instance._meta.concrete_fields}
+    for name, value in attrs.items():
+        setattr(instance, name, value)
+    pre_save.send(sender=type(instance), instance=instance, raw=False,
+                  using=instance._state.db, update_fields=None)
+    return {attname: getattr(instance, attname)
+            for attname, value in before.items()
+            if getattr(instance, attname) != value}
+
+
+def save_changes(instance, changes):
+    """
+    Write the `changes` of apply_changes, as save(update_fields) does,
+    but without sending pre_save a second time: apply_changes sent it.
+    """
+    model = type(instance)
+    using = router.db_for_write(model, instance=instance)
+    instance.date_updated = timezone.now()
+    with transaction.atomic(using=using, savepoint=False):
+        model._base_manager.using(using).filter(pk=instance.pk).update(
+            **changes, date_updated=instance.date_updated)
+        post_save.send(sender=model, instance=instance, created=False,
+                       update_fields=frozenset([*changes, 'date_updated']),
+                       raw=False, using=using)
+    instance._state.db = using
+
+
+def bulk_update(updates):
+    """
+    Apply the (instance, attrs) `updates`, skipping the instances left
+    unchanged. The instances with the same changes are updated with one
+    UPDATE ... WHERE id IN (...), and the grants of the ones whose scope
+    changed are refreshed (see app_crm.visibility.updated).
+    Updates do not send post_save: the rows whose summary fields change
+    are subtracted from the KPI summaries before the updates and added
+    after them (see app_crm.kpi).
+    """
+    groups, summarized = {}, {}
+    for instance, attrs in updates:
+        changes = apply_changes(instance, attrs)
+        if changes:
+            groups.setdefault(tuple(sorted(changes.items())), []).append(
+                instance)
+        if changes.keys() & set(instance.summary_fields):
+            # the contracts of a customer follow its sales contact
+            key = (type(instance), 'sales_contact_id_id' in changes)
+            summarized.setdefault(key, []).append(instance)
+    for (model, contracts), instances in summarized.items():
+        kpi.subtract(model, [instance.pk for instance in instances],
+                     contracts)
+    now = timezone.now()
+    for changes, instances in groups.items():
+        model = type(instances[0])
+        model.objects.filter(pk__in=[instance.pk for instance in instances]
+                             ).update(**dict(changes), date_updated=now)
+        for instance in instances:
+            instance.date_updated = now
+    for (model, contracts), instances in summarized.items():
+        kpi.add(model, [instance.pk for instance in instances], contracts)
+        for instance in instances:
+            instance._loaded_summary = instance.summary_values()
+    for model in {type(instance) for instance, _ in updates}:
+        visibility.updated(model, [instance for instance, _ in updates
+                                   if type(instance) is model])
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField reading the related objects loaded for every
+    item of a bulk request at once (see preload), from the `preloaded`
+    entry of the context, instead of running one query per item.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {})
+        if self.field_name not in preloaded:
+            return super().to_internal_value(data)
+        instance = preloaded[self.field_name].get(as_pk(data))
+        if instance is None:
+            if as_pk(data) is None:
+                self.fail('incorrect_type', data_type=type(data).__name__)
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+class ChangedFieldsUpdateMixin:
+    """
+    ModelSerializer.update writing the changed columns only (see
+    save_changes), and nothing when no column changed: date_updated is
+    left as is.
+    """
+
+    def update(self, instance, validated_data):
+        changes = apply_changes(instance, validated_data)
+        if changes:
+            save_changes(instance, changes)
+        return instance
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    List serializer creating its items with bulk_create.
+
+    The related objects of every item are loaded with one query per
+    foreign key before the items are validated. bulk_create does not
+    send the model signals: pre_save is sent for every object, as
+    check_sales_contact sets the sales contact of the customers, the
+    grants on the new objects are inserted with one query
+    (see app_crm.visibility.created) and the objects are added to the KPI
+    summaries with another one (see app_crm.kpi.add).
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and (self.max_length is None or
+                                       len(data) <= self.max_length):
+            self.context['preloaded'] = preload(self.child.fields, data)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        using = router.db_for_write(model)
+        instances = [model(**attrs) for attrs in validated_data]
+        for instance in instances:
+            pre_save.send(sender=model, instance=instance, raw=False,
+                          using=using, update_fields=None)
+        model.objects.bulk_create(instances, batch_size=BATCH_SIZE)
+        visibility.created(model, [instance.pk for instance in instances])
+        kpi.add(model, [instance.pk for instance in instances])
+        return instances
+
+
+class BulkCreateMixin:
+    """
+    `bulk_create` action of the CRM viewsets: create up to MAX_ITEMS
+    objects posted as a list, in one transaction.
+
+    The fields of every item are validated first, then the items are
+    checked against the business rules of `create_errors` all at once.
+    When any item is invalid, nothing is created and the
+    answer is a 400 with the errors of each item, in order ({} for the
+    valid ones).
+    """
+
+    def create_errors(self, items):
+        """
+        Business rules of the creation: for each validated item, return a
+        dict of error messages by field, empty when the item is valid.
+        """
+        return [{} for _ in items]
+
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True,
+                                         allow_empty=False,
+                                         max_length=MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        errors = self.create_errors(serializer.validated_data)
+        if any(errors):
+            raise ValidationError(
+                [{field: [message] for field, message in error.items()}
+                 for error in errors])
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+
+class BulkUpdateMixin:
+    """
+    `bulk_update` action of the CRM viewsets: partial update of up to
+    MAX_ITEMS objects posted as a list of {"id": <id>, <fields>...},
+    in one transaction.
+
+    The objects are loaded with one query, in the scope of the user, and
+    go through the object permissions, the validation of a PATCH and the
+    business rules of `update_errors`. When any item is invalid, nothing
+    is updated and the answer is a 400 with the errors of each item, in
+    order ({} for the valid ones). Otherwise the changes are written with
+    bulk_update.
+    """
+
+    def update_errors(self, instance, attrs):
+        """
+        Business rules of the update of `instance` with the validated
+        `attrs`: a dict of error messages by field, empty when valid.
+        """
+        return {}
+
+    def bulk_update_item(self, request, item, instance, seen, context):
+        """ Return the validated attrs of `item`, or its errors """
+        if instance is None:
+            return None, {'id': ["Not found."]}
+        if instance.pk in seen:
+            return None, {'id': ["Duplicate id."]}
+        seen.add(instance.pk)
+        try:
+            self.check_object_permissions(request, instance)
+        except (PermissionDenied, exceptions.PermissionDenied) as error:
+            message = (str(error) or
+                       exceptions.PermissionDenied.default_detail)
+            return None, {'detail': [message]}
+        data = {key: value for key, value in item.items() if key != 'id'}
+        serializer = self.get_serializer_class()(
+            instance, data=data, partial=True, context=context)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        errors = self.update_errors(instance, serializer.validated_data)
+        if errors:
+            return None, {field: [message]
+                          for field, message in errors.items()}
+        return serializer.validated_data, {}
+
+    def bulk_update(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': [
+                "Expected a non empty list of items."]})
+        if len(items) > MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f"Ensure this field has no more than {MAX_ITEMS} "
+                f"elements."]})
+        ids = [as_pk(item.get('id')) if isinstance(item, dict) else None
+               for item in items]
+        instances = self.get_queryset().in_bulk(set(ids) - {None})
+        context = self.get_serializer_context()
+        context['preloaded'] = preload(self.get_serializer().fields, items)
+
+        updates, errors, seen = [], [], set()
+        for pk, item in zip(ids, items):
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ["Expected an object."]})
+                continue
+            attrs, error = self.bulk_update_item(
+                request, item, instances.get(pk), seen, context)
+            errors.append(error)
+            if not error:
+                updates.append((instances[pk], attrs))
+        if any(errors):
+            raise ValidationError(errors)
+        with transaction.atomic():
+            self.perform_bulk_update(updates)
+        return Response(self.get_serializer(
+            [instance for instance, _ in updates], many=True).data)
+
+    def perform_bulk_update(self, updates):
+        bulk_update(updates)
@@ -0,0 +1,105 @@
+# app_crm/conditional.py
+# created 19/10/2026 at 17:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 17:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/conditional.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import hashlib
+
+# third party imports
+from rest_framework.response import Response
+
+# django imports
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# local application imports
+
+# other imports & constants
+
+
+def make_etag(request, rows, links=()):
+    """
+    Strong ETag of the (id, date_updated) pairs of `rows` and the page
+    `links`, for the user, the URL and the format of the request.
+    """
+    digest = hashlib.md5(
+        f'{request.user.pk}:{request.get_full_path()}:'
+        f'{request.accepted_renderer.format}:{links}'.encode())
+    for pk, date_updated in rows:
+        digest.update(f'|{pk}:{date_updated.isoformat()}'.encode())
+    return quote_etag(digest.hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified headers for the retrieve and list views of the
+    CRM viewsets, and 304 answers to If-None-Match before serializing.
+
+    Every save updates `date_updated`, so the id and date_updated of the
+    rows sent identify the response. A list ETag covers the rows and the
+    links of the page only, read by the page query the list runs anyway:
+    a poll costs no other query, and no COUNT(*) of the whole scope is
+    needed to notice deleted rows. Last-Modified is not checked on lists
+    (If-Modified-Since), a deletion does not change it.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        response = self.not_modified(request, [instance],
+                                     check_last_modified=True)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self.patch_validators(response)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        links = ()
+        if page is not None:
+            links = (self.paginator.get_next_link(),
+                     self.paginator.get_previous_link())
+        response = self.not_modified(request, rows, links)
+        if response is None:
+            data = self.get_serializer(rows, many=True).data
+            response = (Response(data) if page is None
+                        else self.get_paginated_response(data))
+        return self.patch_validators(response)
+
+    def not_modified(self, request, rows, links=(),
+                     check_last_modified=False):
+        """
+        Compute the validators of `rows`, return the 304 (or 412) answer
+        to the conditional headers of the request, or None.
+        """
+        self.etag = make_etag(
+            request, [(row.pk, row.date_updated) for row in rows], links)
+        self.last_modified = max(
+            (row.date_updated for row in rows), default=None)
+        timestamp = None
+        if check_last_modified and self.last_modified is not None:
+            timestamp = self.last_modified.timestamp()
+        return get_conditional_response(request, etag=self.etag,
+                                        last_modified=timestamp)
+
+    def patch_validators(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(
+                self.last_modified.timestamp())
+        # every user sees their own scope
+        patch_vary_headers(response, ['Accept', 'Authorization'])
+        return response
@@ -0,0 +1,165 @@
+# app_crm/export.py
+# created 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/export.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import csv
+from contextlib import contextmanager
+
+# third party imports
+from rest_framework.renderers import JSONRenderer
+
+# django imports
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.http import StreamingHttpResponse
+
+# local application imports
+
+# other imports & constants
+CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+# lines joined in a single chunk of the response
+BLOCK_LINES = 500
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Negotiates the NDJSON exports, which are streamed without renderer.
+    Other responses of an export (errors) are rendered as JSON.
+    """
+    media_type = CONTENT_TYPES['ndjson']
+    format = 'ndjson'
+
+
+class CSVRenderer(JSONRenderer):
+    """
+    Negotiates the CSV exports, which are streamed without renderer.
+    Other responses of an export (errors) are rendered as JSON.
+    """
+    media_type = CONTENT_TYPES['csv']
+    format = 'csv'
+
+
+class Echo:
+    """ File-like object returning what is written, for csv.writer """
+
+    def write(self, value):
+        return value
+
+
+def export_fields(model):
+    """ Columns of an export: the concrete fields, as named by the API """
+    return [field.name for field in model._meta.concrete_fields]
+
+
+def ndjson_lines(rows, fields):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row])
+
+
+LINES = {
+    'ndjson': ndjson_lines,
+    'csv': csv_lines,
+}
+
+
+def blocks(lines, size=BLOCK_LINES):
+    """ Join `lines` in blocks of `size` lines """
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) == size:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+@contextmanager
+def snapshot(using):
+    """
+    Transaction reading a consistent snapshot of the database.
+
+    On PostgreSQL the transaction is REPEATABLE READ and READ ONLY when
+    it is not nested in another one. A SQLite read transaction sees a
+    single snapshot already.
+    """
+    outermost = transaction.get_autocommit(using)
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL '
+                               'REPEATABLE READ, READ ONLY')
+        yield
+
+
+def stream(queryset, file_format, chunk_size=CHUNK_SIZE):
+    """
+    Yield the rows of `queryset` in `file_format` ('ndjson' or 'csv'),
+    by blocks of lines.
+
+    The rows are read as tuples by chunks of `chunk_size`, from a
+    server-side cursor on PostgreSQL, in a snapshot transaction: the
+    memory used does not depend on the number of rows.
+    """
+    fields = export_fields(queryset.model)
+    with snapshot(queryset.db):
+        rows = queryset.order_by('pk').values_list(*fields).iterator(
+            chunk_size=chunk_size)
+        yield from blocks(LINES[file_format](rows, fields))
+
+
+class ExportMixin:
+    """
+    `export` action of the CRM viewsets: stream every object of the
+    scope of the user, filtered as the list is, in NDJSON (default) or
+    CSV, chosen with ?format= or the Accept header.
+    """
+
+    def get_renderers(self):
+        if self.action == 'export':
+            return [NDJSONRenderer(), CSVRenderer()]
+        return super().get_renderers()
+
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # the rows are read once the view returned, from the database
+        # of the request (see ReplicaReadMixin)
+        queryset = queryset.using(queryset.db)
+        file_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(stream(queryset, file_format),
+                                         content_type=CONTENT_TYPES[
+                                             file_format])
+        name = queryset.model._meta.verbose_name_plural
+        response['Content-Disposition'] = (f'attachment; '
+                                           f'filename="{name}.{file_format}"')
+        return response
@@ -0,0 +1,76 @@
+# app_crm/forms.py
+# created 18/10/2026 at 21:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/forms.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+
+# third party imports
+
+# django imports
+from django import forms
+
+# local application imports
+from app_users import provisioning
+from . import importing
+
+# other imports & constants
+
+
+class CRMImportForm(forms.Form):
+    """
+    Upload of a CSV or NDJSON file of customers, contracts or events for
+    the admin website (see importing.import_rows).
+    """
+    file = forms.FileField(
+        help_text="CSV with a header line, or NDJSON, with the fields of "
+                  "the API. Rows with an existing id update the object.")
+    format = forms.ChoiceField(
+        required=False,
+        choices=[('', "From the file extension"),
+                 ('csv', "CSV"), ('ndjson', "NDJSON")])
+
+    def __init__(self, model, *args, **kwargs):
+        self.model = model
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload is not None and not cleaned_data.get('format'):
+            cleaned_data['format'] = provisioning.guess_format(upload.name)
+            if cleaned_data['format'] is None:
+                self.add_error('format', "Unknown file extension, choose "
+                                         "the format.")
+        return cleaned_data
+
+    def save(self):
+        """
+        Import the file, return the checkpoint and the errors. Uploading
+        the same file again resumes an interrupted import, the checkpoint
+        of a finished one is deleted.
+        """
+        upload = self.cleaned_data['file']
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig',
+                                  newline='')
+        key = (f'{self.model._meta.db_table}:upload:{upload.name}:'
+               f'{upload.size}')
+        checkpoint, errors = importing.import_rows(
+            self.model,
+            provisioning.read_rows(stream, self.cleaned_data['format']),
+            key=key)
+        checkpoint.delete()
+        return checkpoint, errors
@@ -0,0 +1,334 @@
+# app_crm/importing.py
+# created 18/10/2026 at 21:00 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 20:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/importing.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+from itertools import islice
+
+# third party imports
+from rest_framework.exceptions import ValidationError
+
+# django imports
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+# local application imports
+from app_users.models import User
+from . import kpi, rules, visibility
+from .bulk import as_pk, preload
+from .models import Customer, Contract, Event, ImportCheckpoint
+from .serializers import (
+    CustomerSerializer,
+    ContractSerializer,
+    EventSerializer
+)
+
+# other imports & constants
+CHUNK_SIZE = getattr(settings, 'IMPORT_CHUNK_SIZE', 5000)
+# rejected rows kept in the report, the others are only counted
+MAX_ERRORS = 1000
+TABLES = {
+    'customers': Customer,
+    'contracts': Contract,
+    'events': Event,
+}
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+SERIALIZERS = {
+    Customer: CustomerSerializer,
+    Contract: ContractSerializer,
+    Event: EventSerializer,
+}
+
+
+def staged_fields(model):
+    """ Columns loaded from a file: the id and the editable fields """
+    return [field for field in model._meta.concrete_fields
+            if field.primary_key or field.editable]
+
+
+def validate(model, rows, first, connection):
+    """
+    Validate a chunk of `rows` (dicts, numbered from `first`) with the
+    serializer of the API, the related objects loaded with one query per
+    foreign key, then with the business rules of the API (see
+    app_crm.rules), the existing objects loaded with one query. The id
+    of a row is optional, an existing id updates the object.
+    Return the staged values of the valid rows and the errors, a list of
+    {'row': <number>, 'errors': <serializer errors>}.
+    """
+    context = {}
+    serializer = SERIALIZERS[model](context=context)
+    context['preloaded'] = preload(serializer.fields,
+                                   [row for row in rows if row is not None])
+    nullable = {name for name, field in serializer.fields.items()
+                if field.allow_null}
+    fields = staged_fields(model)[1:]
+    validated, errors, ids = [], [], set()
+    for number, row in enumerate(rows, first):
+        if row is None:
+            errors.append({'row': number, 'errors': {
+                'non_field_errors': ["Invalid JSON object."]}})
+            continue
+        # empty CSV cells are null
+        row = {key: None if value == '' and key in nullable else value
+               for key, value in row.items()}
+        pk = as_pk(row.get('id'))
+        if row.get('id') not in (None, '') and pk is None:
+            errors.append({'row': number, 'errors': {
+                'id': ["A valid integer is required."]}})
+            continue
+        if pk is not None and pk in ids:
+            errors.append({'row': number, 'errors': {
+                'id': ["Duplicate id in the chunk."]}})
+            continue
+        try:
+            attrs = serializer.run_validation(row)
+        except ValidationError as error:
+            errors.append({'row': number, 'errors': error.detail})
+            continue
+        if pk is not None:
+            ids.add(pk)
+        # a row sets every column: the missing ones take their default
+        validated.append((number, pk, {
+            field.name: attrs.get(field.name, field.get_default())
+            for field in fields}))
+
+    existing = model._base_manager.using(connection.alias).in_bulk(ids)
+    created = [item for item in validated if item[1] not in existing]
+    rule_errors = dict(zip(
+        [number for number, _, _ in created],
+        rules.create_errors(model, [attrs for _, _, attrs in created])))
+    for number, pk, attrs in validated:
+        if pk in existing:
+            rule_errors[number] = rules.update_errors(model, existing[pk],
+                                                      attrs)
+
+    valid = []
+    for number, pk, attrs in validated:
+        if rule_errors[number]:
+            errors.append({'row': number, 'errors': {
+                field: [message]
+                for field, message in rule_errors[number].items()}})
+            continue
+        values = [pk]
+        for field in fields:
+            value = attrs[field.name]
+            values.append(field.get_db_prep_save(
+                getattr(value, 'pk', value), connection))
+        valid.append(values)
+    errors.sort(key=lambda error: error['row'])
+    return valid, errors
+
+
+def copy_text(value):
+    """ `value` as a field of the text format of COPY """
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
+
+
+class Stager:
+    """
+    Temporary table with the staged columns of `model`, emptied and
+    loaded for every chunk: with COPY on PostgreSQL, with a batch of
+    INSERT elsewhere.
+    """
+
+    def __init__(self, model, connection):
+        self.model = model
+        self.connection = connection
+        quote = connection.ops.quote_name
+        self.table = quote(f'import_{model._meta.db_table}')
+        self.columns = [field.column for field in staged_fields(model)]
+        self.quoted_columns = ', '.join(quote(column)
+                                        for column in self.columns)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE IF NOT EXISTS {self.table} AS '
+                f'SELECT {self.quoted_columns} '
+                f'FROM {quote(model._meta.db_table)} WHERE 1 = 0')
+
+    def load(self, rows):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            if self.connection.vendor != 'postgresql':
+                placeholders = ', '.join(['%s'] * len(self.columns))
+                cursor.executemany(
+                    f'INSERT INTO {self.table} ({self.quoted_columns}) '
+                    f'VALUES ({placeholders})', rows)
+                return
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write('\t'.join(map(copy_text, row)) + '\n')
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY {self.table} ({self.quoted_columns}) FROM STDIN',
+                buffer)
+
+    def select_list(self):
+        """
+        Staged columns as inserted. The sales contact of a customer
+        follows check_sales_contact: kept for customers, unless it is a
+        management user, cleared for prospects.
+        """
+        quote = self.connection.ops.quote_name
+        select, join = [], ''
+        for column in self.columns:
+            expression = f's.{quote(column)}'
+            if column == 'id' and self.connection.vendor == 'postgresql':
+                expression = (f"COALESCE(s.id, nextval(pg_get_serial_"
+                              f"sequence('{self.model._meta.db_table}', "
+                              f"'id')))")
+            elif self.model is Customer and column == 'sales_contact_id_id':
+                join = (f'LEFT JOIN {quote(User._meta.db_table)} u '
+                        f'ON u.id = {expression}')
+                expression = (f"CASE WHEN s.is_customer AND "
+                              f"u.role <> 'management' THEN {expression} "
+                              f"END")
+            select.append(expression)
+        return ', '.join(select), join
+
+    def bump_sequence(self):
+        """
+        Move the id sequence of the table after the staged ids, so the
+        rows without an id do not take the id of another row.
+        """
+        if self.connection.vendor != 'postgresql':
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')",
+                           [self.model._meta.db_table])
+            sequence = cursor.fetchone()[0]
+            cursor.execute(
+                f'SELECT setval(%s, m) FROM (SELECT MAX(id) AS m '
+                f'FROM {self.table}) AS s '
+                f'WHERE m > (SELECT last_value FROM {sequence})',
+                [sequence])
+
+    def merge(self):
+        """
+        Insert the staged rows, or update the ones whose id exists, with
+        one INSERT ... SELECT ... ON CONFLICT statement.
+        Return the ids of the rows merged.
+        """
+        quote = self.connection.ops.quote_name
+        select, join = self.select_list()
+        updated = ', '.join(f'{quote(column)} = EXCLUDED.{quote(column)}'
+                            for column in [*self.columns[1:],
+                                           'date_updated'])
+        self.bump_sequence()
+        now = timezone.now()
+        with self.connection.cursor() as cursor:
+            # the rows with an id first: on SQLite, a null id takes the
+            # next id at the time the row is inserted
+            cursor.execute(
+                f'INSERT INTO {quote(self.model._meta.db_table)} '
+                f'({self.quoted_columns}, date_created, date_updated) '
+                f'SELECT {select}, %s, %s FROM {self.table} s {join} '
+                f'WHERE TRUE ORDER BY s.id IS NULL, s.id '
+                f'ON CONFLICT (id) DO UPDATE SET {updated} '
+                f'RETURNING id', [now, now])
+            return [row[0] for row in cursor.fetchall()]
+
+
+def moved_customers(model, valid, customer, using):
+    """
+    Customers of the staged contracts, `customer` being the index of
+    their customer in the staged values, and the customers the existing
+    ones are on before the merge. Empty for the other models.
+    """
+    if model is not Contract:
+        return set()
+    customer_ids = {values[customer] for values in valid}
+    customer_ids.update(Contract._base_manager.using(using).filter(
+        pk__in=[values[0] for values in valid if values[0] is not None]
+    ).values_list('customer_id', flat=True))
+    return customer_ids
+
+
+def refresh_grants(model, ids, customer_ids):
+    """
+    Refresh the grants on the merged objects, and for contracts on the
+    `customer_ids` they were moved from and to (see moved_customers).
+    """
+    if model is Customer:
+        visibility.refresh_customers(ids)
+    elif model is Contract:
+        visibility.refresh_customers(customer_ids)
+    else:
+        visibility.refresh_events(ids)
+
+
+def import_rows(model, rows, key=None, chunk_size=CHUNK_SIZE,
+                progress=None):
+    """
+    Merge `rows` (dicts as the API takes them, or None for an invalid
+    NDJSON line) into the table of `model`, by chunks of `chunk_size`.
+
+    Every chunk is validated (see validate), loaded into a staging table
+    and merged into the table with set-based SQL (see Stager), its
+    grants and KPI summaries refreshed and the checkpoint `key` saved, in
+    one transaction.
+    Given the same `key`, an interrupted import resumes after the last
+    chunk committed. `progress` is called with the checkpoint after
+    every chunk. The invalid rows are skipped.
+    Return the checkpoint and the first MAX_ERRORS errors.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if key is None:
+        checkpoint = ImportCheckpoint(key='')
+    else:
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(key=key)
+    rows = islice(iter(rows), checkpoint.rows, None)
+    staged_customer = (staged_fields(model).index(
+        Contract._meta.get_field('customer')) if model is Contract else None)
+    stager, errors = None, []
+    while not checkpoint.finished:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            checkpoint.finished = True
+        with transaction.atomic(using=using):
+            if chunk:
+                if stager is None:
+                    stager = Stager(model, connection)
+                valid, chunk_errors = validate(
+                    model, chunk, checkpoint.rows + 1, connection)
+                errors.extend(chunk_errors[:MAX_ERRORS - len(errors)])
+                ids = []
+                if valid:
+                    stager.load(valid)
+                    # read before the merge moves the contracts
+                    customer_ids = moved_customers(model, valid,
+                                                   staged_customer, using)
+                    # the rows updated leave the summaries with their
+                    # previous values and come back with the new ones
+                    kpi.subtract(model, [values[0] for values in valid
+                                         if values[0] is not None], True)
+                    ids = stager.merge()
+                    kpi.add(model, ids, True)
+                    refresh_grants(model, ids, customer_ids)
+                checkpoint.rows += len(chunk)
+                checkpoint.merged += len(ids)
+                checkpoint.rejected += len(chunk_errors)
+            if key is not None:
+                checkpoint.save()
+        if progress is not None:
+            progress(checkpoint)
+    return checkpoint, errors
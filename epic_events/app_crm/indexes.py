@@ -0,0 +1,58 @@
+# app_crm/indexes.py
+# created 18/10/2026 at 18:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 18:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/indexes.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.contrib.postgres.indexes import OpClass
+from django.db import models
+from django.db.models.functions import Upper
+
+# local application imports
+
+# other imports & constants
+
+
+class PrefixSearchIndex(models.Index):
+    """
+    Index serving the anchored search of SearchFilter ('^last_name').
+
+    The search runs `UPPER(column::text) LIKE UPPER('abc%')`, so the index
+    is built on UPPER(column). On PostgreSQL it uses the text_pattern_ops
+    operator class, without it a LIKE prefix can only use the index
+    with the "C" collation. Other databases get a plain expression index.
+    """
+
+    def __init__(self, *expressions, **kwargs):
+        expressions = tuple(
+            Upper(expression) if isinstance(expression, str) else expression
+            for expression in expressions
+        )
+        super().__init__(*expressions, **kwargs)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        index = self
+        if schema_editor.connection.vendor == 'postgresql':
+            index = self.clone()
+            index.expressions = tuple(
+                OpClass(expression, name='text_pattern_ops')
+                for expression in self.expressions
+            )
+        return super(PrefixSearchIndex, index).create_sql(
+            model, schema_editor, using=using, **kwargs)
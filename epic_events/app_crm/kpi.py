@@ -0,0 +1,340 @@
+# app_crm/kpi.py
+# created 18/10/2026 at 22:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 22:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/kpi.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from decimal import Decimal
+
+# third party imports
+
+# django imports
+from django.db import connections, router, transaction
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    DateField,
+    DecimalField,
+    Max,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+# local application imports
+from .models import (
+    Customer,
+    Contract,
+    Event,
+    EventSummary,
+    SalesSummary
+)
+
+# other imports & constants
+CHUNK_SIZE = 100000
+COLUMNS = {
+    SalesSummary: ('customers', 'prospects', 'signed_contracts',
+                   'signed_amount', 'unsigned_contracts', 'unsigned_amount'),
+    EventSummary: ('events', 'finished_events', 'attendees'),
+}
+KEYS = {
+    SalesSummary: 'sales_contact',
+    EventSummary: 'month',
+}
+AMOUNT = DecimalField(max_digits=16, decimal_places=2)
+
+
+def customer_rows(customers, sign=1):
+    """ SalesSummary rows of `customers`, times `sign` """
+    return customers.order_by().values(
+        key=Coalesce('sales_contact_id', 0, output_field=BigIntegerField()),
+    ).annotate(
+        customers=Count('pk', filter=Q(is_customer=True)) * sign,
+        prospects=Count('pk', filter=Q(is_customer=False)) * sign,
+        signed_contracts=Value(0),
+        signed_amount=Value(0),
+        unsigned_contracts=Value(0),
+        unsigned_amount=Value(0),
+    )
+
+
+def contract_rows(contracts, sign=1, key=None):
+    """
+    SalesSummary rows of `contracts`, times `sign`, for the sales contact
+    of their customer or for `key`.
+    """
+    if key is None:
+        key = Coalesce('customer__sales_contact_id', 0,
+                       output_field=BigIntegerField())
+    else:
+        key = Value(key, output_field=BigIntegerField())
+    amount = Value(Decimal(sign), output_field=AMOUNT)
+    signed, unsigned = Q(is_signed=True), Q(is_signed=False)
+    return contracts.order_by().values(key=key).annotate(
+        customers=Value(0),
+        prospects=Value(0),
+        signed_contracts=Count('pk', filter=signed) * sign,
+        signed_amount=Sum('amount', filter=signed, default=0) * amount,
+        unsigned_contracts=Count('pk', filter=unsigned) * sign,
+        unsigned_amount=Sum('amount', filter=unsigned, default=0) * amount,
+    )
+
+
+def event_rows(events, sign=1):
+    """ EventSummary rows of `events`, times `sign` """
+    return events.order_by().values(
+        key=TruncMonth('event_date', output_field=DateField()),
+    ).annotate(
+        events=Count('pk') * sign,
+        finished_events=Count('pk', filter=Q(is_finished=True)) * sign,
+        attendees=Sum('attendees', default=0) * sign,
+    )
+
+
+def upsert(summary, sql, params):
+    """
+    Add the (key, *columns) rows of the `sql` query to the summary table,
+    inserting the missing keys, with one INSERT ... ON CONFLICT.
+    """
+    connection = connections[router.db_for_write(summary)]
+    quote = connection.ops.quote_name
+    table = quote(summary._meta.db_table)
+    key = quote(KEYS[summary])
+    columns = [quote(column) for column in COLUMNS[summary]]
+    updated = ', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}'
+                        for column in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({key}, {", ".join(columns)}) {sql} '
+            f'ON CONFLICT ({key}) DO UPDATE SET {updated}', params)
+
+
+def upsert_rows(summary, queryset):
+    """ Add the rows of a *_rows() queryset to the summary table """
+    if not queryset.query.is_empty():
+        upsert(summary, *queryset.query.sql_with_params())
+
+
+def upsert_values(summary, rows):
+    """ Add the {key: [column values]} `rows` to the summary table """
+    rows = {key: values for key, values in rows.items() if any(values)}
+    if not rows:
+        return
+    placeholders = ', '.join(['%s'] * (len(COLUMNS[summary]) + 1))
+    upsert(summary, 'VALUES ' + ', '.join([f'({placeholders})'] * len(rows)),
+           [value for key, values in rows.items()
+            for value in (key, *values)])
+
+
+def apply(model, objects, sign, contracts=False):
+    """
+    Add the rows of `objects`, a queryset of `model`, times `sign` to the
+    summary tables, with the contracts of the customers when `contracts`
+    is set. Subtract the rows before a set-based update, add them after.
+    """
+    if model is Event:
+        upsert_rows(EventSummary, event_rows(objects, sign))
+        return
+    if model is Customer:
+        upsert_rows(SalesSummary, customer_rows(objects, sign))
+        if not contracts:
+            return
+        objects = Contract.objects.filter(customer__in=objects.values('pk'))
+    upsert_rows(SalesSummary, contract_rows(objects, sign))
+
+
+def add(model, object_ids, contracts=False):
+    """ Add the objects to the summaries, e.g. after a bulk_create """
+    object_ids = list(object_ids)
+    if object_ids:
+        apply(model, model.objects.filter(pk__in=object_ids), 1, contracts)
+
+
+def subtract(model, object_ids, contracts=False):
+    """ Subtract the objects from the summaries, before they change """
+    object_ids = list(object_ids)
+    if object_ids:
+        apply(model, model.objects.filter(pk__in=object_ids), -1, contracts)
+
+
+def rebuild(chunk_size=CHUNK_SIZE, stdout=None):
+    """
+    Rebuild the summary tables from the CRM tables, walking every table
+    by ranges of ids.
+    """
+    with transaction.atomic():
+        SalesSummary.objects.all().delete()
+        EventSummary.objects.all().delete()
+        for model in (Customer, Contract, Event):
+            last_id = model.objects.aggregate(last=Max('pk'))['last'] or 0
+            for start in range(0, last_id + 1, chunk_size):
+                apply(model, model.objects.filter(
+                    pk__gte=start, pk__lt=start + chunk_size), 1)
+                if stdout is not None:
+                    stdout.write(f'{model._meta.verbose_name_plural} '
+                                 f'{min(start + chunk_size, last_id)}/'
+                                 f'{last_id}')
+    return SalesSummary.objects.count() + EventSummary.objects.count()
+
+
+def expected():
+    """ The rows of the summary tables computed from the CRM tables """
+    rows = {SalesSummary: {}, EventSummary: {}}
+    for summary, queryset in [
+            (SalesSummary, customer_rows(Customer.objects.all())),
+            (SalesSummary, contract_rows(Contract.objects.all())),
+            (EventSummary, event_rows(Event.objects.all()))]:
+        for row in queryset.values_list('key', *COLUMNS[summary]):
+            total = rows[summary].setdefault(row[0], [0] * (len(row) - 1))
+            for i, value in enumerate(row[1:]):
+                total[i] += value
+    return rows
+
+
+def verify():
+    """
+    Compare the summary tables with the CRM tables.
+    Return a list of (summary, key, expected, actual) for every row that
+    differs, the rows being lists of column values.
+    """
+    mismatches = []
+    for summary, rows in expected().items():
+        columns = COLUMNS[summary]
+        actual = {row[0]: list(row[1:]) for row in summary.objects.values_list(
+            KEYS[summary], *columns)}
+        zero = [0] * len(columns)
+        for key in rows.keys() | actual.keys():
+            if rows.get(key, zero) != actual.get(key, zero):
+                mismatches.append((summary.__name__, key,
+                                   rows.get(key, zero),
+                                   actual.get(key, zero)))
+    return mismatches
+
+
+def sales_values(model, values):
+    """ SalesSummary column values of a customer or a contract """
+    if model is Customer:
+        is_customer = values[1]
+        return [int(is_customer), int(not is_customer), 0, 0, 0, 0]
+    amount, is_signed = Decimal(values[1]), values[2]
+    if is_signed:
+        return [0, 0, 1, amount, 0, 0]
+    return [0, 0, 0, 0, 1, amount]
+
+
+def month(event_date):
+    """ The month of an event, as TruncMonth gives it """
+    if timezone.is_aware(event_date):
+        event_date = timezone.localtime(event_date)
+    return event_date.date().replace(day=1)
+
+
+def sales_contacts(instance, customer_ids):
+    """
+    The sales contact of the customers (0 for none), read from the
+    customer cached on the contract `instance` when it can be.
+    """
+    contacts = {}
+    if Contract.customer.is_cached(instance):
+        contacts[instance.customer.pk] = instance.customer.sales_contact_id_id
+    missing = set(customer_ids) - contacts.keys() - {None}
+    if missing:
+        contacts.update(Customer.objects.filter(pk__in=missing)
+                        .values_list('pk', 'sales_contact_id'))
+    return {pk: contacts.get(pk) or 0 for pk in customer_ids}
+
+
+def changed(sender, instance, sign):
+    """
+    Update the summaries by the difference between the values `instance`
+    was loaded with and its values: `sign` 1 after a save, -1 after a
+    delete. Nothing is written when no summary field changed.
+    """
+    previous = getattr(instance, '_loaded_summary', None)
+    if sign < 0 and not hasattr(instance, '_loaded_summary'):
+        previous = instance.summary_values()
+    current = instance.summary_values() if sign > 0 else None
+    instance._loaded_summary = current
+    if previous == current:
+        return
+    states = [(-1, previous), (1, current)]
+    if sender is Event:
+        rows = {}
+        for factor, values in states:
+            if values is not None:
+                total = rows.setdefault(month(values[0]), [0, 0, 0])
+                for i, value in enumerate(
+                        [1, int(values[2]), values[1]]):
+                    total[i] += factor * value
+        upsert_values(EventSummary, rows)
+        return
+    if sender is Customer:
+        keys = {values: values[0] or 0 for _, values in states if values}
+    else:
+        contacts = sales_contacts(instance, [values[0] for _, values in states
+                                             if values])
+        keys = {values: contacts[values[0]] for _, values in states if values}
+    rows = {}
+    for factor, values in states:
+        if values is not None:
+            total = rows.setdefault(keys[values], [0] * 6)
+            for i, value in enumerate(sales_values(sender, values)):
+                total[i] += factor * value
+    upsert_values(SalesSummary, rows)
+    if (sender is Customer and previous and current and
+            keys[previous] != keys[current]):
+        # the contracts follow their customer to its new sales contact
+        contracts = Contract.objects.filter(customer=instance.pk)
+        upsert_rows(SalesSummary,
+                    contract_rows(contracts, -1, key=keys[previous]))
+        upsert_rows(SalesSummary,
+                    contract_rows(contracts, 1, key=keys[current]))
+
+
+@receiver(pre_save, sender=Customer)
+@receiver(pre_save, sender=Contract)
+@receiver(pre_save, sender=Event)
+def remember_summary(sender, instance, **kwargs):
+    """
+    Load the values of the summary fields of an object saved over an
+    existing row without having been loaded from the database.
+    """
+    if instance.pk is None or hasattr(instance, '_loaded_summary'):
+        return
+    instance._loaded_summary = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(*sender.summary_fields).first())
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Contract)
+@receiver(post_save, sender=Event)
+def summary_saved(sender, instance, **kwargs):
+    changed(sender, instance, 1)
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Contract)
+@receiver(post_delete, sender=Event)
+def summary_deleted(sender, instance, **kwargs):
+    changed(sender, instance, -1)
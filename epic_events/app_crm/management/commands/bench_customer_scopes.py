@@ -0,0 +1,112 @@
+# app_crm/management/commands/bench_customer_scopes.py
+# created 18/10/2026 at 19:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 19:28 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/bench_customer_scopes.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import statistics
+import time
+from datetime import timedelta
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+# local application imports
+from app_crm.models import Customer, Contract
+from app_crm.seeding import seed_users
+from app_crm.visibility import insert, subtree_grants
+
+# other imports & constants
+PAGE = 51
+
+
+def timed(function, repeat):
+    """ Return the median duration of `function` in milliseconds """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the customer scopes while the number of contracts "
+            "per customer grows. Everything runs in a rolled back "
+            "transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--steps', type=int, nargs='+',
+                            default=[1, 10, 50, 100])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        support = seed_users('support', 1)[0]
+        sales = seed_users('sales', 1)[0]
+        customers = Customer.objects.bulk_create([
+            Customer(first_name='Bench', last_name=f'Customer{i}',
+                     email=f'bench{i}@epicevents.com', phone_number='0100',
+                     mobile='0600', company_name='Bench', is_customer=True,
+                     sales_contact_id=sales)
+            for i in range(options['customers'])
+        ])
+        if customers[0].pk is None:
+            customers = list(Customer.objects.filter(first_name='Bench'))
+        probe = customers[0].pk
+        due_date = timezone.now() + timedelta(days=30)
+        repeat = options['repeat']
+
+        self.stdout.write(
+            f'{"contracts/customer":>18} {"list (ms)":>10} '
+            f'{"detail (ms)":>12} {"join rows":>10} {"join list (ms)":>15} '
+            f'{"sales list (ms)":>16}')
+        contracts_per_customer = 0
+        for step in options['steps']:
+            Contract.objects.bulk_create([
+                Contract(project_name='Bench', amount=10,
+                         payment_due_date=due_date, is_signed=True,
+                         customer=customer, support_contact_id=support)
+                for customer in customers
+                for _ in range(step - contracts_per_customer)
+            ], batch_size=10000)
+            insert(subtree_grants(Customer.objects.filter(
+                first_name='Bench')))
+            contracts_per_customer = step
+
+            scope = Customer.objects.visible_to(support)
+            sales_scope = Customer.objects.visible_to(sales)
+            join = Customer.objects.filter(
+                contract__support_contact_id=support.id)
+            list_ms = timed(
+                lambda: list(scope.order_by('-id')[:PAGE]), repeat)
+            detail_ms = timed(
+                lambda: scope.filter(pk=probe).exists(), repeat)
+            join_ms = timed(
+                lambda: list(join.order_by('-id')[:PAGE]), repeat)
+            sales_ms = timed(
+                lambda: list(sales_scope.order_by('-id')[:PAGE]), repeat)
+            self.stdout.write(
+                f'{step:>18} {list_ms:>10.2f} {detail_ms:>12.2f} '
+                f'{join.count():>10} {join_ms:>15.2f} {sales_ms:>16.2f}')
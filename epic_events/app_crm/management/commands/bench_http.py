@@ -0,0 +1,161 @@
+# app_crm/management/commands/bench_http.py
+# created 18/10/2026 at 23:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 23:55 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/bench_http.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+# local application imports
+
+# other imports & constants
+
+
+def login(base_url, username, password):
+    """ The access token of the user, from the login endpoint """
+    request = Request(base_url + reverse('app_users:login'), json.dumps({
+        'username': username, 'password': password}).encode(),
+        {'Content-Type': 'application/json'})
+    with urlopen(request) as response:
+        return json.load(response)['access']
+
+
+async def fetch(reader, writer, request):
+    """
+    Send `request` on a keep-alive connection and read the response.
+    Return its status and whether the server keeps the connection open.
+    """
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by the server')
+    status = int(status_line.split()[1])
+    length, chunked, keep_alive = 0, False, True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding':
+            chunked = 'chunked' in value
+        elif name == 'connection':
+            keep_alive = value != 'close'
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(host, port, request, count, latencies, errors):
+    """ Send `count` requests one after the other, reconnecting if needed """
+    connection = None
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            status, keep_alive = await fetch(*connection, request)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors['connection'] = errors.get('connection', 0) + 1
+            connection = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors[status] = errors.get(status, 0) + 1
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(url, token, concurrency, requests):
+    """
+    `requests` GET of `url` over `concurrency` connections.
+    Return the duration, the latencies and the errors by status.
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    request = (f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+               f'Authorization: Bearer {token}\r\n'
+               f'Accept: application/json\r\n\r\n').encode()
+    latencies, errors = [], {}
+    counts = [requests // concurrency + (i < requests % concurrency)
+              for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(parts.hostname, parts.port or 80, request, count,
+               latencies, errors)
+        for count in counts if count])
+    return time.perf_counter() - start, latencies, errors
+
+
+class Command(BaseCommand):
+    help = ("Load a running server with concurrent keep-alive GET requests "
+            "of a CRM endpoint and report the requests per second and the "
+            "latency percentiles, to compare the WSGI and ASGI servers.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="e.g. "
+                            "http://127.0.0.1:8000/crm/customers/")
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=10000)
+        parser.add_argument('--warmup', type=int, default=500)
+
+    def handle(self, *args, **options):
+        url = options['url']
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise CommandError('Only http:// URLs are supported')
+        token = login(f'http://{parts.netloc}', options['username'],
+                      options['password'])
+        concurrency = options['concurrency']
+        if options['warmup']:
+            asyncio.run(load(url, token, min(concurrency, options['warmup']),
+                             options['warmup']))
+        duration, latencies, errors = asyncio.run(
+            load(url, token, concurrency, options['requests']))
+        if len(latencies) < 2:
+            raise CommandError(f'No response: {errors}')
+        centiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{len(latencies)} responses in {duration:.1f} s over '
+            f'{concurrency} connections: '
+            f'{len(latencies) / duration:.1f} req/s, '
+            f'p50 {centiles[49] * 1000:.0f} ms, '
+            f'p99 {centiles[98] * 1000:.0f} ms, '
+            f'errors {errors or 0}')
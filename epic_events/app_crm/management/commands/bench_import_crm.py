@@ -0,0 +1,95 @@
+# app_crm/management/commands/bench_import_crm.py
+# created 18/10/2026 at 21:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/bench_import_crm.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+import json
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# local application imports
+from app_crm import importing
+from app_crm.models import Customer
+from app_crm.seeding import seed_users
+from app_crm.serializers import CustomerSerializer
+from app_users.provisioning import read_rows
+
+# other imports & constants
+
+
+def ndjson(prefix, count, sales_id):
+    """ NDJSON file of `count` customers """
+    return io.StringIO(''.join(
+        json.dumps({'first_name': 'Bench', 'last_name': f'{prefix}{i}',
+                    'email': f'{prefix}{i}@epicevents.com',
+                    'phone_number': '0100', 'mobile': '0600',
+                    'company_name': 'Bench', 'is_customer': i % 2 == 0,
+                    'sales_contact_id': sales_id}) + '\n'
+        for i in range(count)))
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the import of customers against saving them one by "
+            "one through CustomerSerializer, which is timed on --sample "
+            "rows and extrapolated. Everything runs in a rolled back "
+            "transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+        parser.add_argument('--sample', type=int, default=1000)
+        parser.add_argument('--chunk-size', type=int, nargs='+',
+                            default=[importing.CHUNK_SIZE])
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def report(self, label, rows, seconds, count):
+        self.stdout.write(f'{label:>22} {rows:>8} {seconds:>10.2f} '
+                          f'{rows / seconds:>8.0f} '
+                          f'{seconds * count / rows:>14.1f}')
+
+    def run(self, options):
+        count = options['count']
+        sales = seed_users('sales', 1)[0]
+        self.stdout.write(f'{"method":>22} {"rows":>8} {"time (s)":>10} '
+                          f'{"rows/s":>8} {f"{count} rows (s)":>14}')
+
+        stream = ndjson('save', options['sample'], sales.pk)
+        start = time.perf_counter()
+        for row in read_rows(stream, 'ndjson'):
+            serializer = CustomerSerializer(data=row)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        self.report('serializer save()', options['sample'],
+                    time.perf_counter() - start, count)
+
+        for chunk_size in options['chunk_size']:
+            stream = ndjson(f'import{chunk_size}_', count, sales.pk)
+            start = time.perf_counter()
+            checkpoint, _ = importing.import_rows(
+                Customer, read_rows(stream, 'ndjson'),
+                chunk_size=chunk_size)
+            self.report(f'import, chunks of {chunk_size}',
+                        checkpoint.merged, time.perf_counter() - start,
+                        count)
@@ -0,0 +1,88 @@
+# app_crm/management/commands/bench_search.py
+# created 18/10/2026 at 22:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:04 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/bench_search.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import statistics
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# local application imports
+from app_crm.models import Customer, Event
+from app_crm.search import search, search_all
+from app_crm.seeding import seed_dataset, seed_users
+
+# other imports & constants
+PAGE = 51
+QUERIES = ['martin', 'dupont12', 'company 42', 'garcia 777', 'customer123']
+
+
+def p95(function, repeat):
+    """ Return the 95th percentile of the durations of `function` in ms """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.quantiles(durations, n=20)[-1]
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the first page of the ranked search of the customers "
+            "and events, and of the global search, for a management and a "
+            "sales user, against the `search` prefix filter. Everything "
+            "runs in a rolled back transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        sales_users, _ = seed_dataset(options['customers'],
+                                      stdout=self.stdout)
+        users = [seed_users('management', 1)[0], sales_users[0]]
+        repeat = options['repeat']
+        self.stdout.write(f'{"query":>12} {"user":>12} {"customers":>10} '
+                          f'{"p95 (ms)":>9} {"events p95":>11} '
+                          f'{"global p95":>11} {"prefix p95":>11}')
+        for query in QUERIES:
+            for user in users:
+                pages = [
+                    search(Customer.objects.visible_to(user), query)
+                    .order_by('-search_rank', '-id')[:PAGE],
+                    search(Event.objects.visible_to(user), query)
+                    .order_by('-search_rank', '-id')[:PAGE],
+                    Customer.objects.visible_to(user).filter(
+                        last_name__istartswith=query.split()[0])
+                    .order_by('-id')[:PAGE],
+                ]
+                customers, events, prefix = [
+                    p95(lambda: list(page.all()), repeat) for page in pages]
+                both = p95(lambda: search_all(user, query, PAGE), repeat)
+                self.stdout.write(
+                    f'{query:>12} {user.role:>12} {len(pages[0]):>10} '
+                    f'{customers:>9.2f} {events:>11.2f} {both:>11.2f} '
+                    f'{prefix:>11.2f}')
@@ -0,0 +1,146 @@
+# app_crm/management/commands/bench_tracing.py
+# created 19/10/2026 at 03:00 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 03:00 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/bench_tracing.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+import statistics
+import time
+
+# third party imports
+import sentry_sdk
+from rest_framework.views import APIView
+from sentry_sdk.integrations.django import DjangoIntegration
+from sentry_sdk.transport import Transport
+
+# django imports
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+# local application imports
+from app_crm.seeding import seed_dataset, seed_users
+from app_users.serializers import MyTokenObtainSerializer
+from epic_events.tracing import get_sampler
+
+# other imports & constants
+# never reached, the transport below sends nothing
+DSN = 'http://public@127.0.0.1:9/1'
+URLS = [reverse('app_crm:customers-list'),
+        reverse('app_crm:contract-list'),
+        reverse('app_crm:event-list')]
+
+
+class LocalTransport(Transport):
+    """
+    Transport serializing the events and envelopes as the HTTP transport
+    does, without sending them.
+    """
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.events = 0
+        self.bytes = 0
+
+    def capture_event(self, event):
+        self.events += 1
+        self.bytes += len(sentry_sdk.utils.json_dumps(event))
+
+    def capture_envelope(self, envelope):
+        buffer = io.BytesIO()
+        envelope.serialize_into(buffer)
+        self.events += 1
+        self.bytes += buffer.tell()
+
+
+class Command(BaseCommand):
+    help = ("Measure the tracing overhead of the CRM lists requests, served "
+            "by the WSGI handler with the Django integration of sentry, "
+            "with no traces, the adaptive sampler of the settings and every "
+            "request traced. The traces are serialized but not sent. "
+            "Everything runs in a rolled back transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=100)
+
+    def handle(self, *args, **options):
+        # as the test client does, the requests must not close the
+        # connection of the transaction
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        # the throttling counters are not rolled back
+        throttle_classes = APIView.throttle_classes
+        APIView.throttle_classes = []
+        try:
+            with transaction.atomic():
+                self.run(options)
+                transaction.set_rollback(True)
+        finally:
+            APIView.throttle_classes = throttle_classes
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+            sentry_sdk.init()
+
+    def run(self, options):
+        seed_dataset(options['customers'], stdout=self.stdout)
+        user = seed_users('management', 1)[0]
+        token = MyTokenObtainSerializer.get_token(user).access_token
+        authorization = f'Bearer {token}'
+        modes = [
+            ('0%', {'traces_sample_rate': 0.0}),
+            ('adaptive', {'traces_sampler': get_sampler()}),
+            ('100%', {'traces_sample_rate': 1.0}),
+        ]
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        self.stdout.write(f'{"sampling":>9} {"req/s":>8} {"mean (ms)":>10} '
+                          f'{"p99 (ms)":>9} {"overhead":>9} {"envelopes":>9} '
+                          f'{"kB sent":>8}')
+        baseline = None
+        for name, sampling in modes:
+            transport = LocalTransport()
+            sentry_sdk.init(dsn=DSN, transport=transport,
+                            integrations=[DjangoIntegration()],
+                            send_default_pii=True, **sampling)
+            durations = []
+            for i in range(options['warmup'] + options['requests']):
+                if i == options['warmup']:
+                    sentry_sdk.flush()
+                    transport.events = transport.bytes = 0
+                    durations = []
+                environ = factory.get(URLS[i % len(URLS)],
+                                      HTTP_AUTHORIZATION=authorization,
+                                      SERVER_NAME='localhost').environ
+                start = time.perf_counter()
+                response = handler(environ, lambda status, headers: None)
+                for _ in response:
+                    pass
+                response.close()
+                durations.append(time.perf_counter() - start)
+            sentry_sdk.flush()
+            mean = statistics.mean(durations) * 1000
+            p99 = statistics.quantiles(durations, n=100)[98] * 1000
+            baseline = baseline or mean
+            self.stdout.write(
+                f'{name:>9} {len(durations) / sum(durations):>8.0f} '
+                f'{mean:>10.2f} {p99:>9.2f} '
+                f'{(mean / baseline - 1) * 100:>8.1f}% '
+                f'{transport.events:>9} {transport.bytes / 1000:>8.0f}')
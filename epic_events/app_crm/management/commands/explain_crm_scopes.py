@@ -0,0 +1,115 @@
+# app_crm/management/commands/explain_crm_scopes.py
+# created 18/10/2026 at 18:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 18:55 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/explain_crm_scopes.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import re
+
+# third party imports
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# local application imports
+from app_crm.seeding import seed_dataset, seed_users
+from app_crm.views import (
+    CustomerViewSet,
+    ContractViewSet,
+    EventViewSet
+)
+
+# other imports & constants
+LIST_QUERIES = [
+    ('customers', CustomerViewSet, {}),
+    ('customers', CustomerViewSet, {'search': 'Dupont1'}),
+    ('customers', CustomerViewSet, {'is_customer': 'false'}),
+    ('contracts', ContractViewSet, {}),
+    ('events', EventViewSet, {}),
+    ('events', EventViewSet, {'is_finished': 'false'}),
+]
+FULL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (app_crm_\w+)'),
+    'sqlite': re.compile(r'SCAN (app_crm_\w+)\b(?! USING)'),
+}
+
+
+def list_queryset(viewset_class, user, params):
+    """
+    Build the queryset of the first page of a list endpoint,
+    the way the viewset does it for `user`.
+    """
+    view = viewset_class()
+    view.action = 'list'
+    view.format_kwarg = None
+    view.kwargs = {}
+    view.request = Request(APIRequestFactory().get('/', params))
+    view.request.user = user
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    ordering = paginator.ordering
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return queryset.order_by(*ordering)[:paginator.page_size + 1]
+
+
+class Command(BaseCommand):
+    help = ("EXPLAIN the first page of every list endpoint for each role "
+            "and fail if a CRM table is read with a full scan. "
+            "Use --seed to load a large dataset first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='number of customers to seed first')
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_dataset(options['seed'], batch_size=options['batch_size'],
+                         stdout=self.stdout)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+        full_scan = FULL_SCAN.get(connection.vendor)
+        if full_scan is None:
+            raise CommandError(f'{connection.vendor} is not supported')
+
+        users = [
+            seed_users('management', 1)[0],
+            seed_users('sales', 1)[0],
+            seed_users('support', 1)[0],
+        ]
+        failures = []
+        for user in users:
+            for name, viewset_class, params in LIST_QUERIES:
+                queryset = list_queryset(viewset_class, user, params)
+                plan = queryset.explain()
+                scans = sorted(set(full_scan.findall(plan)))
+                label = f'{user.role:<10} {name:<9} {params or ""}'
+                if scans:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(
+                        f'{label}: full scan on {", ".join(scans)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{label}: index scan'))
+                if options['verbosity'] > 1:
+                    self.stdout.write(plan)
+        if failures:
+            raise CommandError(f'{len(failures)} list queries are not '
+                               f'served by an index')
@@ -0,0 +1,61 @@
+# app_crm/management/commands/export_crm.py
+# created 18/10/2026 at 20:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:50 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/export_crm.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand
+
+# local application imports
+from app_crm import export
+from app_crm.models import Customer, Contract, Event
+
+# other imports & constants
+TABLES = {
+    'customers': Customer,
+    'contracts': Contract,
+    'events': Event,
+}
+
+
+class Command(BaseCommand):
+    help = ("Export every customer, contract or event in NDJSON or CSV, "
+            "to a file or to the standard output ('-'). The rows are "
+            "streamed from a consistent snapshot of the database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(TABLES))
+        parser.add_argument('output', nargs='?', default='-')
+        parser.add_argument('--format', choices=sorted(export.LINES),
+                            default='ndjson')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE,
+                            help='number of rows fetched at once')
+
+    def handle(self, *args, **options):
+        blocks = export.stream(TABLES[options['table']].objects.all(),
+                               options['format'], options['chunk_size'])
+        if options['output'] == '-':
+            for block in blocks:
+                self.stdout.write(block, ending='')
+            return
+        with open(options['output'], 'w', newline='',
+                  encoding='utf-8') as output:
+            for block in blocks:
+                output.write(block)
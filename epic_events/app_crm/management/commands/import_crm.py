@@ -0,0 +1,93 @@
+# app_crm/management/commands/import_crm.py
+# created 18/10/2026 at 21:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/import_crm.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import os
+import sys
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# local application imports
+from app_crm import importing
+from app_crm.models import ImportCheckpoint
+from app_users import provisioning
+
+# other imports & constants
+
+
+class Command(BaseCommand):
+    help = ("Merge the customers, contracts or events of a CSV (with a "
+            "header line) or NDJSON file into the CRM, with the columns "
+            "of the API. Rows with an existing id update the object. The "
+            "invalid rows are reported and skipped. An interrupted import "
+            "of the same file resumes after the last chunk committed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(importing.TABLES))
+        parser.add_argument('path', help="the file, '-' for stdin")
+        parser.add_argument('--format',
+                            choices=sorted(set(provisioning.FORMATS.values())),
+                            help='guessed from the file extension by default')
+        parser.add_argument('--chunk-size', type=int,
+                            default=importing.CHUNK_SIZE)
+        parser.add_argument('--checkpoint',
+                            help='name of the checkpoint, the table, path '
+                                 'and size of the file by default, none '
+                                 'for stdin')
+        parser.add_argument('--restart', action='store_true',
+                            help='start again from the first row')
+
+    def handle(self, *args, **options):
+        path, table = options['path'], options['table']
+        format = options['format'] or provisioning.guess_format(path)
+        if format is None:
+            raise CommandError('Unknown file format, use --format')
+        key = options['checkpoint']
+        if key is None and path != '-':
+            key = (f'{table}:{os.path.abspath(path)}:'
+                   f'{os.path.getsize(path)}')
+        if key is not None and options['restart']:
+            ImportCheckpoint.objects.filter(key=key).delete()
+
+        start = time.perf_counter()
+        if path == '-':
+            checkpoint, errors = self.load(sys.stdin, format, key, options)
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                checkpoint, errors = self.load(stream, format, key, options)
+        for error in errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{checkpoint.merged} {table} merged, {checkpoint.rejected} '
+            f'rows rejected in {seconds:.1f}s'))
+        if checkpoint.rejected:
+            raise CommandError(f'{checkpoint.rejected} rows rejected')
+
+    def load(self, stream, format, key, options):
+        def progress(checkpoint):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{checkpoint.rows} rows read')
+
+        return importing.import_rows(
+            importing.TABLES[options['table']],
+            provisioning.read_rows(stream, format), key=key,
+            chunk_size=options['chunk_size'], progress=progress)
@@ -0,0 +1,60 @@
+# app_crm/management/commands/rebuild_kpi.py
+# created 18/10/2026 at 22:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 22:55 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/rebuild_kpi.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# local application imports
+from app_crm import kpi
+
+# other imports & constants
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the KPI summary tables from the CRM tables. "
+            "Use --verify to check them against the CRM tables afterwards, "
+            "--verify-only to check them without rebuilding.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=kpi.CHUNK_SIZE,
+                            help='number of ids per chunk')
+        parser.add_argument('--verify', action='store_true')
+        parser.add_argument('--verify-only', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            start = time.perf_counter()
+            stdout = self.stdout if options['verbosity'] > 1 else None
+            rows = kpi.rebuild(options['chunk_size'], stdout=stdout)
+            self.stdout.write(self.style.SUCCESS(
+                f'{rows} summary rows rebuilt in '
+                f'{time.perf_counter() - start:.1f}s'))
+        if options['verify'] or options['verify_only']:
+            mismatches = kpi.verify()
+            for summary, key, expected, actual in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'{summary} {key}: expected {expected}, got {actual}'))
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} summary rows differ '
+                                   f'from the CRM tables')
+            self.stdout.write(self.style.SUCCESS('the summaries match the '
+                                                 'CRM tables'))
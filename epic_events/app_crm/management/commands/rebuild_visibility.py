@@ -0,0 +1,62 @@
+# app_crm/management/commands/rebuild_visibility.py
+# created 18/10/2026 at 20:35 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:35 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/management/commands/rebuild_visibility.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# local application imports
+from app_crm import visibility
+
+# other imports & constants
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the VisibleObject table from the business rules. "
+            "Use --verify to check it against the rules afterwards, "
+            "--verify-only to check it without rebuilding.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=visibility.CHUNK_SIZE,
+                            help='number of customer ids per chunk')
+        parser.add_argument('--verify', action='store_true')
+        parser.add_argument('--verify-only', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            start = time.perf_counter()
+            stdout = self.stdout if options['verbosity'] > 1 else None
+            rows = visibility.rebuild(options['chunk_size'], stdout=stdout)
+            self.stdout.write(self.style.SUCCESS(
+                f'{rows} grants rebuilt in '
+                f'{time.perf_counter() - start:.1f}s'))
+        if options['verify'] or options['verify_only']:
+            mismatches = visibility.verify()
+            for username, object_type, missing, extra, wrong in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'{username} {object_type}: {missing} missing, '
+                    f'{extra} extra, {wrong} wrong write access'))
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} scopes differ from '
+                                   f'the rules')
+            self.stdout.write(self.style.SUCCESS('the table matches the '
+                                                 'rules'))
@@ -1,6 +1,6 @@
 # app_crm/models.py
 # created 02/03/2022 at 12:06 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/04/2022 at 10:32 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/models.py:
     - *
@@ -10,17 +10,19 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.14"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
 
 # standard library imports
+from abc import ABCMeta, abstractmethod
 
 # third party imports
 
 # django imports
 from django.db import models
+from django.db.models import Exists, OuterRef
 from django.dispatch import receiver
 from django.db.models.signals import (
     pre_save,
@@ -28,11 +30,170 @@ from django.db.models.signals import (
 
 # local application imports
 from app_users.models import User
+from .indexes import PrefixSearchIndex
 
 # other imports & constants
 
 
-class Customer(models.Model):
+class ScopedQuerySet(models.QuerySet, metaclass=ABCMeta):
+    """
+    Base queryset of the CRM models, restricted to a role scope with
+    visible_to(user).
+
+    The scope of a user is made of the objects granted to them, read from
+    the VisibleObject table with a single indexed semi-join, plus the
+    objects shared with their whole role (shared_with). granted_to()
+    gives the same grants computed from the business rules, it is used
+    to build and to verify the table (see app_crm.visibility).
+
+    Objects fetched from a scoped queryset are tagged with the id of the
+    user it was scoped to, so the permission classes know they are
+    visible without running another query (see permissions.is_visible).
+    """
+    scope_user_id = None
+
+    @abstractmethod
+    def granted_to(self, user):
+        """ Return the objects granted to `user` by the business rules """
+
+    def shared_with(self, user):
+        """ Return the Q of the objects shared with the role of `user` """
+        return None
+
+    def rules(self, user):
+        """ Return the scope of `user` computed from the business rules """
+        if user.role == 'management':
+            return self.all()
+        shared = self.shared_with(user)
+        granted = self.granted_to(user)
+        if shared is not None:
+            return granted | self.filter(shared)
+        return granted
+
+    def scope(self, user):
+        if user.role == 'management':
+            return self.all()
+        granted = VisibleObject.objects.filter(
+            user=user.id, object_type=self.model._meta.model_name)
+        shared = self.shared_with(user)
+        if shared is not None:
+            # the shared objects are never granted: each id comes once
+            ids = self.model._base_manager.filter(shared).values(
+                'pk').union(granted.values('object_id'), all=True)
+            return self.filter(pk__in=ids)
+        return self.filter(Exists(granted.filter(object_id=OuterRef('pk'))))
+
+    def visible_to(self, user):
+        queryset = self.scope(user)
+        queryset.scope_user_id = user.id
+        return queryset
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.scope_user_id = self.scope_user_id
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self.scope_user_id is not None:
+            for obj in self._result_cache:
+                if isinstance(obj, models.Model):
+                    obj._scope_user_id = self.scope_user_id
+
+
+class CustomerQuerySet(ScopedQuerySet):
+    """
+    Sales role: every prospect and their own customers.
+    Support role: the customers of the contracts they follow.
+    Management role: every customer.
+
+    Prospects are shared with the whole sales role instead of being
+    granted to each sales user. The sales scope is id IN (prospects
+    UNION ALL own customers): each branch is read from its own index,
+    where an OR of both predicates can only filter a scan of the table.
+    """
+
+    def granted_to(self, user):
+        if user.role == 'sales':
+            return self.filter(sales_contact_id=user.id)
+        elif user.role == 'support':
+            return self.filter(Exists(Contract.objects.filter(
+                customer=OuterRef('pk'),
+                support_contact_id=user.id)))
+        return self.none()
+
+    def shared_with(self, user):
+        if user.role == 'sales':
+            return models.Q(is_customer=False)
+        return None
+
+
+class ContractQuerySet(ScopedQuerySet):
+    """
+    Sales role: the contracts of their own customers.
+    Support role: the contracts they follow.
+    Management role: every contract.
+    """
+
+    def granted_to(self, user):
+        if user.role == 'sales':
+            return self.filter(customer__sales_contact_id=user.id)
+        elif user.role == 'support':
+            return self.filter(support_contact_id=user.id)
+        return self.none()
+
+
+class EventQuerySet(ScopedQuerySet):
+    """
+    Sales role: the events of their own customers.
+    Support role: the events of the contracts they follow.
+    Management role: every event.
+    """
+
+    def granted_to(self, user):
+        if user.role == 'sales':
+            return self.filter(contract_id__customer__sales_contact_id=user.id)  # noqa
+        elif user.role == 'support':
+            return self.filter(contract_id__support_contact_id=user.id)
+        return self.none()
+
+
+class ScopeFieldsMixin:
+    """
+    Remember the values of `scope_fields` an object was loaded with, so
+    app_crm.visibility only refreshes the grants when one of them changes.
+    """
+    scope_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_scope = instance.scope_values()
+        return instance
+
+    def scope_values(self):
+        return tuple(self.__dict__.get(name) for name in self.scope_fields)
+
+
+class SummaryFieldsMixin:
+    """
+    Remember the values of `summary_fields` an object was loaded with, so
+    app_crm.kpi updates the summary tables by the difference when one of
+    them changes.
+    """
+    summary_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_summary = instance.summary_values()
+        return instance
+
+    def summary_values(self):
+        return tuple(self.__dict__.get(name) for name in self.summary_fields)
+
+
+class Customer(ScopeFieldsMixin, SummaryFieldsMixin, models.Model):
     """
     This class represents a customer in the crm.
 
@@ -58,12 +219,18 @@ class Customer(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    # Managers
+    objects = CustomerQuerySet.as_manager()
+    scope_fields = ('sales_contact_id_id',)
+    summary_fields = ('sales_contact_id_id', 'is_customer')
+
     # FKs
     sales_contact_id = models.ForeignKey(
         User,
         on_delete=models.DO_NOTHING,
         blank=True,
         null=True,
+        db_index=False,  # leading column of customer_sales_contact_idx
     )
 
     # Methods
@@ -71,6 +238,18 @@ class Customer(models.Model):
         return f"{self.first_name} {self.last_name} (is customer: {self.is_customer})"  # noqa: E501
 
     # Meta
+    class Meta:
+        indexes = [
+            # sales scope: own customers
+            models.Index(fields=['sales_contact_id', 'is_customer'],
+                         name='customer_sales_contact_idx'),
+            # sales scope: every prospect, walked in cursor order
+            models.Index(fields=['-id'], name='customer_prospect_idx',
+                         condition=models.Q(is_customer=False)),
+            # '^last_name' and '^email' searches
+            PrefixSearchIndex('last_name', name='customer_last_name_idx'),
+            PrefixSearchIndex('email', name='customer_email_idx'),
+        ]
 
 
 @receiver(pre_save, sender=Customer)
@@ -84,7 +263,7 @@ def check_sales_contact(sender, instance, *args, **kwargs):
         instance.sales_contact_id = None
 
 
-class Contract(models.Model):
+class Contract(ScopeFieldsMixin, SummaryFieldsMixin, models.Model):
     """
     This class represents a contract in the crm.
 
@@ -105,17 +284,24 @@ class Contract(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    # Managers
+    objects = ContractQuerySet.as_manager()
+    scope_fields = ('customer_id', 'support_contact_id_id')
+    summary_fields = ('customer_id', 'amount', 'is_signed')
+
     # FKs
     customer = models.ForeignKey(
         Customer,
         on_delete=models.CASCADE,
         related_name='contract',
+        db_index=False,  # leading column of contract_customer_idx
     )
     support_contact_id = models.ForeignKey(
         User,
         on_delete=models.DO_NOTHING,
         blank=True,
         null=True,
+        db_index=False,  # leading column of contract_support_contact_idx
     )
 
     # Methods
@@ -123,9 +309,18 @@ class Contract(models.Model):
         return f"{self.project_name} (is signed: {self.is_signed})"
 
     # Meta
+    class Meta:
+        indexes = [
+            # support scope, walked in cursor order
+            models.Index(fields=['support_contact_id', '-id'],
+                         name='contract_support_contact_idx'),
+            # sales scope, joined from the customer
+            models.Index(fields=['customer', '-id'],
+                         name='contract_customer_idx'),
+        ]
 
 
-class Event(models.Model):
+class Event(ScopeFieldsMixin, SummaryFieldsMixin, models.Model):
     """
     This class represents an event in the crm.
 
@@ -146,11 +341,17 @@ class Event(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    # Managers
+    objects = EventQuerySet.as_manager()
+    scope_fields = ('contract_id_id',)
+    summary_fields = ('event_date', 'attendees', 'is_finished')
+
     # FKs
     contract_id = models.ForeignKey(
         Contract,
         on_delete=models.CASCADE,
         related_name='event',
+        db_index=False,  # leading column of event_contract_idx
     )
 
     # Methods
@@ -158,3 +359,152 @@ class Event(models.Model):
         return f"{self.event_name} (status: {self.is_finished})"
 
     # Meta
+    class Meta:
+        indexes = [
+            # sales and support scopes joined from the contract,
+            # filtered on is_finished
+            models.Index(fields=['contract_id', 'is_finished'],
+                         name='event_contract_idx'),
+        ]
+
+
+class VisibleObject(models.Model):
+    """
+    This class represents a row-level access of the crm:
+    `user` can see the object (object_type, object_id).
+
+    The table is maintained by app_crm.visibility on every save and delete
+    of the CRM models and users. It can be rebuilt and verified with the
+    rebuild_visibility command.
+
+    Attributes:
+        object_type (str): customer, contract or event.
+        object_id (int): The id of the object.
+        can_write (bool): Whether the user can also update the object
+                          (status rules apart, e.g. signed contracts).
+    """
+    OBJECT_TYPES = [
+        ('customer', 'customer'),
+        ('contract', 'contract'),
+        ('event', 'event'),
+    ]
+
+    # Fields
+    object_type = models.CharField(max_length=8, choices=OBJECT_TYPES)
+    object_id = models.BigIntegerField()
+    can_write = models.BooleanField(default=False)
+
+    # FKs
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,  # leading column of visible_object_unique
+    )
+
+    # Methods
+    def __str__(self):
+        return f"{self.user_id} -> {self.object_type} {self.object_id}"
+
+    # Meta
+    class Meta:
+        constraints = [
+            # scope semi-join: (user, object_type) -> object_id
+            models.UniqueConstraint(
+                fields=['user', 'object_type', 'object_id'],
+                name='visible_object_unique'),
+        ]
+        indexes = [
+            # maintenance: every grant of an object
+            models.Index(fields=['object_type', 'object_id'],
+                         name='visible_object_target_idx'),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """
+    This class represents the progress of an import of the crm
+    (see app_crm.importing), saved with every chunk of rows merged:
+    an interrupted import resumes after the last chunk.
+
+    Attributes:
+        key (str): The import, by default the table, name and size of
+                   the file.
+        rows (int): The rows of the file read.
+        merged (int): The rows inserted or updated.
+        rejected (int): The invalid rows skipped.
+        finished (bool): Whether every row was read.
+    """
+
+    # Fields
+    key = models.CharField(max_length=255, unique=True)
+    rows = models.PositiveBigIntegerField(default=0)
+    merged = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    # Methods
+    def __str__(self):
+        return f"{self.key} ({self.rows} rows)"
+
+
+class SalesSummary(models.Model):
+    """
+    This class represents the KPIs of a sales contact: their customers and
+    the signed and unsigned contracts of these customers. The prospects
+    and the customers without sales contact are summed in the row of
+    sales_contact 0.
+
+    The table is maintained by app_crm.kpi on every save and delete of
+    the CRM models. It can be rebuilt and verified with the rebuild_kpi
+    command.
+
+    Attributes:
+        sales_contact (int): The id of the sales contact, or 0.
+        customers (int): The customers.
+        prospects (int): The prospects.
+        signed_contracts (int): The signed contracts.
+        signed_amount (decimal): The amount of the signed contracts.
+        unsigned_contracts (int): The contracts not signed yet.
+        unsigned_amount (decimal): The amount of the unsigned contracts.
+    """
+
+    # Fields
+    sales_contact = models.BigIntegerField(unique=True)
+    customers = models.BigIntegerField(default=0)
+    prospects = models.BigIntegerField(default=0)
+    signed_contracts = models.BigIntegerField(default=0)
+    signed_amount = models.DecimalField(max_digits=16, decimal_places=2,
+                                        default=0)
+    unsigned_contracts = models.BigIntegerField(default=0)
+    unsigned_amount = models.DecimalField(max_digits=16, decimal_places=2,
+                                          default=0)
+
+    # Methods
+    def __str__(self):
+        return f"sales contact {self.sales_contact} ({self.customers} customers)"  # noqa: E501
+
+
+class EventSummary(models.Model):
+    """
+    This class represents the KPIs of the events of a month, maintained
+    as SalesSummary is.
+
+    Attributes:
+        month (date): The first day of the month of the events.
+        events (int): The events.
+        finished_events (int): The finished events.
+        attendees (int): The attendees of the events.
+    """
+
+    # Fields
+    month = models.DateField(unique=True)
+    events = models.BigIntegerField(default=0)
+    finished_events = models.BigIntegerField(default=0)
+    attendees = models.BigIntegerField(default=0)
+
+    # Methods
+    def __str__(self):
+        return f"{self.month:%Y-%m} ({self.events} events)"
@@ -0,0 +1,41 @@
+# app_crm/pagination.py
+# created 18/10/2026 at 17:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 17:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/pagination.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+from rest_framework.pagination import CursorPagination
+
+# django imports
+
+# local application imports
+
+# other imports & constants
+
+
+class CRMCursorPagination(CursorPagination):
+    """
+    Keyset pagination used by the customers, contracts and events lists.
+
+    Pages are ordered on the primary key only: it is unique and never
+    changes, so every page is fetched with a `WHERE id < <cursor>` clause
+    served by the primary key index, whatever the page number.
+    No OFFSET is ever needed and no COUNT(*) is run.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -1,6 +1,6 @@
 # app_crm/permissions.py
 # created 18/03/2022 at 15:05 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/03/2022 at 12:33 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/permissions.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.12"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -27,13 +27,23 @@ from rest_framework.permissions import (
 # django imports
 
 # local application imports
-from .models import (
-    Customer,
-)
 
 # other imports & constants
 
 
+def is_visible(user, obj):
+    """
+    Tell whether `obj` is in the role scope of `user`.
+
+    Objects fetched through Model.objects.visible_to(user), as the
+    viewsets get_queryset do, are visible by construction and cost no
+    query. Any other object costs a single EXISTS query.
+    """
+    if getattr(obj, '_scope_user_id', None) == user.id:
+        return True
+    return type(obj).objects.visible_to(user).filter(pk=obj.pk).exists()
+
+
 class IsManagement(BasePermission):
     """
     The management role can only access data in read-only mode.
@@ -62,11 +72,7 @@ class CustomerPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method == 'DELETE':
             return request.user.role == 'sales' and obj.is_customer is False
-        elif request.user.role == 'support' and request.method in SAFE_METHODS:
-            return obj in Customer.objects.filter(
-                contract__support_contact_id=request.user
-            )
-        return request.user == obj.sales_contact_id or obj.is_customer is False
+        return is_visible(request.user, obj)
 
 
 class ContractPermissions(BasePermission):
@@ -82,12 +88,10 @@ class ContractPermissions(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
-            if request.user.role == 'support':
-                return obj.support_contact_id == request.user
-            return request.user == obj.customer.sales_contact_id
-        elif request.method == 'PUT' and obj.is_signed is True:
+            return is_visible(request.user, obj)
+        elif request.method in ('PUT', 'PATCH') and obj.is_signed is True:
             raise PermissionDenied('You cannot update a signed contract')
-        return request.user == obj.customer.sales_contact_id and obj.is_signed is False  # noqa
+        return obj.is_signed is False and is_visible(request.user, obj)
 
 
 class EventPermissions(BasePermission):
@@ -102,15 +106,10 @@ class EventPermissions(BasePermission):
 
     def has_permission(self, request, view):
         if request.user.role == 'support':
-            return request.method in ['GET', 'PUT']
+            return request.method in ['GET', 'PUT', 'PATCH']
         return request.user.role == 'sales'
 
     def has_object_permission(self, request, view, obj):
-        if request.method in SAFE_METHODS:
-            return request.user == obj.contract_id.customer.sales_contact_id or request.user == obj.contract_id.support_contact_id  # noqa
-        else:
-            if obj.is_finished is True:
-                raise PermissionDenied('You cannot update a finished event')
-            if request.user.role == 'support':
-                return request.user == obj.contract_id.support_contact_id
-            return request.user == obj.contract_id.customer.sales_contact_id
+        if request.method not in SAFE_METHODS and obj.is_finished is True:
+            raise PermissionDenied('You cannot update a finished event')
+        return is_visible(request.user, obj)
@@ -0,0 +1,209 @@
+# app_crm/replicas.py
+# created 19/10/2026 at 01:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 19:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/replicas.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import contextvars
+import random
+import threading
+import time
+
+# third party imports
+from rest_framework.permissions import SAFE_METHODS
+
+# django imports
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# local application imports
+from app_users.throttling import get_store
+
+# other imports & constants
+# seconds the reads of a user go to the primary after their own write
+STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+# position of the WAL written by the primary
+PRIMARY_LSN_QUERY = 'SELECT pg_current_wal_lsn()'
+# whether the replica runs a WAL receiver (its pid is readable without
+# the pg_read_all_stats role), whether it replayed the WAL up to the
+# position of the primary, and the age of its last transaction replayed
+LAG_QUERY = (
+    'SELECT (SELECT pid FROM pg_stat_wal_receiver) IS NOT NULL, '
+    'pg_last_wal_replay_lsn() >= %s::pg_lsn, '
+    'EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())')
+
+# database of the reads of the current request, the router's default
+# when None
+read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def replica_lag(alias):
+    """
+    Seconds the database `alias` is behind its primary, None when it
+    does not receive the WAL of the primary (stopped receiver, primary)
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        # a copy kept by hand, e.g. the SQLite replica of the tests
+        return 0.0
+    # read from the primary first: a replica replaying past it is up to
+    # date, even when its last transaction is old
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(PRIMARY_LSN_QUERY)
+        primary_lsn = cursor.fetchone()[0]
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_QUERY, [primary_lsn])
+        receiving, caught_up, age = cursor.fetchone()
+    if not receiving:
+        return None
+    if caught_up:
+        return 0.0
+    return None if age is None else float(age)
+
+
+class ReplicaSet:
+    """
+    Read replicas of the default database, with their lag as last
+    measured by the worker.
+
+    The lag of a replica is measured again `check_interval` seconds
+    after the previous measure, by the first request choosing a
+    replica. A replica more than `max_lag` seconds behind, failing to
+    answer or not receiving the WAL of the primary, is left out until
+    its next measure.
+    """
+
+    def __init__(self, aliases, max_lag=5, check_interval=2):
+        self.aliases = list(aliases)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # alias -> (time measured, lag in seconds or None when down)
+        self._lags = {}
+        self._lock = threading.Lock()
+
+    def lag(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            measure = self._lags.get(alias)
+        if measure is None or now - measure[0] >= self.check_interval:
+            try:
+                lag = replica_lag(alias)
+            except DatabaseError:
+                connections[alias].close()
+                lag = None
+            measure = (now, lag)
+            with self._lock:
+                self._lags[alias] = measure
+        return measure[1]
+
+    def choose(self):
+        """ A random replica at most `max_lag` seconds behind, or None """
+        lags = {alias: self.lag(alias) for alias in self.aliases}
+        aliases = [alias for alias, lag in lags.items()
+                   if lag is not None and lag <= self.max_lag]
+        return random.choice(aliases) if aliases else None
+
+    def clear(self):
+        with self._lock:
+            self._lags.clear()
+
+
+def pin_key(user_id, window):
+    return f'replica_pin_{user_id}:{window}'
+
+
+def pin_to_primary(user_id):
+    """
+    Send the reads of the user to the primary for STICKY_SECONDS at
+    least. The pin is a counter of the current window of STICKY_SECONDS
+    in the shared throttling store, so every worker sees it.
+    """
+    window = int(time.time() // STICKY_SECONDS)
+    get_store().incr(pin_key(user_id, window), 2 * STICKY_SECONDS)
+
+
+def is_pinned(user_id):
+    """ Whether the user wrote in the last STICKY_SECONDS """
+    window = int(time.time() // STICKY_SECONDS)
+    store = get_store()
+    return bool(store.get(pin_key(user_id, window))
+                or store.get(pin_key(user_id, window - 1)))
+
+
+class ReplicaRouter:
+    """
+    Route the reads of the requests served by a replica (see
+    ReplicaReadMixin) to it, and the writes of the objects read from a
+    replica to the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # an object read from a replica is saved to the primary
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in replicas.aliases:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the rows of the default database
+        databases = {DEFAULT_DB_ALIAS, *replicas.aliases}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe requests of the CRM views from a read replica.
+
+    Once the user is authenticated, the reads of a GET, HEAD or OPTIONS
+    go to a replica within REPLICA_MAX_LAG seconds of the primary, or
+    to the primary when there is none. A successful write pins the
+    reads of its user to the primary for REPLICA_STICKY_SECONDS, so
+    they see their own writes whatever the lag.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        user = request.user
+        if (request.method in SAFE_METHODS and replicas.aliases
+                and user.is_authenticated and not is_pinned(user.pk)):
+            read_alias.set(replicas.choose())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        # below 400, the user was authenticated
+        if (request.method not in SAFE_METHODS and replicas.aliases
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(request.user.pk)
+        return response
+
+
+replicas = ReplicaSet(
+    getattr(settings, 'READ_REPLICAS', []),
+    max_lag=getattr(settings, 'REPLICA_MAX_LAG', 5),
+    check_interval=getattr(settings, 'REPLICA_CHECK_INTERVAL', 2))
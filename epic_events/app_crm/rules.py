@@ -0,0 +1,127 @@
+# app_crm/rules.py
+# created 19/10/2026 at 05:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 05:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/rules.py:
+    - business rules of the creations and updates of the CRM objects,
+      shared by the API (single and bulk) and the imports
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+
+# local application imports
+from .models import Customer, Contract, Event
+
+# other imports & constants
+
+
+def customer_update_errors(instance, attrs):
+    """
+    Prevent the sales contact from changing the status of a customer
+    to prospect.
+    """
+    if instance.is_customer is True and attrs.get('is_customer') is False:
+        return {'is_customer': 'You cannot change customer to prospect'}
+    return {}
+
+
+def contract_create_errors(items):
+    """
+    Prevent the sales contact or management to create a contract with
+    a prospect.
+    """
+    return [
+        {'customer': 'You cannot create a contract with a prospect'}
+        if item['customer'].is_customer is False else {}
+        for item in items
+    ]
+
+
+def contract_update_errors(instance, attrs):
+    """
+    Prevent the sales contact or management to change the status of a
+    signed contracts.
+    """
+    if instance.is_signed is True and attrs.get('is_signed') is False:
+        return {'is_signed': 'You cannot change signed contracts'}
+    return {}
+
+
+def event_create_errors(items):
+    """
+    Prevent the sales contact or management to create an event with a
+    prospect, with a contract not signed, or for a contract that
+    already has an event, in the database or earlier in `items`.
+    """
+    taken = set(Event.objects.filter(
+        contract_id__in=[item['contract_id'].pk for item in items]
+    ).values_list('contract_id', flat=True))
+    errors = []
+    for item in items:
+        contract = item['contract_id']
+        if contract.customer.is_customer is False:
+            errors.append({'contract_id': 'You cannot create an event with a prospect'})  # noqa
+        elif contract.is_signed is False:
+            errors.append({'contract_id': 'You cannot create an event with a contract not signed'})  # noqa
+        elif contract.pk in taken:
+            errors.append({'contract_id': 'You cannot create an event for a contract that already has an event'})  # noqa
+        else:
+            errors.append({})
+        taken.add(contract.pk)
+    return errors
+
+
+def event_update_errors(instance, attrs):
+    """
+    Prevent the sales contact or management to change the status of a
+    finished event.
+    """
+    if instance.is_finished is True and attrs.get('is_finished') is False:
+        return {'is_finished': 'You cannot change finished events'}
+    return {}
+
+
+CREATE_ERRORS = {
+    Contract: contract_create_errors,
+    Event: event_create_errors,
+}
+UPDATE_ERRORS = {
+    Customer: customer_update_errors,
+    Contract: contract_update_errors,
+    Event: event_update_errors,
+}
+
+
+def create_errors(model, items):
+    """
+    For each validated item of `model` to create, a dict of error
+    messages by field, empty when the item is valid.
+    """
+    rules = CREATE_ERRORS.get(model)
+    if rules is None:
+        return [{} for _ in items]
+    return rules(items)
+
+
+def update_errors(model, instance, attrs):
+    """
+    A dict of error messages by field for the update of `instance` with
+    the validated `attrs`, empty when it is valid.
+    """
+    rules = UPDATE_ERRORS.get(model)
+    if rules is None:
+        return {}
+    return rules(instance, attrs)
@@ -0,0 +1,297 @@
+# app_crm/search.py
+# created 18/10/2026 at 21:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:04 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/search.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import re
+
+# third party imports
+from rest_framework.filters import BaseFilterBackend
+
+# django imports
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity
+)
+from django.db import (
+    DatabaseError,
+    NotSupportedError,
+    connections,
+    transaction
+)
+from django.db.models import (
+    CharField,
+    F,
+    FloatField,
+    Func,
+    Q,
+    TextField,
+    Value
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+# local application imports
+from .models import Customer, Contract, Event
+
+# other imports & constants
+SEARCH_FIELDS = {
+    Customer: ('first_name', 'last_name', 'company_name', 'email'),
+    Contract: ('project_name',),
+    Event: ('event_name', 'notes'),
+}
+# text search configuration of PostgreSQL: no stemming nor stop words,
+# names and emails are not English words
+CONFIG = 'simple'
+# words of a query kept, the others are ignored
+MAX_WORDS = 8
+WORD = re.compile(r'\w+')
+# label of the results of the global search, by type
+LABELS = {
+    Customer: Concat(F('first_name'), Value(' '), F('last_name'),
+                     Value(' - '), F('company_name'),
+                     output_field=CharField()),
+    Contract: F('project_name'),
+    Event: F('event_name'),
+}
+# whether pg_trgm is installed, by database alias
+TRIGRAMS = {}
+
+
+class SearchText(Func):
+    """
+    The searched columns joined by spaces, with `||` rather than CONCAT()
+    which is not immutable: the expression can be indexed.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = " || ' ' || "
+    output_field = TextField()
+
+    def __init__(self, *fields):
+        super().__init__(*[Coalesce(F(field), Value(''))
+                           for field in fields])
+
+
+class Words(Func):
+    """
+    The words of a column separated by spaces: the parser of PostgreSQL
+    keeps an email or a URL as one token, its words are searched alone.
+    """
+    function = 'REGEXP_REPLACE'
+    output_field = TextField()
+
+    def __init__(self, field):
+        super().__init__(F(field), Value(r'\W+'), Value(' '), Value('g'))
+
+
+def search_vector(model):
+    return SearchVector(*[Words(field) for field in SEARCH_FIELDS[model]],
+                        config=CONFIG)
+
+
+def search_text(model):
+    return SearchText(*SEARCH_FIELDS[model])
+
+
+def fts_table(model):
+    """ The SQLite FTS5 table of `model` """
+    return f'{model._meta.db_table}_search'
+
+
+def pg_indexes(model):
+    """
+    GIN indexes of the tsvector of the searched columns, and of their
+    trigrams for the words misspelled or cut in the middle.
+    """
+    name = model._meta.model_name
+    return [
+        GinIndex(search_vector(model), name=f'{name}_search_idx'),
+        GinIndex(OpClass(search_text(model), name='gin_trgm_ops'),
+                 name=f'{name}_trigram_idx'),
+    ]
+
+
+def sqlite_statements(model):
+    """
+    FTS5 table indexing the searched columns of `model`, kept in sync by
+    triggers (external content table: the text is not stored twice).
+    """
+    table = model._meta.db_table
+    search = fts_table(model)
+    fields = SEARCH_FIELDS[model]
+    columns = ', '.join(fields)
+    new = ', '.join(f'new.{field}' for field in fields)
+    old = ', '.join(f'old.{field}' for field in fields)
+    insert = (f'INSERT INTO {search} (rowid, {columns}) '
+              f'VALUES (new.id, {new});')
+    delete = (f"INSERT INTO {search} ({search}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old});")
+    return [
+        f"CREATE VIRTUAL TABLE {search} USING fts5({columns}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f'CREATE TRIGGER {search}_insert AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {search}_delete AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {search}_update AFTER UPDATE ON {table} '
+        f'BEGIN {delete} {insert} END',
+        f"INSERT INTO {search} ({search}) VALUES ('rebuild')",
+    ]
+
+
+def has_trigrams(connection):
+    """ Whether pg_trgm is installed, asked once per database """
+    if connection.alias not in TRIGRAMS:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            TRIGRAMS[connection.alias] = cursor.fetchone() is not None
+    return TRIGRAMS[connection.alias]
+
+
+def install(using='default'):
+    """
+    Create the missing search indexes: GIN indexes on PostgreSQL, FTS5
+    tables on SQLite. The database keeps them up to date on every write,
+    whatever the way (ORM, bulk_create, raw SQL).
+    The trigram index needs pg_trgm (contrib): without it, the search
+    only matches the start of the words.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            pass
+        TRIGRAMS.pop(using, None)
+        with connection.schema_editor() as editor:
+            for model in SEARCH_FIELDS:
+                with connection.cursor() as cursor:
+                    existing = connection.introspection.get_constraints(
+                        cursor, model._meta.db_table)
+                indexes = pg_indexes(model)
+                if not has_trigrams(connection):
+                    indexes = indexes[:1]
+                for index in indexes:
+                    if index.name not in existing:
+                        editor.add_index(model, index)
+    elif connection.vendor == 'sqlite':
+        tables = connection.introspection.table_names()
+        with connection.cursor() as cursor:
+            for model in SEARCH_FIELDS:
+                if fts_table(model) not in tables:
+                    for statement in sqlite_statements(model):
+                        cursor.execute(statement)
+
+
+@receiver(post_migrate)
+def install_search(sender, using, **kwargs):
+    if sender.label == 'app_crm':
+        install(using)
+
+
+def search(queryset, query):
+    """
+    Filter `queryset` on the words of `query`, every one of them matching
+    the start of a word of the searched columns, and annotate the rows
+    with their relevance, `search_rank` (the higher, the better).
+    On PostgreSQL with pg_trgm, the rows whose text is close enough to
+    the query (word similarity) match too, to allow typos.
+    """
+    words = WORD.findall(query)[:MAX_WORDS]
+    if not words:
+        return queryset.none().annotate(
+            search_rank=Value(0.0, output_field=FloatField()))
+    model = queryset.model
+    connection = connections[queryset.db]
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        tsquery = SearchQuery(' & '.join(f'{word}:*' for word in words),
+                              config=CONFIG, search_type='raw')
+        queryset = queryset.alias(search_vector=search_vector(model))
+        matches = Q(search_vector=tsquery)
+        rank = SearchRank(F('search_vector'), tsquery)
+        if has_trigrams(connection):
+            text = ' '.join(words)
+            queryset = queryset.alias(search_text=search_text(model))
+            matches |= Q(search_text__trigram_word_similar=text)
+            rank += TrigramWordSimilarity(text, F('search_text'))
+        # float8: the rank is the position of the cursor pagination and
+        # must compare equal to itself once sent back by the client
+        return queryset.filter(matches).annotate(
+            search_rank=Cast(rank, FloatField()))
+    if vendor == 'sqlite':
+        table = fts_table(model)
+        match = ' '.join(f'"{word}"*' for word in words)
+        ids = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+                     [match])
+        # bm25() is negative, the lower the better
+        rank = RawSQL(
+            f'SELECT -bm25({table}) FROM {table} WHERE {table} MATCH %s '
+            f'AND rowid = {model._meta.db_table}.id', [match],
+            output_field=FloatField())
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank)
+    raise NotSupportedError(f'No full-text search on {vendor}')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Ranked full-text search of the CRM lists with the `q` query
+    parameter (see search), in the scope the viewset queryset gives.
+    The cursor pagination orders the results by decreasing rank.
+    """
+    search_param = 'q'
+
+    def get_query(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_query(request)
+        if not query:
+            return queryset
+        return search(queryset, query)
+
+    def get_ordering(self, request, queryset, view):
+        if self.get_query(request):
+            return ('-search_rank', '-id')
+        return view.paginator.ordering
+
+
+def search_all(user, query, limit):
+    """
+    Search the customers, contracts and events of the scope of `user`
+    with a single UNION ALL query (see search), and return the `limit`
+    best results as dicts: type, id, label and search_rank.
+    """
+    if not WORD.search(query):
+        return []
+    branches = [
+        search(model.objects.visible_to(user), query).annotate(
+            type=Value(model._meta.model_name, output_field=CharField()),
+            label=label,
+        ).values('type', 'id', 'label', 'search_rank')
+        for model, label in LABELS.items()
+    ]
+    results = branches[0].union(*branches[1:], all=True)
+    return list(results.order_by('-search_rank', 'type', '-id')[:limit])
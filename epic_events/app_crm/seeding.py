@@ -0,0 +1,130 @@
+# app_crm/seeding.py
+# created 18/10/2026 at 18:45 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/seeding.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.3"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from datetime import timedelta
+
+# third party imports
+
+# django imports
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+# local application imports
+from app_users.models import User
+from . import kpi
+from .models import (
+    Customer,
+    Contract,
+    Event
+)
+from .visibility import analyze, insert, subtree_grants
+
+# other imports & constants
+LAST_NAMES = ['Dupont', 'Martin', 'Bernard', 'Durand', 'Lefebvre', 'Moreau',
+              'Laurent', 'Simon', 'Michel', 'Garcia', 'David', 'Bertrand']
+
+
+def seed_users(role, count):
+    """
+    Return `count` users of the given role named seed_<role>_<i>,
+    creating the missing ones. Their password is unusable.
+    """
+    usernames = [f'seed_{role}_{i}' for i in range(count)]
+    existing = set(User.objects.filter(username__in=usernames)
+                   .values_list('username', flat=True))
+    password = make_password(None)
+    User.objects.bulk_create([
+        User(username=username, password=password, role=role,
+             is_staff=role == 'management',
+             is_superuser=role == 'management')
+        for username in usernames if username not in existing
+    ])
+    return list(User.objects.filter(username__in=usernames).order_by('id'))
+
+
+def seed_dataset(customers, sales=50, support=20, prospect_ratio=0.2,
+                 contracts_per_customer=1, batch_size=10000, stdout=None):
+    """
+    Seed a dataset of `customers` rows with bulk inserts.
+
+    A share of them (prospect_ratio) are prospects, the others are spread
+    over the seeded sales users, each with `contracts_per_customer` signed
+    contracts spread over the support users and one event per contract.
+    The models signals are not sent, the visibility table and the KPI
+    summaries are filled batch by batch instead.
+    Return the (sales users, support users) lists.
+    """
+    sales_users = seed_users('sales', sales)
+    support_users = seed_users('support', support)
+    now = timezone.now()
+    prospect_every = round(1 / prospect_ratio) if prospect_ratio else 0
+    done = 0
+    while done < customers:
+        size = min(batch_size, customers - done)
+        batch = []
+        for i in range(done, done + size):
+            is_prospect = prospect_every and i % prospect_every == 0
+            batch.append(Customer(
+                first_name='Seed',
+                last_name=f'{LAST_NAMES[i % len(LAST_NAMES)]}{i}',
+                email=f'customer{i}@seed.epicevents.com',
+                phone_number='0100000000',
+                mobile='0600000000',
+                company_name=f'Company {i % 1000}',
+                is_customer=not is_prospect,
+                sales_contact_id=(None if is_prospect
+                                  else sales_users[i % sales])))
+        created = Customer.objects.bulk_create(batch)
+        if created and created[0].pk is None:
+            created = list(Customer.objects.order_by('-id')[:size])[::-1]
+        contracts = [
+            Contract(project_name=f'Project {customer.last_name} {n}',
+                     amount=1000 + n,
+                     payment_due_date=now + timedelta(days=30),
+                     is_signed=True,
+                     customer=customer,
+                     support_contact_id=support_users[
+                         (customer.pk + n) % support])
+            for customer in created if customer.is_customer
+            for n in range(contracts_per_customer)
+        ]
+        contracts = Contract.objects.bulk_create(contracts,
+                                                 batch_size=batch_size)
+        if contracts and contracts[0].pk is None:
+            contracts = list(
+                Contract.objects.order_by('-id')[:len(contracts)])[::-1]
+        Event.objects.bulk_create([
+            Event(event_name=f'Event {contract.project_name}',
+                  event_date=now + timedelta(days=60),
+                  attendees=100,
+                  notes='seeded event',
+                  is_finished=contract.pk % 2 == 0,
+                  contract_id=contract)
+            for contract in contracts
+        ], batch_size=batch_size)
+        analyze()
+        batch = Customer.objects.filter(pk__gte=created[0].pk,
+                                        pk__lte=created[-1].pk)
+        insert(subtree_grants(batch))
+        kpi.apply(Customer, batch, 1, contracts=True)
+        kpi.apply(Event, Event.objects.filter(
+            contract_id__customer__in=batch.values('pk')), 1)
+        done += size
+        if stdout is not None:
+            stdout.write(f'{done}/{customers} customers seeded')
+    return sales_users, support_users
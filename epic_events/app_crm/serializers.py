@@ -1,6 +1,6 @@
 # app_crm/serializers.py
 # created 07/03/2022 at 09:10 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 25/03/2022 at 15:51 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/serializers.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.0"
+__version__ = "0.2.3"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -23,6 +23,11 @@ from rest_framework import serializers
 # django imports
 
 # local application imports
+from .bulk import (
+    BulkCreateListSerializer,
+    ChangedFieldsUpdateMixin,
+    PreloadedPrimaryKeyRelatedField
+)
 from .models import (
     Customer,
     Contract,
@@ -32,49 +37,71 @@ from .models import (
 # other imports & constants
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(ChangedFieldsUpdateMixin,
+                         serializers.ModelSerializer):
     """
     This class is the serializer that helps translating Customer objects
     into JSON.
 
     Serialize every field of the Customer model.
     Define id, date_created and date_updated fields as read-only.
+    Updates write the changed fields only.
     """
 
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Customer
         fields = '__all__'
+        list_serializer_class = BulkCreateListSerializer
         read_only__fields = ['date_created', 'date_updated',
                              'sales_contact_id', 'id']
 
 
-class ContractSerializer(serializers.ModelSerializer):
+class ContractSerializer(ChangedFieldsUpdateMixin,
+                         serializers.ModelSerializer):
     """
     This class is the serializer that helps translating Contract objects
     into JSON.
 
     Serialize every field of the Contract model.
     Define id, date_created and date_updated fields as read-only.
+    Updates write the changed fields only.
     """
 
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Contract
         fields = '__all__'
+        list_serializer_class = BulkCreateListSerializer
         read_only_fields = ['id', 'date_created',
                             'date_updated']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(ChangedFieldsUpdateMixin,
+                      serializers.ModelSerializer):
     """
     This class is the serializer that helps translating Event objects
     into JSON.
 
     Serialize every field of the Event model.
     Define id, date_created and date_updated fields as read-only.
+    Updates write the changed fields only.
+    The contract is loaded with its customer, as both are checked
+    before an event is created.
     """
 
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Event
         fields = '__all__'
+        list_serializer_class = BulkCreateListSerializer
         read_only_fields = ['id', 'date_created',
                             'date_updated']
+        extra_kwargs = {
+            'contract_id': {
+                'queryset': Contract.objects.select_related('customer'),
+            },
+        }
@@ -1,6 +1,6 @@
 # app_crm/tests/setup.py
 # created 23/03/2022 at 11:19 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 24/03/2022 at 10:14 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:26 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/tests/setup.py:
     - *
@@ -10,35 +10,48 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.23"
+__version__ = "0.1.24"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
 
 # standard library imports
+import os
+import tempfile
 
 # third party imports
 
 # django imports
 from django.core.management import call_command
+from django.test import override_settings
 from rest_framework.reverse import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 # local application imports
 from app_users.models import User
+from app_users.throttling import get_store
 
 # other imports & constants
 PASSWORD = "BgfpBe4qS8$Gy76$G#LfEbKxxxMY"
 LOGIN_URL = reverse('app_users:login')
+# the tests clear the throttling counters, and the replica pins with
+# them: they get a store of their own instead of the one of the server
+THROTTLE_DIRECTORY = tempfile.TemporaryDirectory()
+THROTTLE_STORE = {
+    'BACKEND': 'app_users.throttling.SQLiteCounterStore',
+    'OPTIONS': {
+        'path': os.path.join(THROTTLE_DIRECTORY.name, 'throttle.sqlite3')},
+}
 
 
-class CustomTestCase(APITestCase):
+class CustomTestMixin:
 
     def setUp(self):
         """
         Create test users.
         and load initial data
         """
+        get_store().clear()
         User.objects.create_user(
             id=1,
             username='user_management',
@@ -94,3 +107,16 @@ class CustomTestCase(APITestCase):
         for i in range(len(queryset)):
             id_list.append(queryset[i].id)
         return id_list
+
+
+@override_settings(THROTTLE_STORE=THROTTLE_STORE)
+class CustomTestCase(CustomTestMixin, APITestCase):
+    pass
+
+
+@override_settings(THROTTLE_STORE=THROTTLE_STORE)
+class CustomTransactionTestCase(CustomTestMixin, APITransactionTestCase):
+    """
+    For the tests whose requests query the database from other threads,
+    which do not see the transaction of a TestCase.
+    """
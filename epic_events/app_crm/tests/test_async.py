@@ -0,0 +1,189 @@
+# app_crm/tests/test_async.py
+# created 18/10/2026 at 23:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 23:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_async.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# third party imports
+from asgiref.sync import async_to_sync
+
+# django imports
+from django.conf import settings
+from django.urls import resolve
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from .setup import CustomTransactionTestCase, LOGIN_URL, PASSWORD
+from app_crm import export
+from app_crm.models import Customer
+from epic_events.streaming import ASGIHandler
+from .test_customers import PROSPECT_DATA
+
+# other imports & constants
+
+
+class AsyncReadPathTests(CustomTransactionTestCase):
+    """
+    In this class we are testing the CRM lists and details served by the
+    ASGI server.
+
+    - the reads are async views, the WSGI server keeps the sync ones
+    - they return what the sync views return, in the scope of the user
+    - the writes still work
+    """
+    customers_url = reverse('app_crm:customers-list')
+    contracts_url = reverse('app_crm:contract-list')
+    events_url = reverse('app_crm:event-list')
+
+    def async_request(self, method, url, username, data=None):
+        response = self.client.post(
+            LOGIN_URL, {'username': username, 'password': PASSWORD},
+            format='json')
+        # headers of the ASGI scope, not WSGI environ keys
+        headers = {'authorization': 'Bearer ' + response.data['access']}
+        if data is not None:
+            headers['content_type'] = 'application/json'
+            data = json.dumps(data)
+        request = getattr(self.async_client, method)
+
+        async def send():
+            return await request(url, data, **headers)
+        return async_to_sync(send)()
+
+    def test_resolve(self):
+        """
+        resolve the customer list with both URLconfs
+        - Assert:
+            - the ASGI URLconf gives an async view, the WSGI one does not
+        """
+        self.assertTrue(asyncio.iscoroutinefunction(
+            resolve(self.customers_url, settings.ASGI_URLCONF).func))
+        self.assertFalse(asyncio.iscoroutinefunction(
+            resolve(self.customers_url).func))
+
+    def test_reads(self):
+        """
+        sales user gets the lists and details through the ASGI server
+        - Assert:
+            - the lists are those of the sync views
+            - customer 5 is not found, out of their scope
+        """
+        for url in (self.customers_url, self.contracts_url, self.events_url):
+            response = self.async_request('get', url, 'user_sales')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = self.get_token_auth('user_sales').get(url)
+            self.assertEqual(response.json(), expected.json())
+        response = self.async_request(
+            'get', reverse('app_crm:customer-detail', args=[1]),
+            'user_sales')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], 1)
+        response = self.async_request(
+            'get', reverse('app_crm:customer-detail', args=[5]),
+            'user_sales')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_write(self):
+        """
+        sales user creates a prospect through the ASGI server
+        - Assert:
+            - the prospect is created and listed by the async view
+        """
+        response = self.async_request('post', self.customers_url,
+                                      'user_sales', PROSPECT_DATA)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.async_request('get', self.customers_url,
+                                      'user_sales')
+        self.assertIn(PROSPECT_DATA['email'],
+                      [item['email'] for item in response.json()['results']])
+
+    def asgi_get(self, url, username, send=None):
+        """
+        GET `url` through the ASGI application, as a server does: the
+        status and the body messages sent (to `send` too, if given).
+        """
+        response = self.client.post(
+            LOGIN_URL, {'username': username, 'password': PASSWORD},
+            format='json')
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'testserver'), (
+                b'authorization',
+                f'Bearer {response.data["access"]}'.encode())],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def collect(message):
+            messages.append(message)
+            if send is not None:
+                await send(message)
+        async_to_sync(ASGIHandler())(scope, receive, collect)
+        return messages[0]['status'], messages[1:]
+
+    def test_export(self):
+        """
+        management user exports the customers through the ASGI server,
+        one line per block
+        - Assert:
+            - 200 with one line per customer, sent one by one
+        """
+        with mock.patch('app_crm.export.blocks',
+                        functools.partial(export.blocks, size=1)):
+            status_code, messages = self.asgi_get(
+                reverse('app_crm:customers-export'), 'user_management')
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        ids = list(Customer.objects.order_by('pk').values_list('pk',
+                                                               flat=True))
+        self.assertEqual(
+            [json.loads(message['body'])['id'] for message in messages[:-1]],
+            ids)
+        self.assertEqual(messages[-1], {'type': 'http.response.body'})
+
+    def test_export_disconnect(self):
+        """
+        the client of an export goes away after the first line, with a
+        single read thread
+        - Assert:
+            - the export stops, its read thread is given back
+        """
+        async def send(message):
+            if message.get('body'):
+                raise OSError('client gone')
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        with mock.patch('app_crm.export.blocks',
+                        functools.partial(export.blocks, size=1)), \
+                mock.patch('app_crm.asynchronous.read_executor',
+                           return_value=executor):
+            with self.assertRaises(OSError):
+                self.asgi_get(reverse('app_crm:customers-export'),
+                              'user_management', send)
+            self.assertEqual(executor.submit(int).result(timeout=5), 0)
+        executor.shutdown()
@@ -0,0 +1,337 @@
+# app_crm/tests/test_bulk.py
+# created 18/10/2026 at 21:05 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_bulk.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from unittest import mock
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.db.models.signals import post_save, pre_save
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.models import Customer, Contract, Event
+from app_crm.visibility import verify
+from app_users.revocation import revocation_list
+from .setup import CustomTestCase
+
+# other imports & constants
+CUSTOMER = {
+    'first_name': 'Bulk',
+    'last_name': 'Customer',
+    'email': 'bulk.customer@gmail.com',
+    'phone_number': '+33123456789',
+    'mobile': '+33123456789',
+    'company_name': 'Bulk',
+    'is_customer': True,
+}
+CONTRACT = {
+    'project_name': 'Bulk',
+    'amount': 1000,
+    'payment_due_date': '2022-12-31T00:00:00Z',
+    'is_signed': True,
+    'customer': 1,
+    'support_contact_id': 3,
+}
+EVENT = {
+    'event_name': 'Bulk',
+    'event_date': '2022-12-31T00:00:00Z',
+    'attendees': 10,
+    'notes': 'Bulk',
+    'is_finished': False,
+    'contract_id': 3,
+}
+
+
+class BulkCreateTests(CustomTestCase):
+    """
+    In this class we are testing the bulk create endpoints.
+
+    - the items are created with the rules of a single creation
+    - an invalid item cancels the whole request, with per-item errors
+    - the number of queries does not grow with the number of items
+    """
+    customers_url = reverse('app_crm:customers-bulk')
+    contracts_url = reverse('app_crm:contract-bulk')
+    events_url = reverse('app_crm:event-bulk')
+
+    def test_customers(self):
+        """
+        sales user posts 2 customers and a prospect
+        - Assert:
+            - 201 with the 3 items
+            - the sales contact is the user for customers only
+            - the grants are inserted
+        """
+        test_user, user = self.get_token_auth_user('user_sales')
+        items = [CUSTOMER, CUSTOMER, {**CUSTOMER, 'is_customer': False}]
+        response = test_user.post(self.customers_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        created = Customer.objects.filter(first_name='Bulk')
+        self.assertEqual(
+            sorted(created.values_list('sales_contact_id', flat=True),
+                   key=str),
+            sorted([user.id, user.id, None], key=str))
+        self.assertEqual(verify(), [])
+
+    def test_item_errors(self):
+        """
+        the second of 2 customers misses its email
+        - Assert:
+            - 400 with an error for the second item only
+            - nothing is created
+        """
+        test_user = self.get_token_auth('user_sales')
+        items = [CUSTOMER, {**CUSTOMER, 'email': ''}]
+        response = test_user.post(self.customers_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('email', response.data[1])
+        self.assertFalse(Customer.objects.filter(first_name='Bulk').exists())
+
+    def test_contracts(self):
+        """
+        contracts with a customer, a missing customer and a prospect
+        - Assert:
+            - 400, the missing customer and the prospect are refused
+            - 201 without them, the support user sees the contract
+        """
+        test_user = self.get_token_auth('user_sales')
+        for customer in [999, 3]:
+            items = [CONTRACT, {**CONTRACT, 'customer': customer}]
+            response = test_user.post(self.contracts_url, items,
+                                      format='json')
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data[0], {})
+            self.assertIn('customer', response.data[1])
+        response = test_user.post(self.contracts_url, [CONTRACT],
+                                  format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        support = self.get_token_auth('user_support')
+        response = support.get(reverse(
+            'app_crm:contract-detail', kwargs={'pk': response.data[0]['id']}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_events(self):
+        """
+        events for a free contract, twice, for a contract with an event
+        and for a contract not signed
+        - Assert:
+            - 400 with an error for every item but the first
+        """
+        test_user = self.get_token_auth('user_sales')
+        items = [EVENT, EVENT, {**EVENT, 'contract_id': 1},
+                 {**EVENT, 'contract_id': 2}]
+        response = test_user.post(self.events_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        for error in response.data[1:]:
+            self.assertIn('contract_id', error)
+        response = test_user.post(self.events_url, [EVENT], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Event.objects.filter(contract_id=3).count(), 1)
+
+    def test_permissions(self):
+        """
+        bulk create as support and management
+        - Assert:
+            - 403
+        """
+        for username in ['user_support', 'user_management']:
+            test_user = self.get_token_auth(username)
+            response = test_user.post(self.customers_url, [CUSTOMER],
+                                      format='json')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_max_items(self):
+        """
+        more items than allowed, or none
+        - Assert:
+            - 400
+        """
+        test_user = self.get_token_auth('user_sales')
+        with mock.patch('app_crm.bulk.MAX_ITEMS', 2):
+            response = test_user.post(self.customers_url, [CUSTOMER] * 3,
+                                      format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = test_user.post(self.customers_url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_queries(self):
+        """
+        2 then 50 contracts
+        - Assert:
+            - the same number of queries
+        """
+        test_user = self.get_token_auth('user_sales')
+        counts = []
+        for size in [2, 50]:
+            revocation_list.refresh(force=True)
+            with CaptureQueriesContext(connection) as context:
+                response = test_user.post(self.contracts_url,
+                                          [CONTRACT] * size, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Contract.objects.filter(project_name='Bulk').count(),
+                         52)
+
+
+class BulkUpdateTests(CustomTestCase):
+    """
+    In this class we are testing the partial updates, single and bulk.
+
+    - only the changed columns are written, unchanged rows are skipped
+    - the rows with the same changes are written with one UPDATE
+    - the signed contracts and finished events guards hold per item
+    """
+    customers_url = reverse('app_crm:customers-bulk')
+    contracts_url = reverse('app_crm:contract-bulk')
+    events_url = reverse('app_crm:event-bulk')
+
+    def updates(self, context):
+        return [query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('UPDATE')]
+
+    def test_patch(self):
+        """
+        sales user patches a customer with its company name, then a new one
+        - Assert:
+            - nothing is written the first time
+            - the second UPDATE only sets the company name and date_updated
+        """
+        test_user = self.get_token_auth('user_sales')
+        url = reverse('app_crm:customer-detail', kwargs={'pk': 1})
+        date_updated = Customer.objects.get(pk=1).date_updated
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.patch(url, {'company_name': 'GitHub'},
+                                       format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.updates(context), [])
+        self.assertEqual(Customer.objects.get(pk=1).date_updated,
+                         date_updated)
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.patch(url, {'company_name': 'Patched'},
+                                       format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [update] = self.updates(context)
+        self.assertIn('"company_name"', update)
+        self.assertNotIn('"email"', update)
+        self.assertEqual(Customer.objects.get(pk=1).company_name, 'Patched')
+
+    def test_patch_signals(self):
+        """
+        sales user patches a customer
+        - Assert:
+            - pre_save and post_save are sent once
+        """
+        test_user = self.get_token_auth('user_sales')
+        url = reverse('app_crm:customer-detail', kwargs={'pk': 1})
+        received = []
+
+        def receiver(signal, **kwargs):
+            received.append(signal)
+
+        pre_save.connect(receiver, sender=Customer)
+        post_save.connect(receiver, sender=Customer)
+        try:
+            response = test_user.patch(url, {'company_name': 'Patched'},
+                                       format='json')
+        finally:
+            pre_save.disconnect(receiver, sender=Customer)
+            post_save.disconnect(receiver, sender=Customer)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(received, [pre_save, post_save])
+
+    def test_bulk(self):
+        """
+        sales user renames 2 customers alike and a prospect to its name
+        - Assert:
+            - 200 with the 3 items
+            - one UPDATE, the prospect is not written
+        """
+        test_user = self.get_token_auth('user_sales')
+        date_updated = Customer.objects.get(pk=3).date_updated
+        items = [{'id': 1, 'company_name': 'Bulk'},
+                 {'id': 2, 'company_name': 'Bulk'},
+                 {'id': 3, 'company_name': 'ZeratoR'}]
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.patch(self.customers_url, items,
+                                       format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data], [1, 2, 3])
+        self.assertEqual(len(self.updates(context)), 1)
+        self.assertEqual(
+            Customer.objects.filter(company_name='Bulk').count(), 2)
+        self.assertEqual(Customer.objects.get(pk=3).date_updated,
+                         date_updated)
+
+    def test_item_errors(self):
+        """
+        bulk updates with a signed contract, a finished event, a customer
+        turned prospect and unknown or repeated ids
+        - Assert:
+            - 400 with an error for these items only
+            - nothing is written
+        """
+        test_user = self.get_token_auth('user_sales')
+        cases = [
+            (self.contracts_url, [{'id': 2, 'amount': 1},
+                                  {'id': 1, 'amount': 1}], 'detail'),
+            (self.events_url, [{'id': 1, 'notes': 'Bulk'},
+                               {'id': 3, 'notes': 'Bulk'}], 'detail'),
+            (self.customers_url, [{'id': 2, 'company_name': 'Bulk'},
+                                  {'id': 1, 'is_customer': False}],
+             'is_customer'),
+            (self.customers_url, [{'id': 2, 'company_name': 'Bulk'},
+                                  {'id': 999}], 'id'),
+            (self.customers_url, [{'id': 2, 'company_name': 'Bulk'},
+                                  {'id': 2}], 'id'),
+        ]
+        for url, items, field in cases:
+            response = test_user.patch(url, items, format='json')
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data[0], {})
+            self.assertIn(field, response.data[1])
+        self.assertFalse(Contract.objects.filter(amount=1).exists())
+        self.assertFalse(Event.objects.filter(notes='Bulk').exists())
+        self.assertFalse(Customer.objects.filter(company_name='Bulk').exists())
+
+    def test_grants(self):
+        """
+        sales user gives an unsigned contract to the support user
+        - Assert:
+            - the support user sees the contract
+            - the grants match the rules
+        """
+        test_user = self.get_token_auth('user_sales')
+        response = test_user.patch(
+            self.contracts_url, [{'id': 2, 'support_contact_id': 3}],
+            format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(verify(), [])
+        support = self.get_token_auth('user_support')
+        response = support.get(reverse('app_crm:contract-detail',
+                                       kwargs={'pk': 2}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,114 @@
+# app_crm/tests/test_conditional.py
+# created 19/10/2026 at 17:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 17:50 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_conditional.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from unittest import mock
+
+# third party imports
+
+# django imports
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.models import Customer
+from app_crm.serializers import CustomerSerializer
+from app_users.revocation import revocation_list
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class ConditionalGetTests(CustomTestCase):
+    """
+    In this class we are testing the conditional GET of the CRM views.
+
+    - responses carry an ETag and a Last-Modified header
+    - a matching If-None-Match is answered 304 without serializing
+    - saving or deleting a row changes the ETag
+    """
+    customers_url = reverse('app_crm:customers-list')
+
+    def detail_url(self, pk):
+        return reverse('app_crm:customer-detail', kwargs={'pk': pk})
+
+    def test_headers(self):
+        """
+        GET a list and a detail
+        - Assert:
+            - ETag and Last-Modified headers
+            - the ETag depends on the user
+        """
+        test_user = self.get_token_auth('user_management')
+        for url in [self.customers_url, self.detail_url(1),
+                    reverse('app_crm:contract-list'),
+                    reverse('app_crm:event-list')]:
+            response = test_user.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('ETag', response)
+            self.assertIn('Last-Modified', response)
+        etag = test_user.get(self.detail_url(1))['ETag']
+        test_user = self.get_token_auth('user_sales')
+        self.assertNotEqual(test_user.get(self.detail_url(1))['ETag'], etag)
+
+    def test_not_modified(self):
+        """
+        GET again with If-None-Match
+        - Assert:
+            - 304 for the list and the detail
+            - 1 query each, nothing serialized
+        """
+        test_user = self.get_token_auth('user_sales')
+        for url in [self.customers_url, self.detail_url(1)]:
+            etag = test_user.get(url)['ETag']
+            revocation_list.refresh(force=True)
+            with mock.patch.object(CustomerSerializer, 'to_representation') \
+                    as to_representation, self.assertNumQueries(1):
+                response = test_user.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+            to_representation.assert_not_called()
+
+    def test_if_modified_since(self):
+        """
+        GET a detail with If-Modified-Since
+        - Assert:
+            - 304
+        """
+        test_user = self.get_token_auth('user_sales')
+        last_modified = test_user.get(self.detail_url(1))['Last-Modified']
+        response = test_user.get(self.detail_url(1),
+                                 HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes(self):
+        """
+        save, then delete a customer of the page
+        - Assert:
+            - the ETag of the list changes each time
+        """
+        test_user = self.get_token_auth('user_management')
+        etags = [test_user.get(self.customers_url)['ETag']]
+        customer = Customer.objects.order_by('-id').first()
+        customer.save()
+        etags.append(test_user.get(self.customers_url)['ETag'])
+        customer.delete()
+        response = test_user.get(self.customers_url,
+                                 HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etags.append(response['ETag'])
+        self.assertEqual(len(set(etags)), 3)
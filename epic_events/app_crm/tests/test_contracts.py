@@ -1,6 +1,6 @@
 # app_crm/tests/test_contracts.py
 # created 24/03/2022 at 10:22 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/04/2022 at 12:33 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 17:47 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/tests/test_contracts.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.9"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -149,7 +149,8 @@ class ContractEndpointTests(CustomTestCase):
         test_user = self.get_token_auth("user_management")
         response = test_user.get(self.contract_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Contract.objects.count(), len(response.data))
+        self.assertEqual(Contract.objects.count(),
+                         len(response.data['results']))
 
     def test_sales_get_contracts(self):
         """
@@ -162,7 +163,7 @@ class ContractEndpointTests(CustomTestCase):
         test_user, user = self.get_token_auth_user("user_sales")
         response = test_user.get(self.contract_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for contract in response.data:
+        for contract in response.data['results']:
             customer = Customer.objects.get(id=contract['customer'])
             self.assertEqual(customer.sales_contact_id.id, user.id)
 
@@ -177,7 +178,7 @@ class ContractEndpointTests(CustomTestCase):
         test_user, user = self.get_token_auth_user("user_support")
         response = test_user.get(self.contract_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data['results']:
             contract = Contract.objects.get(id=item['id'])
             self.assertIn(contract, Contract.objects.filter(
                 support_contact_id=user.id))
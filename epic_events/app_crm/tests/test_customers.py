@@ -1,6 +1,6 @@
 # app_crm/tests/customers.py
 # created 23/03/2022 at 12:08 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 30/03/2022 at 12:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 18:09 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/tests/customers.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.10"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -24,7 +24,7 @@ from rest_framework import status
 from rest_framework.reverse import reverse
 
 # local application imports
-from app_crm.models import Customer
+from app_crm.models import Customer, Contract
 from .setup import CustomTestCase
 
 # other imports & constants
@@ -152,7 +152,8 @@ class CustomersEndpointTests(CustomTestCase):
         test_user = self.get_token_auth('user_management')
         response = test_user.get(self.customers_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), Customer.objects.count())
+        self.assertEqual(len(response.data['results']),
+                         Customer.objects.count())
 
     def test_sales_get_customers(self):
         """
@@ -165,7 +166,7 @@ class CustomersEndpointTests(CustomTestCase):
         test_user, user = self.get_token_auth_user('user_sales')
         response = test_user.get(self.customers_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data['results']:
             if item['is_customer'] is True:
                 self.assertEqual(item['sales_contact_id'], user.id)
             else:
@@ -182,11 +183,29 @@ class CustomersEndpointTests(CustomTestCase):
         response = test_user.get(self.customers_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        for item in response.data:
+        for item in response.data['results']:
             customer = Customer.objects.get(id=item['id'])
             self.assertIn(customer, Customer.objects.filter(
                 contract__support_contact_id=user.id))
 
+    def test_support_get_customers_once(self):
+        """
+        support role sees a customer once
+        even when they follow several of its contracts
+        - Assert:
+            - status code 200
+            - every customer id is unique
+        """
+        test_user, user = self.get_token_auth_user("user_support")
+        for contract in Contract.objects.filter(customer=2):
+            contract.support_contact_id = user
+            contract.save()
+        response = test_user.get(self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(sorted(ids), sorted(set(ids)))
+        self.assertIn(2, ids)
+
     # OTHERS tests
     def test_other_http_methods(self):
         """
@@ -1,6 +1,6 @@
 # app_crm/tests/test_contracts.py
 # created 24/03/2022 at 10:22 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/04/2022 at 10:33 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 17:47 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/tests/test_contracts.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.9"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -217,7 +217,7 @@ class EventEndpointTests(CustomTestCase):
         test_user = self.get_token_auth("user_management")
         response = test_user.get(self.event_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Event.objects.count(), len(response.data))
+        self.assertEqual(Event.objects.count(), len(response.data['results']))
 
     def test_sales_get_event(self):
         """
@@ -232,7 +232,7 @@ class EventEndpointTests(CustomTestCase):
             contract_id__customer__sales_contact_id=user.id)
         response = test_user.get(self.event_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), len(own_events))
+        self.assertEqual(len(response.data['results']), len(own_events))
 
     def test_support_get_event(self):
         """
@@ -245,7 +245,7 @@ class EventEndpointTests(CustomTestCase):
         test_user, user = self.get_token_auth_user("user_support")
         response = test_user.get(self.event_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data['results']:
             self.assertEqual(
                 Event.objects.get(
                     contract_id=item['contract_id']).contract_id.support_contact_id.id, user.id)  # noqa: E501
@@ -0,0 +1,66 @@
+# app_crm/tests/test_explain.py
+# created 19/10/2026 at 05:00 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 05:00 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_explain.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.test import SimpleTestCase
+
+# local application imports
+from app_crm.management.commands.explain_crm_scopes import FULL_SCAN
+
+# other imports & constants
+SQLITE_PLAN = """\
+3 0 0 SCAN app_crm_customer USING INDEX app_crm_cus_sales_c_idx
+12 0 0 SCAN app_crm_contract
+20 0 0 SEARCH app_crm_event USING INDEX app_crm_eve_contr_idx (contract_id=?)
+"""
+POSTGRESQL_PLAN = """\
+Limit  (cost=0.29..4.31 rows=51 width=120)
+  ->  Index Scan Backward using app_crm_customer_pkey on app_crm_customer
+  ->  Seq Scan on app_crm_contract  (cost=0.00..18.50 rows=850 width=72)
+"""
+
+
+class FullScanTests(SimpleTestCase):
+    """
+    In this class we are testing the full scans found in the query plans
+    by explain_crm_scopes.
+
+    - a table read without index is a full scan
+    - a table read through an index is not
+    """
+
+    def test_sqlite(self):
+        """
+        SQLite plan with a full scan, an index scan and an index search
+        - Assert:
+            - only the table scanned without index is reported
+        """
+        self.assertEqual(FULL_SCAN['sqlite'].findall(SQLITE_PLAN),
+                         ['app_crm_contract'])
+
+    def test_postgresql(self):
+        """
+        PostgreSQL plan with an index scan and a sequential scan
+        - Assert:
+            - only the table read with a sequential scan is reported
+        """
+        self.assertEqual(FULL_SCAN['postgresql'].findall(POSTGRESQL_PLAN),
+                         ['app_crm_contract'])
@@ -0,0 +1,113 @@
+# app_crm/tests/test_export.py
+# created 18/10/2026 at 20:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:55 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_export.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import csv
+import io
+import json
+
+# third party imports
+
+# django imports
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.export import export_fields
+from app_crm.models import Customer, Contract, Event
+from app_users.models import User
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class ExportTests(CustomTestCase):
+    """
+    In this class we are testing the exports.
+
+    - the rows of the scope of the user are streamed, in NDJSON or CSV
+    - the list filters apply
+    - the export_crm command exports every row
+    """
+
+    def export(self, username, url_name, query=''):
+        test_user = self.get_token_auth(username)
+        response = test_user.get(reverse(url_name) + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        """
+        sales user exports the customers
+        - Assert:
+            - one JSON object per visible customer, with every field
+        """
+        response, content = self.export('user_sales',
+                                        'app_crm:customers-export')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        user = User.objects.get(username='user_sales')
+        self.assertEqual(
+            [row['id'] for row in rows],
+            sorted(Customer.objects.visible_to(user)
+                   .values_list('pk', flat=True)))
+        self.assertEqual(list(rows[0]), export_fields(Customer))
+
+    def test_csv(self):
+        """
+        support user exports the contracts in CSV
+        - Assert:
+            - a header, then one line per visible contract
+        """
+        response, content = self.export('user_support',
+                                        'app_crm:contract-export',
+                                        '?format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('contracts.csv', response['Content-Disposition'])
+        header, *rows = csv.reader(io.StringIO(content))
+        self.assertEqual(header, export_fields(Contract))
+        user = User.objects.get(username='user_support')
+        self.assertEqual(len(rows),
+                         Contract.objects.visible_to(user).count())
+
+    def test_filters(self):
+        """
+        management user exports the finished events
+        - Assert:
+            - the finished events only
+        """
+        _, content = self.export('user_management', 'app_crm:event-export',
+                                 '?is_finished=true')
+        self.assertEqual(
+            [json.loads(line)['id'] for line in content.splitlines()],
+            list(Event.objects.filter(is_finished=True).order_by('pk')
+                 .values_list('pk', flat=True)))
+
+    def test_command(self):
+        """
+        export every event with the export_crm command
+        - Assert:
+            - a header, then one line per event
+        """
+        stdout = io.StringIO()
+        call_command('export_crm', 'events', '--format', 'csv',
+                     '--chunk-size', '1', stdout=stdout)
+        header, *rows = csv.reader(io.StringIO(stdout.getvalue()))
+        self.assertEqual(header, export_fields(Event))
+        self.assertEqual(len(rows), Event.objects.count())
@@ -0,0 +1,242 @@
+# app_crm/tests/test_import.py
+# created 18/10/2026 at 21:25 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:25 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_import.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+import json
+import os
+import tempfile
+
+# third party imports
+
+# django imports
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+
+# local application imports
+from app_crm import export
+from app_crm.importing import import_rows
+from app_crm.models import Customer, Contract, Event, ImportCheckpoint
+from app_crm.visibility import verify
+from app_users.models import User
+from app_users.provisioning import read_rows
+from .setup import CustomTestCase
+
+# other imports & constants
+CUSTOMER = {
+    'first_name': 'Imported',
+    'last_name': 'Customer',
+    'email': 'imported.customer@gmail.com',
+    'phone_number': '+33123456789',
+    'mobile': '+33123456789',
+    'company_name': 'Imported',
+    'is_customer': True,
+    'sales_contact_id': 2,
+}
+
+
+def ndjson(rows):
+    return io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+
+
+class ImportTests(CustomTestCase):
+    """
+    In this class we are testing the imports.
+
+    - new rows are inserted, rows with an existing id update the object
+    - the sales contacts follow check_sales_contact, the grants are
+      refreshed
+    - the invalid rows are skipped and reported
+    - an interrupted import resumes after the last chunk committed
+    """
+
+    def test_customers(self):
+        """
+        import 2 customers, of a sales and a management user, a prospect
+        with a sales contact, an update of customer 1 and an invalid row
+        - Assert:
+            - 4 rows merged, 1 rejected
+            - only the sales contact of the sales user is kept
+            - customer 1 is updated, the grants match the rules
+        """
+        rows = [CUSTOMER, {**CUSTOMER, 'sales_contact_id': 1},
+                {**CUSTOMER, 'is_customer': False},
+                {**CUSTOMER, 'id': 1, 'company_name': 'Updated'},
+                {**CUSTOMER, 'email': 'invalid'}]
+        checkpoint, errors = import_rows(Customer, rows, chunk_size=2)
+        self.assertEqual((checkpoint.merged, checkpoint.rejected), (4, 1))
+        self.assertEqual(errors[0]['row'], 5)
+        self.assertIn('email', errors[0]['errors'])
+        self.assertEqual(
+            sorted(Customer.objects.filter(first_name='Imported')
+                   .values_list('sales_contact_id', flat=True), key=str),
+            sorted([2, 2, None, None], key=str))
+        self.assertEqual(Customer.objects.get(pk=1).company_name, 'Updated')
+        self.assertEqual(verify(), [])
+
+    def test_export_round_trip(self):
+        """
+        export the contracts in CSV, move contract 3 to customer 1 in the
+        file and import it
+        - Assert:
+            - every contract is merged, no new contract
+            - the contract moved, the grants match the rules
+        """
+        content = ''.join(export.stream(Contract.objects.all(), 'csv'))
+        lines = content.splitlines()
+        header = lines[0].split(',')
+        for number, line in enumerate(lines[1:], 1):
+            values = line.split(',')
+            if values[0] == '3':
+                values[header.index('customer')] = '1'
+                lines[number] = ','.join(values)
+        count = Contract.objects.count()
+        checkpoint, errors = import_rows(
+            Contract, read_rows(io.StringIO('\n'.join(lines)), 'csv'))
+        self.assertEqual(errors, [])
+        self.assertEqual(checkpoint.merged, count)
+        self.assertEqual(Contract.objects.count(), count)
+        self.assertEqual(Contract.objects.get(pk=3).customer_id, 1)
+        self.assertEqual(verify(), [])
+
+    def test_move_contract(self):
+        """
+        import contract 1, with its event, moved to customer 2
+        - Assert:
+            - the contract moved, the grants on customer 1 are dropped
+        """
+        contract = Contract.objects.get(pk=1)
+        checkpoint, errors = import_rows(Contract, [{
+            'id': 1, 'project_name': contract.project_name,
+            'amount': str(contract.amount),
+            'payment_due_date': contract.payment_due_date.isoformat(),
+            'is_signed': contract.is_signed, 'customer': 2}])
+        self.assertEqual((checkpoint.merged, errors), (1, []))
+        self.assertEqual(Contract.objects.get(pk=1).customer_id, 2)
+        self.assertEqual(verify(), [])
+
+    def test_business_rules(self):
+        """
+        import a contract of a prospect, events of an unsigned contract,
+        of a contract with an event and twice of the same contract, and
+        updates of a signed contract, a finished event and a customer
+        back to unsigned, unfinished and prospect
+        - Assert:
+            - only the first event of the free contract is merged
+            - the other rows are rejected with the errors of the API
+        """
+        contract = {'project_name': 'Imported', 'amount': '10.00',
+                    'payment_due_date': '2022-12-31T00:00:00Z',
+                    'is_signed': True, 'customer': 3}
+        checkpoint, errors = import_rows(Contract, [
+            contract, {**contract, 'id': 1, 'customer': 1,
+                       'is_signed': False}])
+        self.assertEqual((checkpoint.merged, checkpoint.rejected), (0, 2))
+        self.assertEqual([list(error['errors']) for error in errors],
+                         [['customer'], ['is_signed']])
+        self.assertTrue(Contract.objects.get(pk=1).is_signed)
+
+        event = {'event_name': 'Imported', 'event_date':
+                 '2022-12-31T00:00:00Z', 'attendees': 10, 'notes': 'notes'}
+        checkpoint, errors = import_rows(Event, [
+            {**event, 'contract_id': 2}, {**event, 'contract_id': 1},
+            {**event, 'contract_id': 3}, {**event, 'contract_id': 3},
+            {**event, 'id': 3, 'contract_id': 5, 'is_finished': False}])
+        self.assertEqual((checkpoint.merged, checkpoint.rejected), (1, 4))
+        self.assertEqual([error['row'] for error in errors], [1, 2, 4, 5])
+        self.assertEqual(Event.objects.filter(contract_id=3).count(), 1)
+        self.assertTrue(Event.objects.get(pk=3).is_finished)
+
+        checkpoint, errors = import_rows(Customer, [
+            {**CUSTOMER, 'id': 1, 'is_customer': False}])
+        self.assertEqual(list(errors[0]['errors']), ['is_customer'])
+        self.assertTrue(Customer.objects.get(pk=1).is_customer)
+        self.assertEqual(verify(), [])
+
+    def test_resume(self):
+        """
+        an import of 5 events stops after the first chunk of 2, then runs
+        again
+        - Assert:
+            - the first chunk is committed with the checkpoint
+            - the second run merges the 3 other rows only
+        """
+        # one signed contract per event
+        contracts = [Contract.objects.create(
+            project_name=f'Resume {i}', amount=10,
+            payment_due_date=timezone.now(), is_signed=True, customer_id=1)
+            for i in range(5)]
+        rows = [{'event_name': f'Imported {i}', 'event_date':
+                 '2022-12-31T00:00:00Z', 'attendees': 10, 'notes': 'notes',
+                 'contract_id': contract.pk}
+                for i, contract in enumerate(contracts)]
+
+        def interrupted():
+            yield from rows[:3]
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            import_rows(Event, interrupted(), key='events', chunk_size=2)
+        self.assertEqual(ImportCheckpoint.objects.get(key='events').rows, 2)
+        checkpoint, _ = import_rows(Event, rows, key='events', chunk_size=2)
+        self.assertEqual((checkpoint.rows, checkpoint.merged), (5, 5))
+        self.assertTrue(checkpoint.finished)
+        self.assertEqual(
+            Event.objects.filter(event_name__startswith='Imported').count(),
+            5)
+
+    def test_command(self):
+        """
+        import_crm with a file of customers, one invalid
+        - Assert:
+            - CommandError, the valid customer is merged
+            - a second run finds the import finished
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'customers.ndjson')
+            with open(path, 'w') as file:
+                file.write(ndjson([CUSTOMER, {'id': 'x'}]).getvalue())
+            stdout = io.StringIO()
+            with self.assertRaises(CommandError):
+                call_command('import_crm', 'customers', path,
+                             stdout=stdout, stderr=io.StringIO())
+            self.assertEqual(
+                Customer.objects.filter(first_name='Imported').count(), 1)
+            with self.assertRaises(CommandError):
+                call_command('import_crm', 'customers', path,
+                             stdout=stdout, stderr=io.StringIO())
+            self.assertEqual(
+                Customer.objects.filter(first_name='Imported').count(), 1)
+
+    def test_admin_upload(self):
+        """
+        management user uploads a file of customers on the admin website
+        - Assert:
+            - redirect to the changelist, the customer is merged
+        """
+        self.client.force_login(User.objects.get(username='user_management'))
+        upload = SimpleUploadedFile('customers.ndjson',
+                                    ndjson([CUSTOMER]).getvalue().encode())
+        response = self.client.post(
+            reverse('admin:app_crm_customer_import'), {'file': upload})
+        self.assertRedirects(
+            response, reverse('admin:app_crm_customer_changelist'))
+        self.assertTrue(
+            Customer.objects.filter(first_name='Imported').exists())
+        self.assertFalse(ImportCheckpoint.objects.exists())
@@ -0,0 +1,153 @@
+# app_crm/tests/test_kpi.py
+# created 18/10/2026 at 23:05 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 23:05 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_kpi.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from decimal import Decimal
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm import kpi
+from app_crm.importing import import_rows
+from app_crm.models import Customer, Contract, Event, SalesSummary
+from app_users.revocation import revocation_list
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class KPISummaryTests(CustomTestCase):
+    """
+    In this class we are testing the KPI summary tables and dashboards.
+
+    - the summaries follow every write: saves, deletes, bulk requests
+      and imports
+    - the dashboards read the summaries only, management only
+    """
+    sales_url = reverse('app_crm:dashboard-sales')
+    events_url = reverse('app_crm:dashboard-events')
+
+    def test_rebuild(self):
+        """
+        rebuild the summaries of the fixtures
+        - Assert:
+            - they matched the CRM tables before and after
+            - the row of the sales user holds their customers and contracts
+        """
+        self.assertEqual(kpi.verify(), [])
+        before = list(SalesSummary.objects.order_by('sales_contact').values())
+        kpi.rebuild()
+        self.assertEqual(kpi.verify(), [])
+        self.assertEqual(
+            [{**row, 'id': None} for row in before],
+            [{**row, 'id': None} for row in SalesSummary.objects.order_by(
+                'sales_contact').values()])
+        row = SalesSummary.objects.get(sales_contact=2)
+        self.assertEqual((row.customers, row.signed_contracts,
+                          row.signed_amount, row.unsigned_contracts),
+                         (2, 4, Decimal('4002.00'), 1))
+
+    def test_saves(self):
+        """
+        sign, move and overwrite contracts, update and delete events,
+        reassign, convert and delete customers
+        - Assert:
+            - the summaries match the CRM tables after every write
+        """
+        changes = [
+            (Contract, 2, {'is_signed': True, 'amount': 10}),
+            (Contract, 3, {'customer_id': 5}),
+            (Event, 1, {'attendees': 1, 'is_finished': True}),
+            (Customer, 2, {'sales_contact_id_id': 5}),
+            (Customer, 1, {'is_customer': False}),
+        ]
+        for model, pk, values in changes:
+            instance = model.objects.get(pk=pk)
+            for name, value in values.items():
+                setattr(instance, name, value)
+            instance.save()
+            self.assertEqual(kpi.verify(), [])
+        # saved over the row without being loaded
+        contract = Contract.objects.get(pk=4)
+        del contract._loaded_summary
+        contract.amount = 20
+        contract.save()
+        self.assertEqual(kpi.verify(), [])
+        Event.objects.get(pk=2).delete()
+        self.assertEqual(kpi.verify(), [])
+        Customer.objects.get(pk=2).delete()
+        self.assertEqual(kpi.verify(), [])
+
+    def test_bulk_and_import(self):
+        """
+        bulk patch contracts and customers, import contracts
+        - Assert:
+            - the summaries match the CRM tables
+        """
+        test_user = self.get_token_auth('user_sales')
+        response = test_user.patch(reverse('app_crm:contract-bulk'), [
+            {'id': 2, 'amount': 5, 'is_signed': True}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = test_user.patch(reverse('app_crm:customers-bulk'), [
+            {'id': 3, 'is_customer': True}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(kpi.verify(), [])
+        checkpoint, errors = import_rows(Contract, [
+            {'id': 1, 'project_name': 'Imported', 'amount': '7',
+             'payment_due_date': '2023-01-01T00:00:00Z', 'is_signed': True,
+             'customer': 5},
+            {'project_name': 'Imported', 'amount': '8',
+             'payment_due_date': '2023-01-01T00:00:00Z', 'is_signed': True,
+             'customer': 1},
+        ])
+        self.assertEqual((checkpoint.merged, errors), (2, []))
+        self.assertEqual(kpi.verify(), [])
+
+    def test_dashboards(self):
+        """
+        management user reads the dashboards, a sales user tries to
+        - Assert:
+            - one query each, with the totals and the months
+            - 403 for the sales user
+        """
+        test_user = self.get_token_auth('user_management')
+        revocation_list.refresh(force=True)
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.get(self.sales_url)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['sales_contact'], row['username'], row['customers'])
+             for row in response.data['sales_contacts']],
+            [(0, None, 0), (2, 'user_sales', 2), (5, 'extra_user_sales', 1)])
+        totals = response.data['totals']
+        self.assertEqual((totals['customers'], totals['prospects'],
+                          totals['conversion_rate']), (3, 2, 0.6))
+        response = test_user.get(self.events_url)
+        self.assertEqual(
+            [(str(row['month']), row['events'], row['finished_events'])
+             for row in response.data['months']],
+            [('2023-03-01', 3, 1)])
+        for url in [self.sales_url, self.events_url]:
+            response = self.get_token_auth('user_sales').get(url)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,6 +1,6 @@
 # app_crm/tests/test_models.py
 # created 28/03/2022 at 17:50 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/04/2022 at 10:48 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 18:05 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/tests/test_models.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.8"
+__version__ = "0.2.9"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -20,6 +20,7 @@ __status__ = "Development"
 # third party imports
 
 # django imports
+from django.db import connection
 
 # local application imports
 from app_crm.models import (
@@ -51,4 +52,19 @@ class TestModels(CustomTestCase):
         event = Event.objects.get(pk=1)
         self.assertEqual(str(event), 'upcoming with support (status: False)')  # noqa
         event = Event.objects.get(pk=2)
-        self.assertEqual(str(event), 'upcoming with no support (status: False)')  # noqa
\ No newline at end of file
+        self.assertEqual(str(event), 'upcoming with no support (status: False)')  # noqa
+
+
+class TestIndexes(CustomTestCase):
+    def test_indexes_are_created(self):
+        """
+        every index declared in the models Meta exists in the database
+        - Assert:
+            - the index name is found in the table constraints
+        """
+        for model in [Customer, Contract, Event]:
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table)
+            for index in model._meta.indexes:
+                self.assertIn(index.name, constraints)
@@ -0,0 +1,116 @@
+# app_crm/tests/test_pagination.py
+# created 18/10/2026 at 17:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 17:55 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_pagination.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.models import Customer
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class CursorPaginationTests(CustomTestCase):
+    """
+    In this class we are testing the cursor pagination
+    of the customers, contracts and events lists.
+
+    - every page has a 'next' and 'previous' link and no 'count'
+    - following the 'next' links returns every item once
+    - pages are never fetched with OFFSET nor counted with COUNT(*)
+    - filters and search are applied before pagination
+    """
+    customers_url = reverse('app_crm:customers-list')
+
+    def walk(self, client, url):
+        """ Follow the 'next' links and return every item """
+        items = []
+        while url is not None:
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            items.extend(response.data['results'])
+            url = response.data['next']
+        return items
+
+    def test_page_layout(self):
+        """
+        list endpoints return a cursor page
+        - Assert:
+            - results, next and previous keys
+            - no count key
+        """
+        test_user = self.get_token_auth('user_management')
+        for name in ['customers-list', 'contract-list', 'event-list']:
+            response = test_user.get(reverse(f'app_crm:{name}'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('results', response.data)
+            self.assertIn('next', response.data)
+            self.assertIn('previous', response.data)
+            self.assertNotIn('count', response.data)
+
+    def test_walk_every_page(self):
+        """
+        following next links returns every customer once
+        in descending id order
+        - Assert:
+            - ids are unique and sorted
+            - every customer is returned
+        """
+        test_user = self.get_token_auth('user_management')
+        items = self.walk(test_user, f'{self.customers_url}?page_size=2')
+        ids = [item['id'] for item in items]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(
+            ids, list(Customer.objects.order_by('-id')
+                      .values_list('id', flat=True)))
+
+    def test_pages_use_keyset(self):
+        """
+        a page after the first one is fetched with a keyset predicate
+        - Assert:
+            - no OFFSET and no COUNT in the page queries
+        """
+        test_user = self.get_token_auth('user_management')
+        first = test_user.get(f'{self.customers_url}?page_size=2')
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.get(first.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+            self.assertNotIn('COUNT(', query['sql'].upper())
+
+    def test_filters_before_pagination(self):
+        """
+        filters are applied before the cursor
+        - Assert:
+            - only prospects are returned with is_customer=false
+        """
+        test_user = self.get_token_auth('user_management')
+        items = self.walk(
+            test_user, f'{self.customers_url}?is_customer=false&page_size=1')
+        self.assertEqual(
+            len(items), Customer.objects.filter(is_customer=False).count())
+        for item in items:
+            self.assertFalse(item['is_customer'])
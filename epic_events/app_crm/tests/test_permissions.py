@@ -0,0 +1,87 @@
+# app_crm/tests/test_permissions.py
+# created 18/10/2026 at 19:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 19:50 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_permissions.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+
+# local application imports
+from app_crm.models import (
+    Customer,
+    Contract,
+    Event
+)
+from app_crm.permissions import is_visible
+from app_users.models import User
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class IsVisibleTests(CustomTestCase):
+    """
+    In this class we are testing is_visible(), used by every object
+    permission of the crm.
+
+    - objects fetched through visible_to(user) cost no query
+    - other objects cost a single EXISTS query
+    - the answer matches the role scopes
+    """
+
+    def test_scoped_objects_cost_no_query(self):
+        """
+        an object fetched through visible_to(user) is visible for free
+        - Assert:
+            - 0 query
+        """
+        for username in ['user_sales', 'user_support', 'user_management']:
+            user = User.objects.get(username=username)
+            for model in [Customer, Contract, Event]:
+                for obj in model.objects.visible_to(user):
+                    with self.assertNumQueries(0):
+                        self.assertTrue(is_visible(user, obj))
+
+    def test_other_objects_cost_one_query(self):
+        """
+        an object fetched without scope is checked with one query
+        - Assert:
+            - 1 query
+            - the answer matches the scope of the user
+        """
+        for username in ['user_sales', 'user_support', 'extra_user_sales']:
+            user = User.objects.get(username=username)
+            for model in [Customer, Contract, Event]:
+                scope = set(model.objects.visible_to(user)
+                            .values_list('pk', flat=True))
+                for obj in model.objects.all():
+                    with self.assertNumQueries(1):
+                        visible = is_visible(user, obj)
+                    self.assertEqual(visible, obj.pk in scope)
+
+    def test_scope_of_another_user(self):
+        """
+        an object fetched for a user is not visible for free to another
+        - Assert:
+            - the other user is answered with one query
+        """
+        sales = User.objects.get(username='user_sales')
+        other = User.objects.get(username='extra_user_sales')
+        customer = Customer.objects.visible_to(sales).get(pk=1)
+        with self.assertNumQueries(1):
+            self.assertFalse(is_visible(other, customer))
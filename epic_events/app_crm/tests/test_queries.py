@@ -0,0 +1,279 @@
+# app_crm/tests/test_queries.py
+# created 18/10/2026 at 18:05 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_queries.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.6"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm import visibility
+from app_crm.models import Customer, Contract, Event
+from app_users.models import User
+from app_users.revocation import revocation_list
+from .setup import CustomTestCase
+
+# other imports & constants
+SCALE = 2000
+CUSTOMER_DATA = {
+    'first_name': 'Customer',
+    'last_name': 'Budget',
+    'email': 'customer.budget@gmail.com',
+    'phone_number': '+33123456789',
+    'mobile': '+33123456789',
+    'company_name': 'Budget',
+    'is_customer': True,
+}
+
+
+class QueryBudgetTestCase(CustomTestCase):
+    """
+    Base class asserting that a request runs a fixed number of queries.
+
+    assertQueryBudget() runs the request against the fixtures, scales the
+    dataset to thousands of rows and runs it again: both runs must use
+    the same number of queries and stay within the budget, so any N+1
+    pattern fails the build.
+    """
+
+    def scale_dataset(self, size=SCALE):
+        """
+        Add `size` customers of user_sales, each with a signed contract
+        followed by user_support and an event, plus `size` prospects.
+        """
+        sales = User.objects.get(username='user_sales')
+        support = User.objects.get(username='user_support')
+        now = timezone.now()
+        customers = Customer.objects.bulk_create([
+            Customer(first_name='Scaled', last_name=f'Customer{i}',
+                     email=f'customer{i}@scaled.com', phone_number='0100',
+                     mobile='0600', company_name='Scaled', is_customer=True,
+                     sales_contact_id=sales)
+            for i in range(size)
+        ])
+        Customer.objects.bulk_create([
+            Customer(first_name='Scaled', last_name=f'Prospect{i}',
+                     email=f'prospect{i}@scaled.com', phone_number='0100',
+                     mobile='0600', company_name='Scaled')
+            for i in range(size)
+        ])
+        if customers[0].pk is None:
+            customers = Customer.objects.filter(first_name='Scaled',
+                                                is_customer=True)
+        contracts = Contract.objects.bulk_create([
+            Contract(project_name='Scaled', amount=10, payment_due_date=now,
+                     is_signed=True, customer=customer,
+                     support_contact_id=support)
+            for customer in customers
+        ])
+        if contracts[0].pk is None:
+            contracts = Contract.objects.filter(project_name='Scaled')
+        Event.objects.bulk_create([
+            Event(event_name='Scaled', event_date=now, attendees=10,
+                  notes='notes', contract_id=contract)
+            for contract in contracts
+        ])
+        visibility.rebuild()
+
+    def count_queries(self, request, prepare=None):
+        if prepare is not None:
+            prepare()
+        # the revoked tokens filter is loaded outside of the budget
+        revocation_list.reset()
+        revocation_list.refresh()
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertLess(response.status_code, 400, response.data)
+        return len(context.captured_queries)
+
+    def assertQueryBudget(self, budget, request, prepare=None):
+        """
+        `request` is called once on the fixtures and once on the scaled
+        dataset, it must use the same number of queries both times.
+        `prepare` is called before each run, outside of the budget.
+        """
+        small = self.count_queries(request, prepare)
+        self.scale_dataset()
+        large = self.count_queries(request, prepare)
+        self.assertEqual(small, large,
+                         f'{small} queries, then {large} once scaled')
+        self.assertLessEqual(large, budget)
+
+
+class CustomerQueryBudgetTests(QueryBudgetTestCase):
+    """
+    Query budgets of the customers endpoints.
+    Reads are authorized from the token claims, writes spend 1 query
+    to load the user.
+    """
+    customers_url = reverse('app_crm:customers-list')
+
+    def detail_url(self, pk):
+        return reverse('app_crm:customer-detail', kwargs={'pk': pk})
+
+    def test_list(self):
+        for username in ['user_management', 'user_sales', 'user_support']:
+            test_user = self.get_token_auth(username)
+            self.assertQueryBudget(
+                1, lambda: test_user.get(self.customers_url))
+
+    def test_retrieve(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(1, lambda: test_user.get(self.detail_url(1)))
+        test_user = self.get_token_auth('user_support')
+        self.assertQueryBudget(1, lambda: test_user.get(self.detail_url(2)))
+
+    def test_create(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            4, lambda: test_user.post(self.customers_url, CUSTOMER_DATA,
+                                      format='json'))
+
+    def test_update(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            3, lambda: test_user.put(self.detail_url(1), CUSTOMER_DATA,
+                                     format='json'),
+            prepare=lambda: Customer.objects.filter(pk=1).update(
+                last_name='Before'))
+
+
+class ContractQueryBudgetTests(QueryBudgetTestCase):
+    """
+    Query budgets of the contracts endpoints.
+    Reads are authorized from the token claims, writes spend 1 query
+    to load the user.
+    """
+    contract_url = reverse('app_crm:contract-list')
+    data = {
+        'project_name': 'Budget contract',
+        'amount': '100',
+        'payment_due_date': '2020-01-01',
+        'is_signed': False,
+        'customer': 1
+    }
+
+    def detail_url(self, pk):
+        return reverse('app_crm:contract-detail', kwargs={'pk': pk})
+
+    def test_list(self):
+        for username in ['user_management', 'user_sales', 'user_support']:
+            test_user = self.get_token_auth(username)
+            self.assertQueryBudget(
+                1, lambda: test_user.get(self.contract_url))
+
+    def test_retrieve(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(1, lambda: test_user.get(self.detail_url(1)))
+        test_user = self.get_token_auth('user_support')
+        self.assertQueryBudget(1, lambda: test_user.get(self.detail_url(3)))
+
+    def test_create(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            5, lambda: test_user.post(self.contract_url, self.data,
+                                      format='json'))
+
+    def test_update(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            5, lambda: test_user.put(self.detail_url(2),
+                                     {**self.data, 'customer': 2},
+                                     format='json'),
+            prepare=lambda: Contract.objects.filter(pk=2).update(
+                project_name='Before', amount=1))
+
+    def move_back_to_customer_2(self):
+        contract = Contract.objects.get(pk=2)
+        contract.customer_id = 2
+        contract.amount = 1
+        contract.save()
+
+    def test_reassign(self):
+        """
+        Moving a contract to another customer refreshes the visibility
+        of both customers and the KPI summaries with a fixed number of
+        queries.
+        """
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            10, lambda: test_user.put(self.detail_url(2), self.data,
+                                      format='json'),
+            prepare=self.move_back_to_customer_2)
+
+
+class EventQueryBudgetTests(QueryBudgetTestCase):
+    """
+    Query budgets of the events endpoints.
+    Reads are authorized from the token claims, writes spend 1 query
+    to load the user.
+    """
+    event_url = reverse('app_crm:event-list')
+    data = {
+        'event_name': 'Budget event',
+        'event_date': '2023-01-01',
+        'attendees': 10,
+        'notes': 'notes',
+        'is_finished': False,
+    }
+
+    def detail_url(self, pk):
+        return reverse('app_crm:event-detail', kwargs={'pk': pk})
+
+    def test_list(self):
+        for username in ['user_management', 'user_sales', 'user_support']:
+            test_user = self.get_token_auth(username)
+            self.assertQueryBudget(1, lambda: test_user.get(self.event_url))
+
+    def new_signed_contract(self):
+        self.contract = Contract.objects.create(
+            project_name='Budget contract', amount=10,
+            payment_due_date=timezone.now(), is_signed=True,
+            customer_id=1, support_contact_id_id=3)
+
+    def test_retrieve(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(1, lambda: test_user.get(self.detail_url(1)))
+        self.new_signed_contract()
+        event = Event.objects.create(
+            event_name='Budget event', event_date=timezone.now(),
+            attendees=10, notes='notes', contract_id=self.contract)
+        test_user = self.get_token_auth('user_support')
+        self.assertQueryBudget(
+            1, lambda: test_user.get(self.detail_url(event.pk)))
+
+    def test_create(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            6, lambda: test_user.post(
+                self.event_url, {**self.data, 'contract_id': self.contract.pk},
+                format='json'),
+            prepare=self.new_signed_contract)
+
+    def test_update(self):
+        test_user = self.get_token_auth('user_sales')
+        self.assertQueryBudget(
+            5, lambda: test_user.put(
+                self.detail_url(1), {**self.data, 'contract_id': 1},
+                format='json'),
+            prepare=lambda: Event.objects.filter(pk=1).update(
+                event_name='Before', event_date=timezone.now()))
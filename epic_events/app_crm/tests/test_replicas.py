@@ -0,0 +1,195 @@
+# app_crm/tests/test_replicas.py
+# created 19/10/2026 at 01:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 19:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_replicas.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import os
+import tempfile
+import time
+from unittest import mock
+
+# third party imports
+
+# django imports
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.models import Customer
+from app_crm.replicas import (
+    STICKY_SECONDS,
+    pin_key,
+    replica_lag,
+    replicas
+)
+from app_users.models import User
+from app_users.throttling import get_store
+from .setup import CustomTestCase
+from .test_customers import PROSPECT_DATA
+
+# other imports & constants
+REPLICA = 'replica'
+# only in the replica database
+REPLICA_CUSTOMER_ID = 1000
+
+
+def postgresql(row):
+    """ PostgreSQL connection whose queries return `row` """
+    connection = mock.MagicMock(vendor='postgresql')
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = row
+    return connection
+
+
+class ReplicaRoutingTests(CustomTestCase):
+    """
+    In this class we are testing the routing of the reads to a replica,
+    a second SQLite database migrated for the tests.
+
+    - the safe requests read from the replica, the writes go to default
+    - the reads of a user go to default after their own write
+    - a lagging, failing or not receiving replica is left out
+    - the writes pin the user to default only when there are replicas
+    """
+    customers_url = reverse('app_crm:customers-list')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # added once the test databases are set up, it is neither
+        # created by the test runner nor wrapped in the test transaction
+        cls.directory = tempfile.TemporaryDirectory()
+        databases = connections.configure_settings({
+            'default': connections.settings['default'],
+            REPLICA: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+            },
+        })
+        connections.settings[REPLICA] = databases[REPLICA]
+        call_command('migrate', database=REPLICA, run_syncdb=True,
+                     verbosity=0)
+        Customer.objects.using(REPLICA).bulk_create([Customer(
+            id=REPLICA_CUSTOMER_ID, first_name='Replica', last_name='Only',
+            email='replica.only@gmail.com', phone_number='+33123456789',
+            mobile='+33123456789', company_name='Replica')])
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        replicas.aliases = [REPLICA]
+        replicas.clear()
+
+    def tearDown(self):
+        replicas.aliases = []
+        replicas.clear()
+        super().tearDown()
+
+    def list_ids(self, test_user):
+        response = test_user.get(self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_reads(self):
+        """
+        management user gets the customers
+        - Assert:
+            - the list and the detail are read from the replica
+        """
+        test_user = self.get_token_auth('user_management')
+        self.assertEqual(self.list_ids(test_user), [REPLICA_CUSTOMER_ID])
+        response = test_user.get(reverse('app_crm:customer-detail',
+                                         args=[REPLICA_CUSTOMER_ID]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_read_your_writes(self):
+        """
+        sales user creates a prospect then lists the customers
+        - Assert:
+            - the prospect is written to default only
+            - the list is read from default, with the prospect
+            - another user still reads from the replica
+        """
+        test_user = self.get_token_auth('user_sales')
+        response = test_user.post(self.customers_url, PROSPECT_DATA,
+                                  format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Customer.objects.using(REPLICA).filter(
+            pk=response.data['id']).exists())
+        ids = self.list_ids(test_user)
+        self.assertIn(response.data['id'], ids)
+        self.assertNotIn(REPLICA_CUSTOMER_ID, ids)
+
+        test_user = self.get_token_auth('user_management')
+        self.assertEqual(self.list_ids(test_user), [REPLICA_CUSTOMER_ID])
+
+    def test_lagging_replica(self):
+        """
+        replica 60 seconds behind, then failing
+        - Assert:
+            - the reads go to default
+            - the lag is measured once per check interval
+        """
+        test_user = self.get_token_auth('user_management')
+        with mock.patch('app_crm.replicas.replica_lag',
+                        return_value=60) as replica_lag:
+            self.assertNotIn(REPLICA_CUSTOMER_ID, self.list_ids(test_user))
+            self.assertNotIn(REPLICA_CUSTOMER_ID, self.list_ids(test_user))
+        self.assertEqual(replica_lag.call_count, 1)
+
+        replicas.clear()
+        with mock.patch('app_crm.replicas.replica_lag',
+                        side_effect=DatabaseError):
+            self.assertNotIn(REPLICA_CUSTOMER_ID, self.list_ids(test_user))
+
+    def test_stopped_receiver(self):
+        """
+        lag of a PostgreSQL replica not receiving the WAL, caught up with
+        the primary, then 30 seconds behind it
+        - Assert:
+            - down (None), then 0 and 30 seconds
+        """
+        for row, lag in [((False, True, 0), None), ((True, True, 600), 0.0),
+                         ((True, False, 30), 30.0)]:
+            databases = {DEFAULT_DB_ALIAS: postgresql(('0/3000000',)),
+                         REPLICA: postgresql(row)}
+            with mock.patch('app_crm.replicas.connections', databases):
+                self.assertEqual(replica_lag(REPLICA), lag)
+
+    def test_no_replicas(self):
+        """
+        sales user creates a prospect with no replicas set
+        - Assert:
+            - the user is not pinned to default
+        """
+        replicas.aliases = []
+        test_user = self.get_token_auth('user_sales')
+        response = test_user.post(self.customers_url, PROSPECT_DATA,
+                                  format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username='user_sales')
+        window = int(time.time() // STICKY_SECONDS)
+        self.assertEqual([get_store().get(pin_key(user.pk, window - shift))
+                          for shift in (0, 1)], [0, 0])
@@ -0,0 +1,203 @@
+# app_crm/tests/test_search.py
+# created 18/10/2026 at 21:55 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:04 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_search.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.1"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.models import Customer
+from app_crm.search import has_trigrams
+from app_users.revocation import revocation_list
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class FullTextSearchTests(CustomTestCase):
+    """
+    In this class we are testing the full-text search of the lists.
+
+    - every word of the query matches the start of a word
+    - the results are in the scope of the user, ranked
+    - the index follows the writes
+    """
+    customers_url = reverse('app_crm:customers-list')
+    events_url = reverse('app_crm:event-list')
+
+    def search(self, username, url, query, page_size=50):
+        test_user = self.get_token_auth(username)
+        response = test_user.get(url, {'q': query, 'page_size': page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_scope(self):
+        """
+        sales and management users search 'doe' and 'kyria'
+        - Assert:
+            - sales user finds their customers, not customer 5
+            - management user finds customer 5
+        """
+        self.assertEqual(
+            sorted(self.search('user_sales', self.customers_url, 'doe')),
+            [1, 2])
+        self.assertEqual(
+            self.search('user_sales', self.customers_url, 'kyria'), [])
+        self.assertEqual(
+            self.search('user_management', self.customers_url, 'kyria'),
+            [5])
+
+    def test_words(self):
+        """
+        search a prefix, several words, an email and no word
+        - Assert:
+            - every word must match the start of a word
+        """
+        for query, ids in [('ubi', [2]), ('jane doe', [2]),
+                           ('john ubisoft', []),
+                           ('adrien.nougaret@gmail.com', [3]),
+                           ('!!', [])]:
+            self.assertEqual(
+                self.search('user_sales', self.customers_url, query), ids)
+
+    def test_ranking(self):
+        """
+        a customer named Doe twice
+        - Assert:
+            - it comes first
+            - the pages of one result give the same results, once
+        """
+        customer = Customer.objects.create(
+            first_name='Doe', last_name='Doe', email='doe@doe.com',
+            phone_number='0100', mobile='0600', company_name='Doe',
+            is_customer=False)
+        ranked = self.search('user_sales', self.customers_url, 'doe')
+        self.assertEqual(ranked[0], customer.pk)
+        self.assertEqual(sorted(ranked), [1, 2, customer.pk])
+
+        test_user = self.get_token_auth('user_sales')
+        url = f'{self.customers_url}?q=doe&page_size=1'
+        ids = []
+        while url is not None:
+            response = test_user.get(url)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(ids, ranked)
+
+    def test_writes(self):
+        """
+        rename a customer, bulk create another one
+        - Assert:
+            - the new names are found, the old one is not
+        """
+        Customer.objects.filter(pk=1).update(last_name='Smith',
+                                             email='smith@gmail.com')
+        Customer.objects.bulk_create([Customer(
+            first_name='Anna', last_name='Smithson', email='a@b.com',
+            phone_number='0100', mobile='0600', company_name='Bulk')])
+        ids = self.search('user_management', self.customers_url, 'smith')
+        self.assertEqual(len(ids), 2)
+        self.assertIn(1, ids)
+        self.assertEqual(
+            self.search('user_management', self.customers_url, 'john doe'),
+            [])
+
+    def test_events(self):
+        """
+        sales user searches the events
+        - Assert:
+            - names are searched, in the scope of the user
+            - the `search` parameter follows the contract to the customer
+        """
+        self.assertEqual(
+            sorted(self.search('user_sales', self.events_url, 'support')),
+            [1, 2])
+        test_user = self.get_token_auth('user_sales')
+        for query, count in [('Doe', 3), ('Nougaret', 0)]:
+            response = test_user.get(self.events_url, {'search': query})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), count)
+
+    def test_typo(self):
+        """
+        search a misspelled company
+        - Assert:
+            - it is found by trigram similarity
+        """
+        if connection.vendor != 'postgresql' or not has_trigrams(connection):
+            self.skipTest('pg_trgm is not installed')
+        self.assertEqual(
+            self.search('user_sales', self.customers_url, 'ubisfot'), [2])
+
+
+class GlobalSearchTests(CustomTestCase):
+    """
+    In this class we are testing the search of the three lists at once.
+
+    - the results of every type are ranked together, in the scope of the
+      user, with one query
+    """
+    url = reverse('app_crm:search')
+
+    def test_scope(self):
+        """
+        sales user searches 'support', support user searches 'project'
+        - Assert:
+            - the sales user finds the 2 events of their customers
+            - the support user only finds the contract they follow
+        """
+        for username, query, results in [
+                ('user_sales', 'support', [('event', 1), ('event', 2)]),
+                ('user_support', 'project', [('contract', 3)])]:
+            test_user = self.get_token_auth(username)
+            response = test_user.get(self.url, {'q': query})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                sorted((item['type'], item['id'])
+                       for item in response.data['results']),
+                results)
+
+    def test_types(self):
+        """
+        management user searches 'project 3', 'doe' with a limit, and ''
+        - Assert:
+            - contracts 3 and 5, with their url, in one query
+            - the limit is applied
+            - no results without a word
+        """
+        test_user = self.get_token_auth('user_management')
+        revocation_list.refresh(force=True)
+        with CaptureQueriesContext(connection) as context:
+            response = test_user.get(self.url, {'q': 'project 3'})
+        self.assertEqual(len(context.captured_queries), 1)
+        results = response.data['results']
+        self.assertEqual(sorted(item['id'] for item in results), [3, 5])
+        self.assertEqual(results[0]['type'], 'contract')
+        self.assertEqual(results[0]['label'], 'Project 3')
+        self.assertTrue(results[0]['url'].endswith(
+            f'/crm/contracts/{results[0]["id"]}/'))
+        response = test_user.get(self.url, {'q': 'doe', 'limit': 1})
+        self.assertEqual(response.data['results'][0]['type'], 'customer')
+        self.assertEqual(len(response.data['results']), 1)
+        response = test_user.get(self.url, {'q': ' '})
+        self.assertEqual(response.data['results'], [])
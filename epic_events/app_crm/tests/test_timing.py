@@ -0,0 +1,97 @@
+# app_crm/tests/test_timing.py
+# created 19/10/2026 at 04:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 04:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_timing.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import json
+
+# third party imports
+
+# django imports
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+def server_timing(response):
+    """ The metrics of the Server-Timing header, by name """
+    metrics = {}
+    for metric in response['Server-Timing'].split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+class ServerTimingTests(CustomTestCase):
+    """
+    In this class we are testing the Server-Timing header.
+
+    - it has the duration of each phase of the request
+    - it has the count and the duration of the SQL queries
+    - the slow requests are logged
+    """
+    customers_url = reverse('app_crm:customers-list')
+
+    def test_header(self):
+        """
+        management user gets the customers
+        - Assert:
+            - the auth, perm, serialize, render, db, app and total metrics
+            - the count of the SQL queries
+        """
+        test_user = self.get_token_auth('user_management')
+        with CaptureQueriesContext(connection) as queries:
+            response = test_user.get(self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = server_timing(response)
+        for name in ('auth', 'perm', 'serialize', 'render', 'db', 'app',
+                     'total'):
+            self.assertGreaterEqual(float(metrics[name]['dur']), 0)
+        self.assertEqual(metrics['db']['desc'],
+                         f'"{len(queries)} queries"')
+
+    def test_unauthenticated(self):
+        """
+        unauthenticated user gets the customers
+        - Assert:
+            - the header is sent with the error
+        """
+        response = self.client.get(self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('total', server_timing(response))
+
+    @override_settings(SERVER_TIMING_LOG_MS=0)
+    def test_log(self):
+        """
+        management user gets the customers, slower than the threshold
+        - Assert:
+            - the request is logged as JSON, with its metrics
+        """
+        with self.assertLogs('app_crm.timing', 'INFO') as logs:
+            test_user = self.get_token_auth('user_management')
+            test_user.get(self.customers_url)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['path'], self.customers_url)
+        self.assertEqual(record['status'], status.HTTP_200_OK)
+        self.assertIn('serialize_ms', record)
+        self.assertIn('sql_queries', record)
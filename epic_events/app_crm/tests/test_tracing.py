@@ -0,0 +1,125 @@
+# app_crm/tests/test_tracing.py
+# created 19/10/2026 at 03:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 03:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_tracing.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import base64
+import json
+
+# third party imports
+import sentry_sdk
+
+# django imports
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.management.commands.bench_tracing import DSN, LocalTransport
+from epic_events.tracing import TracesSampler
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+def sampling_context(url, role=None, parent_sampled=None):
+    """ Sampling context of a WSGI request with a token of `role` """
+    environ = {'PATH_INFO': url}
+    if role is not None:
+        claims = base64.urlsafe_b64encode(
+            json.dumps({'role': role}).encode()).decode().rstrip('=')
+        environ['HTTP_AUTHORIZATION'] = f'Bearer header.{claims}.signature'
+    return {'wsgi_environ': environ, 'parent_sampled': parent_sampled}
+
+
+class TracingTests(CustomTestCase):
+    """
+    In this class we are testing the sampling of the traces.
+
+    - the rate depends on the endpoint and the role
+    - it drops when an endpoint gets more requests
+    - slow and failed requests are traced anyway
+    """
+    customers_url = reverse('app_crm:customers-list')
+    events_url = reverse('app_crm:event-list')
+
+    def test_rates(self):
+        """
+        customers and events lists, sales and management tokens
+        - Assert:
+            - the rate of the endpoint times the weight of the role
+            - the decision of the parent trace is kept
+        """
+        sampler = TracesSampler(
+            default_rate=0.5, endpoint_rates={'app_crm:event-list': 0.2},
+            role_weights={'management': 0.5}, max_per_second=1000)
+        self.assertEqual(sampler(sampling_context(
+            self.customers_url, 'sales')), 0.5)
+        self.assertEqual(sampler(sampling_context(
+            self.events_url, 'management')), 0.1)
+        self.assertEqual(sampler(sampling_context(self.events_url)), 0.2)
+        self.assertIs(sampler(sampling_context(
+            self.events_url, 'sales', parent_sampled=True)), True)
+
+    def test_adaptive(self):
+        """
+        200 requests of the customers list at once, 1 trace per second
+        - Assert:
+            - the rate drops under 1 trace per second
+            - the events list keeps its rate
+        """
+        sampler = TracesSampler(default_rate=0.5, max_per_second=1,
+                                window=10)
+        for _ in range(200):
+            rate = sampler(sampling_context(self.customers_url))
+        self.assertAlmostEqual(rate, 1 / 20, delta=0.01)
+        self.assertEqual(sampler(sampling_context(self.events_url)), 0.5)
+
+    def traced_get(self, url):
+        """ GET `url` in a transaction of a client sampling no trace """
+        transport = LocalTransport()
+        hub = sentry_sdk.Hub(sentry_sdk.Client(
+            DSN, transport=transport, traces_sample_rate=0.0))
+        test_user = self.get_token_auth('user_management')
+        with hub, hub.start_transaction(name=url) as transaction:
+            response = test_user.get(url)
+        hub.flush()
+        return response, transaction, transport
+
+    def test_fast_request(self):
+        """
+        GET the customers list
+        - Assert:
+            - its transaction is not sent
+        """
+        response, transaction, transport = self.traced_get(
+            self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(transaction.sampled)
+
+    @override_settings(TRACES_SLOW_REQUEST_MS=0)
+    def test_slow_request(self):
+        """
+        GET the customers list, slower than the threshold
+        - Assert:
+            - its transaction is sent, tagged as kept because slow
+        """
+        response, transaction, transport = self.traced_get(
+            self.customers_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(transaction.sampled)
+        self.assertEqual(transaction._tags['kept'], 'slow')
+        self.assertGreaterEqual(transport.events, 1)
@@ -0,0 +1,216 @@
+# app_crm/tests/test_visibility.py
+# created 18/10/2026 at 20:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/tests/test_visibility.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+from io import StringIO
+from unittest import mock
+
+# third party imports
+
+# django imports
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+# local application imports
+from app_crm import visibility
+from app_crm.models import (
+    Customer,
+    Contract,
+    Event,
+    VisibleObject
+)
+from app_users.models import User
+from .setup import CustomTestCase
+
+# other imports & constants
+
+
+class VisibilityTests(CustomTestCase):
+    """
+    In this class we are testing the VisibleObject table.
+
+    - it matches the business rules after every save and delete
+    - visible_to() reads the same scopes as the rules
+    - rebuild_visibility rebuilds and verifies it
+    """
+
+    def assertTableMatchesRules(self):
+        self.assertEqual(visibility.verify(), [])
+        for user in User.objects.all():
+            for model in [Customer, Contract, Event]:
+                self.assertCountEqual(
+                    model.objects.visible_to(user).values_list('pk',
+                                                               flat=True),
+                    model.objects.rules(user).values_list('pk', flat=True))
+
+    def grants(self, username, object_type):
+        return set(VisibleObject.objects.filter(
+            user__username=username, object_type=object_type,
+        ).values_list('object_id', flat=True))
+
+    def test_fixtures(self):
+        """
+        the fixtures are loaded with their grants
+        - Assert:
+            - the table matches the rules
+            - support users are only granted events writes
+        """
+        self.assertTableMatchesRules()
+        self.assertTrue(VisibleObject.objects.exists())
+        self.assertFalse(VisibleObject.objects.filter(
+            user__role='support', can_write=True).exclude(
+            object_type='event').exists())
+
+    def test_reassign_sales_contact(self):
+        """
+        a customer given to another sales user
+        - Assert:
+            - the customer, its contracts and events follow
+        """
+        customer = Customer.objects.get(pk=1)
+        customer.sales_contact_id = User.objects.get(
+            username='extra_user_sales')
+        customer.save()
+        self.assertNotIn(1, self.grants('user_sales', 'customer'))
+        self.assertIn(1, self.grants('extra_user_sales', 'customer'))
+        self.assertIn(1, self.grants('extra_user_sales', 'contract'))
+        self.assertTableMatchesRules()
+
+    def test_reassign_support_contact(self):
+        """
+        a contract given to another support user
+        - Assert:
+            - the new support user sees the contract and its customer
+            - the previous one loses them
+        """
+        contract = Contract.objects.get(pk=1)
+        contract.support_contact_id = User.objects.get(
+            username='user_support')
+        contract.save()
+        self.assertIn(1, self.grants('user_support', 'contract'))
+        self.assertIn(1, self.grants('user_support', 'customer'))
+        self.assertNotIn(1, self.grants('extra_user_support', 'customer'))
+        self.assertTableMatchesRules()
+
+    def test_move_contract(self):
+        """
+        a contract moved to another customer
+        - Assert:
+            - both customers are refreshed
+        """
+        contract = Contract.objects.get(pk=4)
+        contract.customer = Customer.objects.get(pk=5)
+        contract.save()
+        self.assertIn(4, self.grants('extra_user_sales', 'contract'))
+        self.assertNotIn(4, self.grants('user_sales', 'contract'))
+        self.assertTableMatchesRules()
+
+    def test_unchanged_scope(self):
+        """
+        a save that does not touch the scope fields
+        - Assert:
+            - does not refresh the table
+        """
+        contract = Contract.objects.get(pk=1)
+        contract.project_name = 'Renamed'
+        with self.assertNumQueries(1):
+            contract.save()
+
+    def test_create_and_delete(self):
+        """
+        created and deleted objects
+        - Assert:
+            - the grants are added, then removed
+        """
+        contract = Contract.objects.create(
+            project_name='New', amount=10, payment_due_date=timezone.now(),
+            is_signed=True, customer_id=5,
+            support_contact_id=User.objects.get(username='user_support'))
+        event = Event.objects.create(
+            event_name='New', event_date=timezone.now(), attendees=10,
+            notes='notes', contract_id=contract)
+        self.assertIn(5, self.grants('user_support', 'customer'))
+        self.assertIn(event.pk, self.grants('user_support', 'event'))
+        self.assertTableMatchesRules()
+
+        contract.delete()
+        self.assertNotIn(5, self.grants('user_support', 'customer'))
+        self.assertFalse(VisibleObject.objects.filter(
+            object_type='event', object_id=event.pk).exists())
+        Customer.objects.get(pk=2).delete()
+        self.assertFalse(VisibleObject.objects.filter(
+            object_type='customer', object_id=2).exists())
+        self.assertTableMatchesRules()
+
+    def test_role_change(self):
+        """
+        a sales user moved to management
+        - Assert:
+            - their grants are dropped
+        """
+        user = User.objects.get(username='user_sales')
+        user.role = 'management'
+        user.save()
+        self.assertFalse(VisibleObject.objects.filter(user=user).exists())
+        user.role = 'sales'
+        user.save()
+        self.assertIn(1, self.grants('user_sales', 'customer'))
+        self.assertTableMatchesRules()
+
+    def test_delete_customer(self):
+        """
+        a customer deleted with its contracts
+        - Assert:
+            - the grants of the customer are not refreshed
+            - the table matches the rules
+        """
+        with mock.patch.object(visibility, 'refresh_customers') as refresh:
+            Customer.objects.get(pk=2).delete()
+        refresh.assert_not_called()
+        self.assertFalse(visibility.deleted_customers.get())
+        self.assertTableMatchesRules()
+
+    def test_last_login(self):
+        """
+        a user saved without their role, e.g. on login
+        - Assert:
+            - only the update is run
+        """
+        user = User.objects.get(username='user_sales')
+        user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+
+    def test_rebuild_command(self):
+        """
+        rows inserted without signals
+        - Assert:
+            - --verify fails until the table is rebuilt
+        """
+        Customer.objects.bulk_create([
+            Customer(first_name='Bulk', last_name=f'Customer{i}',
+                     email=f'bulk{i}@epicevents.com', phone_number='0100',
+                     mobile='0600', company_name='Bulk', is_customer=True,
+                     sales_contact_id=User.objects.get(username='user_sales'))
+            for i in range(10)
+        ])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_visibility', '--verify-only',
+                         stdout=StringIO())
+        call_command('rebuild_visibility', '--verify', stdout=StringIO())
+        self.assertTableMatchesRules()
@@ -0,0 +1,209 @@
+# app_crm/timing.py
+# created 19/10/2026 at 03:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 03:50 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/timing.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+# third party imports
+from rest_framework.response import Response
+
+# django imports
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+# local application imports
+
+# other imports & constants
+logger = logging.getLogger(__name__)
+
+# timer of the current request, None outside of server_timing
+current_timer = contextvars.ContextVar('current_timer', default=None)
+
+
+class RequestTimer:
+    """
+    Durations of the phases of a request and of its SQL queries.
+
+    The SQL queries run during a phase are counted in `sql_time` only,
+    not in the phase: auth, perm, serialize... are the Python time of
+    the phase. What no phase covers is counted as `app`.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # phase -> seconds
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        start, sql_time = time.perf_counter(), self.sql_time
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start - (self.sql_time - sql_time))
+
+    def metrics(self):
+        """ Milliseconds of each phase, of the SQL queries and in total """
+        total = time.perf_counter() - self.start
+        metrics = {name: seconds * 1000
+                   for name, seconds in self.phases.items()}
+        metrics['db'] = self.sql_time * 1000
+        metrics['app'] = max(0.0, total * 1000 - sum(metrics.values()))
+        metrics['total'] = total * 1000
+        return metrics
+
+    def header(self, metrics):
+        """ Server-Timing header value of `metrics` """
+        return ', '.join(
+            f'{name};dur={duration:.2f}' + (
+                f';desc="{self.sql_count} queries"' if name == 'db' else '')
+            for name, duration in metrics.items())
+
+
+def sql_timer(execute, sql, params, many, context):
+    """ Execute wrapper counting the queries of the current request """
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.sql_count += 1
+        timer.sql_time += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def install_sql_timer(sender, connection, **kwargs):
+    # connections are created by each thread, ASGI ones included
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+@contextmanager
+def phase(name):
+    """ Time a phase of the current request, if it is timed """
+    timer = current_timer.get()
+    if timer is None:
+        yield
+    else:
+        with timer.phase(name):
+            yield
+
+
+def timed(name, function):
+    def wrapper(*args, **kwargs):
+        with phase(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class ServerTimingMixin:
+    """
+    Time the phases of the DRF views for the Server-Timing header: the
+    authentication, the permission and throttling checks, the
+    serialization and the rendering of the response.
+    """
+
+    def perform_authentication(self, request):
+        with phase('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with phase('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with phase('perm'):
+            super().check_object_permissions(request, obj)
+
+    def check_throttles(self, request):
+        with phase('throttle'):
+            super().check_throttles(request)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        serializer.to_representation = timed('serialize',
+                                             serializer.to_representation)
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        if (current_timer.get() is not None
+                and isinstance(response, Response)):
+            # rendered here rather than by the handler, to be timed
+            with phase('render'):
+                response.render()
+        return response
+
+
+def finish(timer, request, response, log_ms):
+    metrics = timer.metrics()
+    response['Server-Timing'] = timer.header(metrics)
+    if log_ms is not None and metrics['total'] >= log_ms:
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'sql_queries': timer.sql_count,
+            **{f'{name}_ms': round(duration, 2)
+               for name, duration in metrics.items()},
+        }))
+
+
+@sync_and_async_middleware
+def server_timing(get_response):
+    """
+    Send the durations of the request in a Server-Timing header: its
+    phases (see ServerTimingMixin), its SQL queries (`db`, with their
+    count) and the rest (`app`). The requests lasting at least
+    SERVER_TIMING_LOG_MS are also logged as JSON by the app_crm.timing
+    logger, none when it is None.
+    """
+    log_ms = getattr(settings, 'SERVER_TIMING_LOG_MS', None)
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            timer = RequestTimer()
+            token = current_timer.set(timer)
+            try:
+                response = await get_response(request)
+            finally:
+                current_timer.reset(token)
+            finish(timer, request, response, log_ms)
+            return response
+    else:
+        def middleware(request):
+            timer = RequestTimer()
+            token = current_timer.set(timer)
+            try:
+                response = get_response(request)
+            finally:
+                current_timer.reset(token)
+            finish(timer, request, response, log_ms)
+            return response
+    return middleware
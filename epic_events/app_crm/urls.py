@@ -1,6 +1,6 @@
 # app_crm/urls.py
 # created 09/03/2022 at 09:55 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 23/03/2022 at 14:36 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/urls.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.25"
+__version__ = "0.1.30"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -33,26 +33,55 @@ urlpatterns = [
          views.CustomerViewSet.as_view({'get': 'list',
                                         'post': 'create'}),
          name='customers-list'),
+    path('customers/export/',
+         views.CustomerViewSet.as_view({'get': 'export'}),
+         name='customers-export'),
+    path('customers/bulk/',
+         views.CustomerViewSet.as_view({'post': 'bulk_create',
+                                        'patch': 'bulk_update'}),
+         name='customers-bulk'),
     path('customers/<int:pk>/',
          views.CustomerViewSet.as_view({'get': 'retrieve',
                                         'put': 'update',
+                                        'patch': 'partial_update',
                                         'delete': 'destroy'}),
          name='customer-detail'),
     path('contracts/',
          views.ContractViewSet.as_view({'get': 'list',
                                         'post': 'create'}),
          name='contract-list'),
+    path('contracts/export/',
+         views.ContractViewSet.as_view({'get': 'export'}),
+         name='contract-export'),
+    path('contracts/bulk/',
+         views.ContractViewSet.as_view({'post': 'bulk_create',
+                                        'patch': 'bulk_update'}),
+         name='contract-bulk'),
     path('contracts/<int:pk>/',
          views.ContractViewSet.as_view({'get': 'retrieve',
-                                        'put': 'update'}),
+                                        'put': 'update',
+                                        'patch': 'partial_update'}),
          name='contract-detail'),
     path('events/',
          views.EventViewSet.as_view({'get': 'list',
                                      'post': 'create'}),
          name='event-list'),
+    path('events/export/',
+         views.EventViewSet.as_view({'get': 'export'}),
+         name='event-export'),
+    path('events/bulk/',
+         views.EventViewSet.as_view({'post': 'bulk_create',
+                                     'patch': 'bulk_update'}),
+         name='event-bulk'),
     path('events/<int:pk>/',
          views.EventViewSet.as_view({'get': 'retrieve',
                                      'put': 'update',
+                                     'patch': 'partial_update',
                                      'delete': 'destroy'}),
          name='event-detail'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('dashboard/sales/', views.SalesDashboardView.as_view(),
+         name='dashboard-sales'),
+    path('dashboard/events/', views.EventsDashboardView.as_view(),
+         name='dashboard-events'),
 ]
@@ -1,6 +1,6 @@
 # app_crm/views.py
 # created 07/03/2022 at 09:22 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 06/04/2022 at 11:42 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 21:17 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_crm/views.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.2.9"
+__version__ = "0.2.19"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -23,24 +23,37 @@ from django.core.exceptions import (
 )
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
+from rest_framework.reverse import reverse
 from rest_framework import status
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 # django imports
+from django.db.models import OuterRef, Subquery
 
 # local application imports
+from . import rules
+from .bulk import BulkCreateMixin, BulkUpdateMixin, bulk_update
+from .conditional import ConditionalGetMixin
+from .replicas import ReplicaReadMixin
+from .timing import ServerTimingMixin
+from .export import ExportMixin
+from app_users.models import User
 from .models import (
     Customer,
     Contract,
-    Event
+    Event,
+    EventSummary,
+    SalesSummary
 )
 from .serializers import (
     CustomerSerializer,
     ContractSerializer,
     EventSerializer
 )
+from .search import FullTextSearchFilter, search_all
 from .permissions import (
     IsManagement,
     CustomerPermissions,
@@ -49,122 +62,206 @@ from .permissions import (
 )
 
 # other imports & constants
+# results of the global search, by default and at most
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
 
 
-class CustomerViewSet(ModelViewSet):
+class CustomerViewSet(ServerTimingMixin, ReplicaReadMixin, ConditionalGetMixin,
+                      BulkCreateMixin, BulkUpdateMixin, ExportMixin,
+                      ModelViewSet):
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated, IsManagement | CustomerPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [SearchFilter, DjangoFilterBackend,
+                       FullTextSearchFilter]
     search_fields = ['^last_name', '^email']
     filterset_fields = ['is_customer']
 
     def get_queryset(self):
-        if self.request.user.role == 'sales':
-            prospects = Customer.objects.filter(is_customer=False)
-            own_customers = Customer.objects.filter(sales_contact_id=self.request.user.id)  # noqa
-            return prospects | own_customers
-        elif self.request.user.role == 'support':
-            return Customer.objects.filter(contract__support_contact_id=self.request.user.id)  # noqa
-        return Customer.objects.all()
+        return Customer.objects.visible_to(self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(sales_contact_id=self.request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def perform_bulk_create(self, serializer):
+        serializer.save(sales_contact_id=self.request.user)
+
+    def update_errors(self, instance, attrs):
+        return rules.customer_update_errors(instance, attrs)
+
     def perform_update(self, serializer):
         """
-        Override the default update method to prevent the sales contact from
-        changing the status of a customer to prospect.
+        Override the default update method to enforce the rules of
+        update_errors.
         """
-        customer = self.get_object()
-        if customer.is_customer is True:
-            if serializer.validated_data.get('is_customer') is False:
-                raise PermissionDenied('You cannot change customer to prospect')  # noqa
+        errors = self.update_errors(serializer.instance,
+                                    serializer.validated_data)
+        if errors:
+            raise PermissionDenied(*errors.values())
         serializer.save(sales_contact_id=self.request.user)
         return Response(serializer.data)
 
+    def perform_bulk_update(self, updates):
+        bulk_update([(instance, {**attrs,
+                                 'sales_contact_id': self.request.user})
+                     for instance, attrs in updates])
 
-class ContractViewSet(ModelViewSet):
+
+class ContractViewSet(ServerTimingMixin, ReplicaReadMixin, ConditionalGetMixin,
+                      BulkCreateMixin, BulkUpdateMixin, ExportMixin,
+                      ModelViewSet):
     serializer_class = ContractSerializer
     permission_classes = [IsAuthenticated, IsManagement | ContractPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [SearchFilter, DjangoFilterBackend,
+                       FullTextSearchFilter]
     search_fields = ['^customer__last_name', '^customer__email',
                      '=date_created', '=amount']
     filterset_fields = ['is_signed']
 
     def get_queryset(self):
-        if self.request.user.role == 'sales':
-            return Contract.objects.filter(customer__sales_contact_id=self.request.user)  # noqa
-        elif self.request.user.role == 'support':
-            return Contract.objects.filter(support_contact_id=self.request.user)  # noqa
-        return Contract.objects.all()
+        return Contract.objects.visible_to(self.request.user)
+
+    def create_errors(self, items):
+        return rules.contract_create_errors(items)
 
     def perform_create(self, serializer):
         """
-        Override the default create method to prevent the sales contact or
-        management to create a contract with a prospect.
+        Override the default create method to enforce the rules of
+        create_errors.
         """
-        if serializer.validated_data.get('customer').is_customer is False:
-            raise PermissionDenied('You cannot create a contract with a prospect')  # noqa
+        errors = self.create_errors([serializer.validated_data])[0]
+        if errors:
+            raise PermissionDenied(*errors.values())
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def update_errors(self, instance, attrs):
+        return rules.contract_update_errors(instance, attrs)
+
     def perform_update(self, serializer):
         """
-        Override the default update method to prevent the sales contact or
-        management to change the status of a signed contracts.
+        Override the default update method to enforce the rules of
+        update_errors.
         """
-        contract = self.get_object()
-        if contract.is_signed is True:
-            if serializer.validated_data.get('is_signed') is False:
-                raise PermissionDenied('You cannot change signed contracts')
+        errors = self.update_errors(serializer.instance,
+                                    serializer.validated_data)
+        if errors:
+            raise PermissionDenied(*errors.values())
         serializer.save()
         return Response(serializer.data)
 
 
-class EventViewSet(ModelViewSet):
+class EventViewSet(ServerTimingMixin, ReplicaReadMixin, ConditionalGetMixin,
+                   BulkCreateMixin, BulkUpdateMixin, ExportMixin,
+                   ModelViewSet):
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsManagement | EventPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
-    search_fields = ['^customer__last_name', '^customer__email',
-                     '=date_created']
+    filter_backends = [SearchFilter, DjangoFilterBackend,
+                       FullTextSearchFilter]
+    search_fields = ['^contract_id__customer__last_name',
+                     '^contract_id__customer__email', '=date_created']
     filterset_fields = ['is_finished']
 
     def get_queryset(self):
-        if self.request.user.role == 'sales':
-            return Event.objects.filter(contract_id__customer__sales_contact_id=self.request.user)  # noqa
-        elif self.request.user.role == 'support':
-            return Event.objects.filter(contract_id__support_contact_id=self.request.user)  # noqa
-        return Event.objects.all()
+        return Event.objects.visible_to(self.request.user)
+
+    def create_errors(self, items):
+        return rules.event_create_errors(items)
 
     def perform_create(self, serializer):
         """
-        Override the default create method to prevent the sales contact or
-        management to create an event with a prospect.
+        Override the default create method to enforce the rules of
+        create_errors.
         """
-        if serializer.validated_data.get('contract_id').customer.is_customer is False:  # noqa
-            raise PermissionDenied('You cannot create an event with a prospect')  # noqa
-        if serializer.validated_data.get('contract_id').is_signed is False:
-            raise PermissionDenied('You cannot create an event with a contract not signed')  # noqa
-        if Event.objects.filter(contract_id=serializer.validated_data.get('contract_id')).exists():  # noqa
-            raise PermissionDenied('You cannot create an event for a contract that already has an event')  # noqa
-        if serializer.validated_data.get('contract_id').id is None:
-            raise PermissionDenied('You cannot create an event for a contract that does not exist')  # noqa
+        errors = self.create_errors([serializer.validated_data])[0]
+        if errors:
+            raise PermissionDenied(*errors.values())
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def update_errors(self, instance, attrs):
+        return rules.event_update_errors(instance, attrs)
+
     def perform_update(self, serializer):
         """
-        Override the default update method to prevent the sales contact or
-        management to change the status of a finished event.
+        Override the default update method to enforce the rules of
+        update_errors.
         """
-        event = self.get_object()
-        if event.is_finished is True:
-            if serializer.validated_data.get('is_finished') is False:
-                raise PermissionDenied('You cannot change finished events')
+        errors = self.update_errors(serializer.instance,
+                                    serializer.validated_data)
+        if errors:
+            raise PermissionDenied(*errors.values())
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def perform_destroy(self, instance):
         instance.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SearchView(ServerTimingMixin, ReplicaReadMixin, APIView):
+    """
+    Search the customers, contracts and events of the scope of the user
+    at once with the `q` query parameter: the `limit` best results,
+    ranked together and tagged with their type.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params['limit'])
+        except (KeyError, ValueError):
+            return SEARCH_LIMIT
+        return min(max(limit, 1), SEARCH_MAX_LIMIT)
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        results = search_all(request.user, query, self.get_limit(request))
+        for result in results:
+            result['url'] = reverse(f'app_crm:{result["type"]}-detail',
+                                    kwargs={'pk': result['id']},
+                                    request=request)
+        return Response({'results': results})
+
+
+class SalesDashboardView(ServerTimingMixin, ReplicaReadMixin, APIView):
+    """
+    KPIs of the sales contacts, for the management role: their customers
+    and the signed and unsigned contracts of these customers, read from
+    the SalesSummary table (one row per sales contact), with the totals
+    and the share of customers among customers and prospects.
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+    columns = ('customers', 'prospects', 'signed_contracts', 'signed_amount',
+               'unsigned_contracts', 'unsigned_amount')
+
+    def get(self, request):
+        rows = list(SalesSummary.objects.annotate(
+            username=Subquery(User.objects.filter(
+                pk=OuterRef('sales_contact')).values('username')),
+        ).order_by('sales_contact').values('sales_contact', 'username',
+                                           *self.columns))
+        totals = {column: sum(row[column] for row in rows)
+                  for column in self.columns}
+        people = totals['customers'] + totals['prospects']
+        totals['conversion_rate'] = (totals['customers'] / people
+                                     if people else None)
+        return Response({
+            'sales_contacts': [row for row in rows
+                               if any(row[column] for column in self.columns)],
+            'totals': totals,
+        })
+
+
+class EventsDashboardView(ServerTimingMixin, ReplicaReadMixin, APIView):
+    """
+    KPIs of the events by month, for the management role, read from the
+    EventSummary table (one row per month).
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+
+    def get(self, request):
+        months = EventSummary.objects.filter(events__gt=0).order_by('month')
+        return Response({'months': list(months.values(
+            'month', 'events', 'finished_events', 'attendees'))})
@@ -0,0 +1,383 @@
+# app_crm/visibility.py
+# created 18/10/2026 at 20:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:45 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_crm/visibility.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.3"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import contextvars
+
+# third party imports
+
+# django imports
+from django.db import connections, transaction
+from django.db.models import (
+    BigIntegerField,
+    BooleanField,
+    CharField,
+    F,
+    Max,
+    Q,
+    Value,
+)
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+# local application imports
+from app_users.models import User
+from .models import (
+    Customer,
+    Contract,
+    Event,
+    VisibleObject
+)
+
+# other imports & constants
+CHUNK_SIZE = 100000
+COLUMNS = ('user_id', 'object_type', 'object_id', 'can_write')
+MODELS = (Customer, Contract, Event)
+
+# ids of the customers being deleted: the grants of their cascaded
+# contracts go with theirs, there is nothing to refresh
+deleted_customers = contextvars.ContextVar('deleted_customers',
+                                           default=frozenset())
+
+
+def can_write(role, object_type):
+    """
+    Sales users can update what they see, support users only the events.
+    """
+    return role == 'sales' or object_type == 'event'
+
+
+def _grants(queryset, user, role, object_type, object_id='pk'):
+    """
+    Return the grants given by the `user` relation of `queryset` to the
+    users of `role`, as a values() queryset of VisibleObject columns.
+    """
+    return queryset.filter(**{f'{user}__role': role}).order_by().values(
+        grant_user=F(user),
+        grant_type=Value(object_type, output_field=CharField()),
+        grant_object=F(object_id),
+        grant_write=Value(can_write(role, object_type),
+                          output_field=BooleanField()),
+    )
+
+
+def customer_grants(customers):
+    """ Grants on `customers` given by their sales contact """
+    return [_grants(customers, 'sales_contact_id', 'sales', 'customer')]
+
+
+def contract_grants(contracts):
+    """
+    Grants on `contracts` and, for their support contact, on the
+    customers of these contracts.
+    """
+    return [
+        _grants(contracts, 'customer__sales_contact_id', 'sales',
+                'contract'),
+        _grants(contracts, 'support_contact_id', 'support', 'contract'),
+        _grants(contracts, 'support_contact_id', 'support', 'customer',
+                object_id='customer'),
+    ]
+
+
+def event_grants(events):
+    """ Grants on `events` """
+    return [
+        _grants(events, 'contract_id__customer__sales_contact_id', 'sales',
+                'event'),
+        _grants(events, 'contract_id__support_contact_id', 'support',
+                'event'),
+    ]
+
+
+def subtree_grants(customers):
+    """ Grants on `customers`, their contracts and their events """
+    customer_ids = customers.values('pk')
+    return (
+        customer_grants(customers) +
+        contract_grants(Contract.objects.filter(customer__in=customer_ids)) +
+        event_grants(Event.objects.filter(
+            contract_id__customer__in=customer_ids))
+    )
+
+
+def insert(grants):
+    """
+    Insert a list of grants querysets with a single
+    INSERT ... SELECT ... UNION ALL, skipping the existing ones.
+    """
+    grants = [queryset for queryset in grants
+              if not queryset.query.is_empty()]
+    if not grants:
+        return
+    first, *others = grants
+    if others:
+        first = first.union(*others, all=True)
+    connection = connections[first.db]
+    ops = connection.ops
+    sql, params = first.query.sql_with_params()
+    columns = ', '.join(ops.quote_name(column) for column in COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{ops.insert_statement(ignore_conflicts=True)} '
+            f'{ops.quote_name(VisibleObject._meta.db_table)} ({columns}) '
+            f'{sql} {ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+            params)
+
+
+def created(model, object_ids):
+    """ Insert the grants on new objects, e.g. after a bulk_create """
+    grants = {
+        Customer: customer_grants,
+        Contract: contract_grants,
+        Event: event_grants,
+    }[model]
+    insert(grants(model.objects.filter(pk__in=list(object_ids))))
+
+
+def forget(object_type, object_ids):
+    """ Delete every grant on the given objects """
+    VisibleObject.objects.filter(object_type=object_type,
+                                 object_id__in=object_ids).delete()
+
+
+def refresh_customers(customer_ids):
+    """
+    Recompute the grants on the given customers, their contracts and
+    their events, e.g. after a sales or support reassignment.
+    """
+    customers = Customer.objects.filter(pk__in=list(customer_ids))
+    subtree = (
+        Q(object_type='customer',
+          object_id__in=customers.values('pk')) |
+        Q(object_type='contract',
+          object_id__in=Contract.objects.filter(
+              customer__in=customers.values('pk')).values('pk')) |
+        Q(object_type='event',
+          object_id__in=Event.objects.filter(
+              contract_id__customer__in=customers.values('pk')).values('pk'))
+    )
+    with transaction.atomic():
+        VisibleObject.objects.filter(subtree).delete()
+        insert(subtree_grants(customers))
+
+
+def refresh_events(event_ids):
+    """ Recompute the grants on the given events """
+    event_ids = list(event_ids)
+    with transaction.atomic():
+        forget('event', event_ids)
+        insert(event_grants(Event.objects.filter(pk__in=event_ids)))
+
+
+def refresh_user(user):
+    """ Recompute every grant of `user`, e.g. after a role change """
+    with transaction.atomic():
+        VisibleObject.objects.filter(user=user.id).delete()
+        insert([
+            model.objects.granted_to(user).order_by().values(
+                grant_user=Value(user.id, output_field=BigIntegerField()),
+                grant_type=Value(model._meta.model_name,
+                                 output_field=CharField()),
+                grant_object=F('pk'),
+                grant_write=Value(can_write(user.role, model._meta.model_name),
+                                  output_field=BooleanField()),
+            )
+            for model in MODELS
+        ])
+
+
+def analyze(using='default'):
+    """
+    Refresh the PostgreSQL statistics of the tables read by the grants
+    queries. After a bulk load they can be off by so much that the
+    planner nests sequential scans of the big tables.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    tables = ', '.join(connection.ops.quote_name(model._meta.db_table)
+                       for model in (*MODELS, User))
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {tables}')
+
+
+def rebuild(chunk_size=CHUNK_SIZE, stdout=None):
+    """
+    Rebuild the whole table from the business rules, walking the
+    customers by ranges of ids.
+    """
+    with transaction.atomic():
+        analyze()
+        VisibleObject.objects.all().delete()
+        last_id = Customer.objects.aggregate(last=Max('pk'))['last'] or 0
+        for start in range(0, last_id + 1, chunk_size):
+            insert(subtree_grants(Customer.objects.filter(
+                pk__gte=start, pk__lt=start + chunk_size)))
+            if stdout is not None:
+                stdout.write(f'{min(start + chunk_size, last_id)}/{last_id}'
+                             f' customers')
+    return VisibleObject.objects.count()
+
+
+def verify():
+    """
+    Compare the table with the business rules.
+    Return a list of (username, object_type, missing, extra, wrong_write)
+    for every user whose grants differ.
+    """
+    mismatches = []
+    strays = VisibleObject.objects.exclude(
+        user__role__in=['sales', 'support']).count()
+    if strays:
+        mismatches.append(('<other roles>', '*', 0, strays, 0))
+    users = User.objects.filter(role__in=['sales', 'support'])
+    for user in users.iterator():
+        for model in MODELS:
+            object_type = model._meta.model_name
+            expected = set(model.objects.granted_to(user)
+                           .values_list('pk', flat=True))
+            actual = dict(VisibleObject.objects
+                          .filter(user=user.id, object_type=object_type)
+                          .values_list('object_id', 'can_write'))
+            write = can_write(user.role, object_type)
+            missing = len(expected - actual.keys())
+            extra = len(actual.keys() - expected)
+            wrong = sum(1 for pk in expected & actual.keys()
+                        if actual[pk] != write)
+            if missing or extra or wrong:
+                mismatches.append(
+                    (user.username, object_type, missing, extra, wrong))
+    return mismatches
+
+
+def scope_changed(instance):
+    """
+    Whether a saved object has a new sales contact, support contact,
+    customer or contract. Objects that were not loaded from the database
+    are always considered changed.
+    """
+    loaded = getattr(instance, '_loaded_scope', None)
+    instance._loaded_scope = instance.scope_values()
+    return loaded != instance._loaded_scope
+
+
+def updated(model, instances):
+    """
+    Refresh the grants on the updated `instances` whose scope changed,
+    e.g. after a queryset update(), which sends no post_save.
+    """
+    previous = {instance.pk: getattr(instance, '_loaded_scope', None)
+                for instance in instances}
+    changed = [instance for instance in instances
+               if scope_changed(instance)]
+    if not changed:
+        return
+    if model is Event:
+        refresh_events([instance.pk for instance in changed])
+    elif model is Customer:
+        refresh_customers([instance.pk for instance in changed])
+    else:
+        customer_ids = {instance.customer_id for instance in changed}
+        customer_ids.update(previous[instance.pk][0] for instance in changed
+                            if previous[instance.pk])
+        refresh_customers(customer_ids - {None})
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, created, **kwargs):
+    if not scope_changed(instance):
+        return
+    if created:
+        insert(customer_grants(Customer.objects.filter(pk=instance.pk)))
+    else:
+        refresh_customers([instance.pk])
+
+
+@receiver(post_save, sender=Contract)
+def contract_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_scope', None)
+    if not scope_changed(instance):
+        return
+    if created:
+        insert(contract_grants(Contract.objects.filter(pk=instance.pk)))
+    else:
+        customer_ids = {instance.customer_id, previous and previous[0]}
+        refresh_customers(customer_ids - {None})
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, created, **kwargs):
+    if not scope_changed(instance):
+        return
+    if created:
+        insert(event_grants(Event.objects.filter(pk=instance.pk)))
+    else:
+        refresh_events([instance.pk])
+
+
+@receiver(pre_delete, sender=Customer)
+def customer_deleting(sender, instance, **kwargs):
+    deleted_customers.set(deleted_customers.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    forget('customer', [instance.pk])
+    deleted_customers.set(deleted_customers.get() - {instance.pk})
+
+
+@receiver(post_delete, sender=Contract)
+def contract_deleted(sender, instance, **kwargs):
+    forget('contract', [instance.pk])
+    if instance.customer_id not in deleted_customers.get():
+        refresh_customers([instance.customer_id])
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    forget('event', [instance.pk])
+
+
+def saves_role(update_fields):
+    """ Whether a save with `update_fields` writes the role """
+    return update_fields is None or 'role' in update_fields
+
+
+@receiver(pre_save, sender=User)
+def remember_role(sender, instance, update_fields=None, **kwargs):
+    # e.g. the last_login updates, which do not change the scopes
+    if not saves_role(update_fields):
+        return
+    instance._previous_role = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('role', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or not saves_role(update_fields):
+        return
+    if getattr(instance, '_previous_role', None) != instance.role:
+        refresh_user(instance)
@@ -1,6 +1,6 @@
 # app_users/admin.py
 # created 02/03/2022 at 12:54 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 02/03/2022 at 12:54 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:15 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_users/admin.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.0"
+__version__ = "0.1.2"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -20,14 +20,21 @@ __status__ = "Development"
 # third party imports
 
 # django imports
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 
 # local application imports
-from .models import User
+from .forms import UserImportForm
+from .models import RevokedToken, User
 
 # other imports & constants
+# rejected rows listed on the import page
+MAX_ERRORS = 100
 
 
 admin.site.unregister(Group)
@@ -40,7 +47,7 @@ class CustomUserAdmin(UserAdmin):
          {'fields': ('username', 'password', 'first_name',
                      'last_name', 'email')}),
         ("Permissions",
-         {'fields': ('role',)}),
+         {'fields': ('role', 'is_active')}),
         ("Date informations",
          {'fields': ('date_created', 'date_updated', 'last_login')}),
     )
@@ -48,3 +55,55 @@ class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'first_name', 'last_name', 'email',
                     'role')
     list_filter = ('role', 'is_active')
+    actions = ['deactivate']
+    change_list_template = 'admin/app_users/user/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_users),
+                 name='app_users_user_import'),
+            *super().get_urls(),
+        ]
+
+    def import_users(self, request):
+        """
+        Create users from an uploaded CSV or NDJSON file, the rejected
+        rows are listed.
+        """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = UserImportForm(request.POST or None, request.FILES or None)
+        errors = []
+        if request.method == 'POST' and form.is_valid():
+            try:
+                created, errors = form.save()
+            except UnicodeDecodeError:
+                form.add_error('file', "The file is not UTF-8.")
+            else:
+                self.message_user(request, f"{created} users created.",
+                                  messages.SUCCESS)
+                if not errors:
+                    return redirect('admin:app_users_user_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Import users",
+            'opts': self.model._meta,
+            'form': form,
+            'errors': errors[:MAX_ERRORS],
+            'hidden_errors': max(0, len(errors) - MAX_ERRORS),
+        }
+        return TemplateResponse(
+            request, 'admin/app_users/user/import_users.html', context)
+
+    @admin.action(description="Deactivate and revoke their tokens")
+    def deactivate(self, request, queryset):
+        # saved one by one: the post_save signal revokes the tokens
+        for user in queryset:
+            user.is_active = False
+            user.save()
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('key', 'revoked_at', 'expires_at')
+    search_fields = ('key',)
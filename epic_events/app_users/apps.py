@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppUsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_users'
+
+    def ready(self):
+        # forgets the cached state of the users when they are saved
+        from . import authentication  # noqa: F401
@@ -0,0 +1,158 @@
+# app_users/authentication.py
+# created 19/10/2026 at 09:10 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:04 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/authentication.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.2"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+# local application imports
+from .models import User
+from .revocation import revocation_list
+from .token_cache import token_cache
+
+# other imports & constants
+STATE_TTL = getattr(settings, 'USER_STATE_TTL', 30)
+
+
+def state_key(user_id):
+    return f'app_users:state:{user_id}'
+
+
+def remember_state(user):
+    """ Cache the (is_active, role) of `user` for STATE_TTL seconds """
+    cache.set(state_key(user.pk), (user.is_active, user.role), STATE_TTL)
+
+
+def get_state(user_id):
+    """
+    Return the (is_active, role) of a user, from the cache or from the
+    database once every STATE_TTL seconds. Unknown users are inactive.
+    """
+    state = cache.get(state_key(user_id))
+    if state is None:
+        state = (User.objects.filter(pk=user_id)
+                 .values_list('is_active', 'role').first()
+                 or (False, None))
+        cache.set(state_key(user_id), tuple(state), STATE_TTL)
+    return state
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_state(sender, instance, **kwargs):
+    """ A saved or deleted user is checked again on their next request """
+    cache.delete(state_key(instance.pk))
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Stateless user built from the claims of an access token.
+    It carries the role and the active flag of the user when the token
+    was issued, see MyTokenObtainSerializer.get_token().
+    """
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not load the user row on reads.
+
+    Safe requests are authorized from the token claims with a
+    RoleTokenUser. The claims are checked against the cached state of the
+    user, so a deactivated user or a role change is refused within
+    USER_STATE_TTL seconds, immediately on this process. Writes, and
+    tokens issued without the role claim, load the user from the database.
+
+    Verified tokens and their token user are kept in token_cache until
+    they expire, so a known token is not decoded and checked again.
+    Every request is checked against the revoked tokens, see
+    revocation.RevocationList.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token, token_user = self.get_verified_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise AuthenticationFailed("Token is revoked",
+                                       code="token_not_valid")
+
+        if request.method in SAFE_METHODS and token_user is not None:
+            self.check_state(token_user)
+            return token_user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_verified_token(self, raw_token):
+        """
+        Return the validated token and its token user (None when the
+        token has no role claim), from the verified tokens cache.
+        """
+        key = token_cache.digest(raw_token)
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        validated_token = self.get_validated_token(raw_token)
+        token_user = None
+        if 'role' in validated_token:
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken("Token contained no recognizable user identification")  # noqa
+            token_user = api_settings.TOKEN_USER_CLASS(validated_token)
+        token_cache.set(key, validated_token, token_user)
+        return validated_token, token_user
+
+    def check_state(self, token_user):
+        is_active, role = get_state(token_user.id)
+        if not (is_active and token_user.is_active):
+            raise AuthenticationFailed("User is inactive",
+                                       code="user_inactive")
+        if role != token_user.role:
+            raise AuthenticationFailed("Token role is outdated",
+                                       code="token_not_valid")
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        remember_state(user)
+        return user
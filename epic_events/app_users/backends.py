@@ -0,0 +1,93 @@
+# app_users/backends.py
+# created 19/10/2026 at 13:45 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 13:45 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/backends.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import contextvars
+from concurrent.futures import TimeoutError
+
+# third party imports
+
+# django imports
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (
+    check_password,
+    identify_hasher,
+    make_password
+)
+
+# local application imports
+from .login_pool import LoginPoolFull, hashing_pool
+from .models import User
+
+# other imports & constants
+# set by the API login, which answers a saturated pool with a 503: the
+# other callers of authenticate(), e.g. the admin, get a failed login
+raise_pool_full = contextvars.ContextVar('raise_pool_full', default=False)
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend hashing the passwords on the login hashing pool.
+
+    The user is loaded in the request thread, only the hashing runs on
+    the pool, it needs no database connection. When the pool is
+    saturated, raises LoginPoolFull within raise_pool_full, else fails
+    the authentication.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            return self.check(username, password)
+        except LoginPoolFull:
+            if raise_pool_full.get():
+                raise
+            return None
+
+    def check(self, username, password):
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # hash once anyway, an unknown username takes as long to reject
+            self.hash(make_password, password)
+            return None
+
+        if not self.hash(check_password, password, user.password):
+            return None
+        if self.must_update(user.password):
+            user.set_password(password)
+            user.save(update_fields=['password'])
+        if self.user_can_authenticate(user):
+            return user
+        return None
+
+    @staticmethod
+    def hash(function, *args):
+        try:
+            return hashing_pool.run(function, *args)
+        except TimeoutError:
+            raise LoginPoolFull
+
+    @staticmethod
+    def must_update(encoded):
+        try:
+            return identify_hasher(encoded).must_update(encoded)
+        except ValueError:
+            return False
@@ -0,0 +1,60 @@
+# app_users/forms.py
+# created 19/10/2026 at 15:50 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 15:50 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/forms.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+
+# third party imports
+
+# django imports
+from django import forms
+
+# local application imports
+from . import provisioning
+
+# other imports & constants
+
+
+class UserImportForm(forms.Form):
+    """
+    Upload of a CSV or NDJSON file of users for the admin website
+    (see provisioning.import_users).
+    """
+    file = forms.FileField(
+        help_text="CSV with a header line, or NDJSON. Columns: username, "
+                  "password, role, first_name, last_name, email.")
+    format = forms.ChoiceField(
+        required=False,
+        choices=[('', "From the file extension"),
+                 ('csv', "CSV"), ('ndjson', "NDJSON")])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload is not None and not cleaned_data.get('format'):
+            cleaned_data['format'] = provisioning.guess_format(upload.name)
+            if cleaned_data['format'] is None:
+                self.add_error('format', "Unknown file extension, choose "
+                                         "the format.")
+        return cleaned_data
+
+    def save(self):
+        """ Import the file, return the number of users and the errors """
+        stream = io.TextIOWrapper(self.cleaned_data['file'].file,
+                                  encoding='utf-8-sig', newline='')
+        return provisioning.import_users(
+            provisioning.read_rows(stream, self.cleaned_data['format']))
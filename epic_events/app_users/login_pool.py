@@ -0,0 +1,77 @@
+# app_users/login_pool.py
+# created 19/10/2026 at 13:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 20:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/login_pool.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# third party imports
+
+# django imports
+from django.conf import settings
+
+# local application imports
+from epic_events.latency import LatencyRecorder
+
+# other imports & constants
+WORKERS = getattr(settings, 'LOGIN_HASH_WORKERS', 2)
+MAX_PENDING = getattr(settings, 'LOGIN_MAX_PENDING', 16)
+TIMEOUT = getattr(settings, 'LOGIN_HASH_TIMEOUT', 10)
+
+
+class LoginPoolFull(Exception):
+    """ Every hashing slot is taken, the login is rejected right away """
+
+
+class HashingPool:
+    """
+    Bounded thread pool running the password hashing of the logins.
+
+    At most `workers` hashes run at once, so logins can not take every
+    CPU of the server away from the CRM requests. PBKDF2 releases the
+    GIL, the threads hash in parallel. At most `max_pending` more logins
+    wait for a thread, any other one is rejected at once with
+    LoginPoolFull instead of queueing behind them.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self._rejected_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='login-hash')
+
+    def run(self, function, *args):
+        """ Run function(*args) on the pool and return its result """
+        if not self._slots.acquire(blocking=False):
+            with self._rejected_lock:
+                self.rejected += 1
+            raise LoginPoolFull
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(self.timeout)
+
+
+hashing_pool = HashingPool(WORKERS, MAX_PENDING, TIMEOUT)
+login_latency = LatencyRecorder()
@@ -0,0 +1,80 @@
+# app_users/management/commands/bench_bulk_import_users.py
+# created 19/10/2026 at 15:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 15:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/management/commands/bench_bulk_import_users.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import os
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# local application imports
+from app_users.models import User
+from app_users.provisioning import import_users
+
+# other imports & constants
+ROLES = ['sales', 'support', 'management']
+
+
+def rows(prefix, count):
+    return [{'username': f'{prefix}_{i}', 'password': f'Bench-{i}-password',
+             'role': ROLES[i % len(ROLES)],
+             'email': f'{prefix}_{i}@epicevents.com'}
+            for i in range(count)]
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the users import against a loop of User.save(), "
+            "which is timed on --sample users and extrapolated. "
+            "Everything runs in a rolled back transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000)
+        parser.add_argument('--sample', type=int, default=100)
+        parser.add_argument('--processes', type=int, nargs='+',
+                            default=sorted({1, os.cpu_count()}))
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def report(self, label, users, seconds, count):
+        self.stdout.write(f'{label:>22} {users:>8} {seconds:>10.2f} '
+                          f'{users / seconds:>8.1f} '
+                          f'{seconds * count / users:>14.1f}')
+
+    def run(self, options):
+        count = options['count']
+        self.stdout.write(f'{"method":>22} {"users":>8} {"time (s)":>10} '
+                          f'{"users/s":>8} {f"{count} users (s)":>14}')
+
+        start = time.perf_counter()
+        for row in rows('bench_save', options['sample']):
+            User(**row).save()
+        self.report('save() loop', options['sample'],
+                    time.perf_counter() - start, count)
+
+        for processes in options['processes']:
+            start = time.perf_counter()
+            created, _ = import_users(rows(f'bench_{processes}', count),
+                                      processes=processes)
+            self.report(f'bulk import x{processes}', created,
+                        time.perf_counter() - start, count)
@@ -0,0 +1,75 @@
+# app_users/management/commands/bulk_import_users.py
+# created 19/10/2026 at 15:05 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 15:05 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/management/commands/bulk_import_users.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import sys
+import time
+
+# third party imports
+
+# django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# local application imports
+from app_users import provisioning
+
+# other imports & constants
+
+
+class Command(BaseCommand):
+    help = ("Create users from a CSV (with a header line) or NDJSON file "
+            "with the columns username, password, role, first_name, "
+            "last_name and email. The invalid rows are reported and "
+            "skipped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="the file, '-' for stdin")
+        parser.add_argument('--format',
+                            choices=sorted(set(provisioning.FORMATS.values())),
+                            help='guessed from the file extension by default')
+        parser.add_argument('--batch-size', type=int,
+                            default=provisioning.BATCH_SIZE)
+        parser.add_argument('--processes', type=int,
+                            help='password hashing processes, one per CPU '
+                                 'by default')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or provisioning.guess_format(path)
+        if format is None:
+            raise CommandError('Unknown file format, use --format')
+
+        start = time.perf_counter()
+        if path == '-':
+            created, errors = self.load(sys.stdin, format, options)
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                created, errors = self.load(stream, format, options)
+        for error in errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} users created in '
+            f'{time.perf_counter() - start:.1f}s'))
+        if errors:
+            raise CommandError(f'{len(errors)} rows rejected')
+
+    @staticmethod
+    def load(stream, format, options):
+        return provisioning.import_users(
+            provisioning.read_rows(stream, format),
+            batch_size=options['batch_size'],
+            processes=options['processes'])
@@ -1,6 +1,6 @@
 # app_users/models.py
 # created 02/03/2022 at 12:27 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 02/03/2022 at 12:27 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:15 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_users/models.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.0"
+__version__ = "0.1.2"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -54,9 +54,10 @@ class User(AbstractUser):
         """
         return f"{self.username} ({self.role})"
 
-    def save(self, *args, **kwargs):
+    def apply_role(self):
         """
-        This method saves the object.
+        This method sets the admin flags of the user from its role,
+        only the management role can access the admin website.
         """
         if self.role == 'management':
             self.is_staff = True
@@ -65,11 +66,40 @@ class User(AbstractUser):
             self.is_staff = False
             self.is_superuser = False
 
+    def save(self, *args, **kwargs):
+        """
+        This method saves the object.
+        """
+        self.apply_role()
+
         user = super(User, self)
 
         if len(self.password) != 88:
             user.set_password(self.password)
 
-        user.save()
+        user.save(*args, **kwargs)
 
         return user
+
+
+class RevokedToken(models.Model):
+    """
+    This class represents a revoked token, or every token of a user
+    issued before `revoked_at`.
+    Workers compile the keys in a Bloom filter (see app_users.revocation).
+
+    Attributes:
+        key (str): 'jti:<jti>' for a token, 'user:<id>' for a user.
+        revoked_at (datetime): when the token or the user was revoked.
+        expires_at (datetime): when the token expires, the row is
+                               useless afterwards. None for a user.
+    """
+
+    # Fields
+    key = models.CharField(max_length=64, unique=True)
+    revoked_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    # Methods
+    def __str__(self):
+        return f"{self.key} (revoked at {self.revoked_at})"
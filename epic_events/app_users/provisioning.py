@@ -0,0 +1,133 @@
+# app_users/provisioning.py
+# created 19/10/2026 at 14:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 14:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/provisioning.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# third party imports
+
+# django imports
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+# local application imports
+from .models import User
+from .serializers import UserImportSerializer
+
+# other imports & constants
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+BATCH_SIZE = 1000
+
+
+def guess_format(name):
+    """ Return the format of a file from its extension, or None """
+    return FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+def read_rows(stream, format):
+    """
+    Yield the rows of a CSV (with a header line) or NDJSON text stream
+    as dicts. An NDJSON line that is not a JSON object is yielded as None.
+    """
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    if format != 'ndjson':
+        raise ValueError(f"Unknown format: {format}")
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def hash_passwords(passwords, processes=None):
+    """
+    Return the hashes of `passwords`, in order, computed by `processes`
+    processes (one per CPU by default). None gives an unusable password.
+    """
+    processes = processes or os.cpu_count()
+    if processes == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (processes * 4))
+    with ProcessPoolExecutor(processes, initializer=django.setup) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(rows, batch_size=BATCH_SIZE, processes=None):
+    """
+    Create the users of `rows` (dicts, see UserImportSerializer).
+
+    Every row is validated first, the usernames taken in the file or in
+    the database with one query per batch. The passwords of the valid
+    rows are hashed in a process pool (see hash_passwords), the admin
+    flags set from the role in Python, and the users inserted with
+    bulk_create in batches of `batch_size`, in one transaction.
+    The invalid rows are skipped.
+    Return the number of users created and the errors, a list of
+    {'row': <number, from 1>, 'errors': <serializer errors>}.
+    """
+    valid, errors = [], []
+    usernames = set()
+    for number, row in enumerate(rows, 1):
+        if row is None:
+            errors.append({'row': number, 'errors': {
+                'non_field_errors': ["Invalid JSON object."]}})
+            continue
+        serializer = UserImportSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': number, 'errors': serializer.errors})
+        elif serializer.validated_data['username'] in usernames:
+            errors.append({'row': number, 'errors': {
+                'username': ["Duplicate username in the file."]}})
+        else:
+            usernames.add(serializer.validated_data['username'])
+            valid.append((number, serializer.validated_data))
+
+    taken = set()
+    for start in range(0, len(valid), batch_size):
+        taken.update(User.objects.filter(username__in=[
+            data['username'] for _, data in valid[start:start + batch_size]
+        ]).values_list('username', flat=True))
+    if taken:
+        for number, data in valid:
+            if data['username'] in taken:
+                errors.append({'row': number, 'errors': {
+                    'username': ["A user with that username already "
+                                 "exists."]}})
+        valid = [(number, data) for number, data in valid
+                 if data['username'] not in taken]
+
+    passwords = hash_passwords(
+        [data.pop('password', None) or None for _, data in valid],
+        processes)
+    users = []
+    for (_, data), password in zip(valid, passwords):
+        user = User(password=password, **data)
+        user.apply_role()
+        users.append(user)
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+    errors.sort(key=lambda error: error['row'])
+    return len(users), errors
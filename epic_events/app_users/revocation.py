@@ -0,0 +1,192 @@
+# app_users/revocation.py
+# created 19/10/2026 at 11:05 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 20:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/revocation.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import hashlib
+import math
+import operator
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import reduce
+
+# third party imports
+from rest_framework_simplejwt.settings import api_settings
+
+# django imports
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# local application imports
+from .models import RevokedToken, User
+
+# other imports & constants
+REFRESH_INTERVAL = getattr(settings, 'REVOCATION_REFRESH_INTERVAL', 2)
+REBUILD_INTERVAL = getattr(settings, 'REVOCATION_REBUILD_INTERVAL', 600)
+CAPACITY = getattr(settings, 'REVOCATION_FILTER_CAPACITY', 100000)
+ERROR_RATE = getattr(settings, 'REVOCATION_FILTER_ERROR_RATE', 0.001)
+# rows committed late are still picked by the next refreshes
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Bloom filter of strings, sized for `capacity` items at `error_rate`.
+    It answers "maybe present" or "certainly absent" and items can not be
+    removed, the filter is rebuilt instead.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size
+                for i in range(self.hashes))
+
+    def add(self, item):
+        """ Add `item`, counted only when it was not in the filter yet """
+        added = False
+        for position in self._positions(item):
+            bit = 1 << (position & 7)
+            if not self.bits[position >> 3] & bit:
+                self.bits[position >> 3] |= bit
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+def token_key(jti):
+    return f'jti:{jti}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+class RevocationList:
+    """
+    Per-worker view of the RevokedToken table.
+
+    The keys are compiled in a Bloom filter, refreshed with the rows
+    revoked since the start of the last refresh (minus REFRESH_OVERLAP)
+    at most every REFRESH_INTERVAL seconds, and rebuilt from scratch
+    every REBUILD_INTERVAL seconds or when it is full, which drops the
+    expired rows.
+    A token absent from the filter is not revoked, this costs no query.
+    A match is confirmed with one query, false positives included.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._refreshed_at = 0.0
+            self._rebuilt_at = 0.0
+            self._since = None
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < REFRESH_INTERVAL:
+            return
+        with self._lock:
+            if not force and now - self._refreshed_at < REFRESH_INTERVAL:
+                return
+            # the next refresh reads from here, found rows or not
+            since = timezone.now()
+            rows = RevokedToken.objects.values_list('key', flat=True)
+            bloom = self._filter
+            if (bloom is None or bloom.count >= bloom.capacity
+                    or now - self._rebuilt_at >= REBUILD_INTERVAL):
+                live = rows.filter(Q(expires_at__isnull=True) |
+                                   Q(expires_at__gt=since))
+                bloom = BloomFilter(max(CAPACITY, 2 * live.count()),
+                                    ERROR_RATE)
+                rows = live.iterator()
+                self._rebuilt_at = now
+            else:
+                rows = rows.filter(
+                    revoked_at__gte=self._since - REFRESH_OVERLAP)
+            for key in rows:
+                bloom.add(key)
+            self._filter = bloom
+            self._since = since
+            self._refreshed_at = now
+
+    def is_revoked(self, token):
+        """
+        Whether `token` or every token of its user issued before it was
+        revoked.
+        """
+        self.refresh()
+        issued_at = datetime.fromtimestamp(token.get('iat', 0),
+                                           tz=dt_timezone.utc)
+        jti_key = token_key(token.get(api_settings.JTI_CLAIM))
+        owner_key = user_key(token.get(api_settings.USER_ID_CLAIM))
+        conditions = []
+        if jti_key in self._filter:
+            conditions.append(Q(key=jti_key))
+        if owner_key in self._filter:
+            conditions.append(Q(key=owner_key, revoked_at__gte=issued_at))
+        if not conditions:
+            return False
+        return RevokedToken.objects.filter(
+            reduce(operator.or_, conditions)).exists()
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """ Revoke a single access or refresh token """
+    RevokedToken.objects.get_or_create(
+        key=token_key(token[api_settings.JTI_CLAIM]),
+        defaults={
+            'revoked_at': timezone.now(),
+            'expires_at': datetime.fromtimestamp(token['exp'],
+                                                 tz=dt_timezone.utc),
+        })
+
+
+def revoke_user(user):
+    """ Revoke every token issued to `user` until now """
+    RevokedToken.objects.update_or_create(
+        key=user_key(user.pk), defaults={'revoked_at': timezone.now()})
+
+
+@receiver(post_save, sender=User)
+def revoke_inactive_user(sender, instance, **kwargs):
+    """ Deactivating a user revokes all of their tokens """
+    if not instance.is_active:
+        revoke_user(instance)
@@ -1,6 +1,6 @@
 # app_users/serializers.py
 # created 14/03/2022 at 09:24 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 14/03/2022 at 09:24 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:15 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_users/serializers.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.8"
+__version__ = "0.1.12"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -20,29 +20,89 @@ __status__ = "Development"
 # third party imports
 
 # django imports
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.serializers import (
-    TokenObtainSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
 )
-from rest_framework_simplejwt.tokens import AccessToken
 
 # local application imports
+from .authentication import remember_state
+from .backends import raise_pool_full
+from .login_pool import LoginPoolFull
+from .models import User
+from .revocation import revocation_list
 
 # other imports & constants
 
 
-class MyTokenObtainSerializer(TokenObtainSerializer):
+class LoginUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins at once, try again shortly."
+    default_code = 'login_unavailable'
+    # seconds sent in the Retry-After header
+    wait = 1
+
+
+class MyTokenObtainSerializer(TokenObtainPairSerializer):
     """
     Custom token obtain serializer.
+    The tokens carry the role and the active flag of the user, so reads
+    are authorized without loading the user
+    (see authentication.StatelessJWTAuthentication).
+    A login refused by the saturated hashing pool is answered 503.
     """
 
+    def validate(self, attrs):
+        token = raise_pool_full.set(True)
+        try:
+            return super().validate(attrs)
+        except LoginPoolFull:
+            raise LoginUnavailable
+        finally:
+            raise_pool_full.reset(token)
+
     @classmethod
     def get_token(cls, user):
         """
         Returns a token for a given user.
         """
-        return AccessToken.for_user(user)
+        token = super().get_token(user)
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        remember_state(user)
+        return token
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Custom token refresh serializer.
+    Revoked refresh tokens, or those of a deactivated user, are refused.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocation_list.is_revoked(refresh):
+            raise InvalidToken("Token is revoked")
+        return super().validate(attrs)
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    A row of a users import (see provisioning.import_users).
+    The role is required. The uniqueness of the usernames is checked
+    for the whole file at once, not row by row.
+    """
 
-    def validated(self, attrs):
-        data = super().validated(attrs)
-        access = self.get_token(self.user)
-        data['access'] = str(access)
+    class Meta:
+        model = User
+        fields = ['username', 'password', 'role', 'first_name',
+                  'last_name', 'email']
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'password': {'required': False, 'allow_blank': True},
+            'role': {'required': True},
+        }
@@ -1,3 +1,865 @@
-from django.test import TestCase
+# app_users/tests.py
+# created 19/10/2026 at 09:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:26 by Antoine 'AatroXiss' BEAUDESSON
 
-# Create your tests here.
+""" app_users/tests.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.5"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+# third party imports
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+# django imports
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+# local application imports
+from app_crm.tests.setup import THROTTLE_STORE
+from epic_events.latency import LatencyRecorder
+from epic_events.pooled_postgresql.pool import ConnectionPool, PoolTimeout
+from .authentication import RoleTokenUser, StatelessJWTAuthentication
+from .login_pool import (
+    HashingPool,
+    LoginPoolFull,
+    hashing_pool,
+    login_latency
+)
+from .models import RevokedToken, User
+from .provisioning import hash_passwords, import_users, read_rows
+from .revocation import BloomFilter, revocation_list, revoke_token
+from .throttling import (
+    CacheCounterStore,
+    RoleRateThrottle,
+    SQLiteCounterStore,
+    get_store
+)
+from .token_cache import VerifiedTokenCache, token_cache
+
+# other imports & constants
+PASSWORD = "BgfpBe4qS8$Gy76$G#LfEbKxxxMY"
+LOGIN_URL = reverse('app_users:login')
+POOLED_ENGINE = 'epic_events.pooled_postgresql'
+
+
+class FakeConnection:
+    """ Stands for a database connection in the pool tests """
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestThrottle(RoleRateThrottle):
+    THROTTLE_RATES = {'user': '50/m', 'sales': '3/m', 'management': None}
+
+
+def throttled_requests(path, attempts):
+    """ Return how many of `attempts` requests of user 1 are allowed """
+    store = SQLiteCounterStore(path)
+    request = SimpleNamespace(user=SimpleNamespace(
+        is_authenticated=True, pk=1, role='support'))
+    allowed = 0
+    for _ in range(attempts):
+        throttle = TestThrottle()
+        throttle.store = store
+        allowed += throttle.allow_request(request, None)
+    return allowed
+
+
+@override_settings(THROTTLE_STORE=THROTTLE_STORE)
+class AuthTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_store().clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(
+            username='user_sales',
+            password=PASSWORD,
+            role='sales')
+        self.login()
+        revocation_list.reset()
+        revocation_list.refresh()
+
+    def login(self):
+        response = self.client.post(
+            LOGIN_URL, {'username': 'user_sales', 'password': PASSWORD},
+            format='json')
+        self.access = response.data['access']
+        self.refresh = response.data['refresh']
+
+    def authenticate(self, method='get', token=None):
+        factory = APIRequestFactory()
+        request = getattr(factory, method)(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token or self.access}')
+        return StatelessJWTAuthentication().authenticate(Request(request))
+
+
+class StatelessAuthenticationTests(AuthTestCase):
+    """
+    In this class we are testing StatelessJWTAuthentication.
+
+    - reads are authorized from the token claims
+    - writes load the user
+    - deactivated users and role changes are refused
+    """
+
+    def test_claims(self):
+        """
+        login
+        - Assert:
+            - the access token carries the role and the active flag
+        """
+        token = AccessToken(self.access)
+        self.assertEqual(token['role'], 'sales')
+        self.assertTrue(token['is_active'])
+
+    def test_read_without_query(self):
+        """
+        safe request
+        - Assert:
+            - 0 query
+            - a token user with the role of the user
+        """
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertIsInstance(user, RoleTokenUser)
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(user.role, 'sales')
+
+    def test_expired_state(self):
+        """
+        safe request once the cached state expired
+        - Assert:
+            - 1 query
+        """
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    def test_write_loads_user(self):
+        """
+        unsafe request
+        - Assert:
+            - the user is loaded from the database
+        """
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate('post')
+        self.assertIsInstance(user, User)
+
+    def test_token_without_claims(self):
+        """
+        token issued without the role claim
+        - Assert:
+            - the user is loaded from the database
+        """
+        user, _ = self.authenticate(token=str(AccessToken.for_user(
+            self.user)))
+        self.assertIsInstance(user, User)
+
+    def test_inactive_user(self):
+        """
+        deactivated user
+        - Assert:
+            - reads and writes are refused
+        """
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate('post')
+
+    def test_role_change(self):
+        """
+        user moved to another role
+        - Assert:
+            - the token is refused on reads
+            - a new login works
+        """
+        self.user.role = 'support'
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        self.login()
+        user, _ = self.authenticate()
+        self.assertEqual(user.role, 'support')
+
+    def test_refresh(self):
+        """
+        refreshed access token
+        - Assert:
+            - it keeps the claims
+        """
+        response = self.client.post(reverse('app_users:refresh'),
+                                    {'refresh': self.refresh}, format='json')
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token['role'], 'sales')
+
+
+class TokenCacheTests(AuthTestCase):
+    """
+    In this class we are testing the verified tokens cache.
+
+    - a token is verified once, then served from the cache
+    - entries expire with the token and the least recently used go first
+    - the counters are served to the management role
+    """
+
+    def test_hits(self):
+        """
+        the same token twice
+        - Assert:
+            - 1 miss, then 1 hit returning the same token user
+        """
+        first, _ = self.authenticate()
+        second, _ = self.authenticate()
+        self.assertIs(first, second)
+        stats = token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_expired_entry(self):
+        """
+        cached token past its exp
+        - Assert:
+            - it is a miss
+        """
+        cache = VerifiedTokenCache(10)
+        cache.set(b'key', {'exp': time.time() - 1}, None)
+        self.assertIsNone(cache.get(b'key'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_eviction(self):
+        """
+        more tokens than maxsize
+        - Assert:
+            - the least recently used one is evicted
+        """
+        cache = VerifiedTokenCache(2)
+        exp = {'exp': time.time() + 60}
+        cache.set(b'a', exp, None)
+        cache.set(b'b', exp, None)
+        cache.get(b'a')
+        cache.set(b'c', exp, None)
+        self.assertIsNone(cache.get(b'b'))
+        self.assertIsNotNone(cache.get(b'a'))
+        self.assertIsNotNone(cache.get(b'c'))
+
+    def test_threads(self):
+        """
+        concurrent lookups
+        - Assert:
+            - every lookup is counted, the size stays bounded
+        """
+        cache = VerifiedTokenCache(50)
+        exp = {'exp': time.time() + 60}
+
+        def work():
+            for i in range(1000):
+                key = cache.digest(str(i % 100))
+                if cache.get(key) is None:
+                    cache.set(key, exp, None)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 8000)
+        self.assertLessEqual(stats['size'], 50)
+
+    def test_stats_endpoint(self):
+        """
+        GET the counters
+        - Assert:
+            - 403 for the sales role, 200 for the management role
+        """
+        url = reverse('app_users:token-cache')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        User.objects.create_user(username='user_management',
+                                 password=PASSWORD, role='management')
+        response = self.client.post(
+            LOGIN_URL, {'username': 'user_management', 'password': PASSWORD},
+            format='json')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hits', response.data)
+
+
+class RevocationTests(AuthTestCase):
+    """
+    In this class we are testing the revoked tokens.
+
+    - tokens that are not revoked cost no query
+    - logout revokes the access and the refresh tokens
+    - deactivating a user revokes all of their tokens
+    - the refreshes read the recent rows only, counted once
+    """
+
+    def test_not_revoked(self):
+        """
+        token absent from the filter
+        - Assert:
+            - 0 query
+        """
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation_list.is_revoked(
+                AccessToken(self.access)))
+
+    def test_logout(self):
+        """
+        POST logout/ with the refresh token
+        - Assert:
+            - 204
+            - both tokens are refused once the filter is refreshed
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = self.client.post(reverse('app_users:logout'),
+                                    {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+        revocation_list.refresh(force=True)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        response = self.client.post(reverse('app_users:refresh'),
+                                    {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivate(self):
+        """
+        deactivated user
+        - Assert:
+            - their tokens are revoked, even with a fresh state cache
+            - tokens issued after a reactivation are accepted
+        """
+        self.user.is_active = False
+        self.user.save()
+        revocation_list.refresh(force=True)
+        self.assertTrue(revocation_list.is_revoked(AccessToken(self.access)))
+        self.assertTrue(revocation_list.is_revoked(
+            RefreshToken(self.refresh)))
+
+        self.user.is_active = True
+        self.user.save()
+        token = AccessToken.for_user(self.user)
+        token['iat'] += 1
+        self.assertFalse(revocation_list.is_revoked(token))
+
+    def test_incremental_refresh(self):
+        """
+        refresh of an empty table, then 3 refreshes after a logout
+        - Assert:
+            - the 3 refreshes read the recently revoked rows only
+            - the revoked token is counted once in the filter
+        """
+        revocation_list.reset()
+        revocation_list.refresh(force=True)
+        revoke_token(AccessToken(self.access))
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as context:
+                revocation_list.refresh(force=True)
+            self.assertIn('"revoked_at" >=',
+                          context.captured_queries[0]['sql'])
+        self.assertTrue(revocation_list.is_revoked(AccessToken(self.access)))
+        self.assertEqual(revocation_list._filter.count, 1)
+
+    def test_bloom_filter(self):
+        """
+        filter of 1000 keys
+        - Assert:
+            - no false negative
+            - about 0.1% false positives
+        """
+        bloom = BloomFilter(1000, 0.001)
+        for i in range(1000):
+            bloom.add(f'jti:{i}')
+        self.assertTrue(all(f'jti:{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'jti:other{i}' in bloom
+                              for i in range(10000))
+        self.assertLess(false_positives, 50)
+
+
+class LoginPoolTests(AuthTestCase):
+    """
+    In this class we are testing the login hashing pool.
+
+    - passwords are checked on the pool
+    - a saturated pool rejects logins right away with a 503
+    - login latency percentiles are served to the management role
+    """
+
+    def test_bounded(self):
+        """
+        more hashes than workers and pending slots
+        - Assert:
+            - the extra one is rejected without waiting
+            - a slot is given back once a hash is done
+        """
+        pool = HashingPool(workers=1, max_pending=1, timeout=5)
+        release = threading.Event()
+        threads = [threading.Thread(target=pool.run, args=(release.wait,))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while pool._slots._value:
+            time.sleep(0.01)
+        start = time.perf_counter()
+        with self.assertRaises(LoginPoolFull):
+            pool.run(time.sleep, 0)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(pool.rejected, 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_rejections(self):
+        """
+        8 threads rejected 500 times each by a saturated pool
+        - Assert:
+            - every rejection is counted
+        """
+        pool = HashingPool(workers=1, max_pending=0, timeout=5)
+        release = threading.Event()
+        thread = threading.Thread(target=pool.run, args=(release.wait,))
+        thread.start()
+        while pool._slots._value:
+            time.sleep(0.01)
+
+        def reject():
+            for _ in range(500):
+                with self.assertRaises(LoginPoolFull):
+                    pool.run(time.sleep, 0)
+
+        rejecting = [threading.Thread(target=reject) for _ in range(8)]
+        for rejecter in rejecting:
+            rejecter.start()
+        for rejecter in rejecting:
+            rejecter.join()
+        release.set()
+        thread.join()
+        self.assertEqual(pool.rejected, 4000)
+        self.assertEqual(pool.run(sum, [1, 2]), 3)
+
+    def test_wrong_password(self):
+        """
+        login with a wrong password
+        - Assert:
+            - 401
+        """
+        response = self.client.post(
+            LOGIN_URL, {'username': 'user_sales', 'password': 'wrong'},
+            format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_saturated(self):
+        """
+        login while every slot of the pool is taken
+        - Assert:
+            - 503 with a Retry-After header
+        """
+        slots = hashing_pool.workers + hashing_pool.max_pending
+        for _ in range(slots):
+            hashing_pool._slots.acquire()
+        try:
+            response = self.client.post(
+                LOGIN_URL, {'username': 'user_sales', 'password': PASSWORD},
+                format='json')
+        finally:
+            for _ in range(slots):
+                hashing_pool._slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_saturated_authenticate(self):
+        """
+        authenticate() outside of the API, e.g. by the admin, while every
+        slot of the pool is taken
+        - Assert:
+            - the authentication fails instead of raising
+        """
+        slots = hashing_pool.workers + hashing_pool.max_pending
+        for _ in range(slots):
+            hashing_pool._slots.acquire()
+        try:
+            user = authenticate(username='user_sales', password=PASSWORD)
+        finally:
+            for _ in range(slots):
+                hashing_pool._slots.release()
+        self.assertIsNone(user)
+
+    def test_percentiles(self):
+        """
+        100 durations of 1 to 100 ms
+        - Assert:
+            - nearest-rank p50, p90 and p99
+        """
+        recorder = LatencyRecorder()
+        for duration in range(1, 101):
+            recorder.record(duration / 1000)
+        self.assertEqual(recorder.percentiles(50, 90, 99),
+                         {'p50': 50.0, 'p90': 90.0, 'p99': 99.0})
+
+    def test_stats_endpoint(self):
+        """
+        GET the login stats as management
+        - Assert:
+            - 200 with the percentiles of the logins
+        """
+        login_latency.clear()
+        User.objects.create_user(username='user_management',
+                                 password=PASSWORD, role='management')
+        response = self.client.post(
+            LOGIN_URL, {'username': 'user_management', 'password': PASSWORD},
+            format='json')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        response = self.client.get(reverse('app_users:login-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertIsNotNone(response.data['p99'])
+
+
+class ProvisioningTests(AuthTestCase):
+    """
+    In this class we are testing the bulk import of users.
+
+    - rows are read from CSV and NDJSON
+    - the role sets the admin flags, the passwords are hashed
+    - invalid rows are reported and skipped
+    """
+    CSV = ("username,password,role,email\n"
+           "new_sales,Pass-1-word,sales,sales@epicevents.com\n"
+           "new_management,Pass-2-word,management,\n")
+
+    def test_import(self):
+        """
+        CSV of a sales and a management user
+        - Assert:
+            - both are created, the passwords are hashed
+            - only the management user has the admin flags
+        """
+        created, errors = import_users(
+            read_rows(io.StringIO(self.CSV), 'csv'), processes=1)
+        self.assertEqual((created, errors), (2, []))
+        sales = User.objects.get(username='new_sales')
+        management = User.objects.get(username='new_management')
+        self.assertTrue(sales.check_password('Pass-1-word'))
+        self.assertFalse(sales.is_staff or sales.is_superuser)
+        self.assertTrue(management.is_staff and management.is_superuser)
+
+    def test_errors(self):
+        """
+        NDJSON with invalid rows
+        - Assert:
+            - the valid row is created
+            - the other ones are reported with their row number
+        """
+        lines = [
+            '{"username": "new_support", "role": "support"}',
+            '{"username": "new_support", "role": "support"}',
+            '{"username": "user_sales", "role": "sales"}',
+            '{"username": "no_role"}',
+            'not json',
+        ]
+        created, errors = import_users(
+            read_rows(io.StringIO('\n'.join(lines)), 'ndjson'),
+            processes=1)
+        self.assertEqual(created, 1)
+        self.assertEqual([error['row'] for error in errors], [2, 3, 4, 5])
+        self.assertIn('role', errors[2]['errors'])
+        self.assertFalse(
+            User.objects.get(username='new_support').has_usable_password())
+
+    def test_process_pool(self):
+        """
+        hash in 2 processes
+        - Assert:
+            - the hashes match the passwords, in order
+        """
+        hashes = hash_passwords(['first', 'second', 'third'], processes=2)
+        self.assertEqual(
+            [check_password(password, encoded) for password, encoded
+             in zip(['first', 'second', 'third'], hashes)],
+            [True, True, True])
+
+    def test_command(self):
+        """
+        bulk_import_users with a file holding a rejected row
+        - Assert:
+            - the valid rows are created
+            - the command fails
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv',
+                                         delete=False) as file:
+            file.write(self.CSV + "user_sales,,sales,\n")
+        try:
+            with self.assertRaises(CommandError):
+                call_command('bulk_import_users', file.name, processes=1,
+                             stdout=io.StringIO(), stderr=io.StringIO())
+        finally:
+            os.unlink(file.name)
+        self.assertEqual(User.objects.filter(
+            username__startswith='new_').count(), 2)
+
+    def test_admin_upload(self):
+        """
+        upload a CSV file on the admin website
+        - Assert:
+            - the sales role is sent to the admin login page
+            - the users are created for the management role
+            - the rows rejected are listed
+        """
+        url = reverse('admin:app_users_user_import')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(User.objects.create_user(
+            username='user_management', password=PASSWORD,
+            role='management'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'file': SimpleUploadedFile(
+            'users.csv', self.CSV.encode())})
+        self.assertRedirects(
+            response, reverse('admin:app_users_user_changelist'))
+        self.assertEqual(User.objects.filter(
+            username__startswith='new_').count(), 2)
+
+        response = self.client.post(url, {'file': SimpleUploadedFile(
+            'users.csv', self.CSV.encode())})
+        self.assertContains(response, 'row 2: username')
+
+
+class ThrottlingTests(AuthTestCase):
+    """
+    In this class we are testing the sliding window throttles.
+
+    - the previous window weighs on the current one
+    - each role has its own rate
+    - the limit holds across processes sharing the store
+    """
+
+    def throttle(self, role, now, store=None):
+        throttle = TestThrottle()
+        throttle.store = store or CacheCounterStore()
+        throttle.timer = lambda: now
+        request = SimpleNamespace(user=SimpleNamespace(
+            is_authenticated=True, pk=self.user.pk, role=role))
+        return throttle, throttle.allow_request(request, None)
+
+    def test_sliding_window(self):
+        """
+        sales rate of 3/m
+        - Assert:
+            - the 4th request of a minute is refused with a wait
+            - half a minute later, the previous window counts for half
+        """
+        start = 600.0
+        allowed = [self.throttle('sales', start)[1] for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+        throttle, _ = self.throttle('sales', start)
+        self.assertEqual(throttle.wait(), 60)
+
+        allowed = [self.throttle('sales', start + 90)[1] for _ in range(3)]
+        self.assertEqual(allowed, [True, False, False])
+        throttle, _ = self.throttle('sales', start + 90)
+        self.assertAlmostEqual(throttle.wait(), 10)
+
+    def test_role_rates(self):
+        """
+        support user without a rate of their own, management without limit
+        - Assert:
+            - support gets the user rate, management is never refused
+        """
+        allowed = [self.throttle('support', 600.0)[1] for _ in range(51)]
+        self.assertEqual(allowed.count(True), 50)
+        self.assertTrue(all(self.throttle('management', 600.0)[1]
+                            for _ in range(100)))
+
+    def test_processes(self):
+        """
+        4 processes sharing a SQLite store, 30 requests each, rate of 50/m
+        - Assert:
+            - exactly 50 requests are allowed
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'throttle.sqlite3')
+            SQLiteCounterStore(path).clear()
+            with multiprocessing.Pool(4) as pool:
+                allowed = pool.starmap(throttled_requests,
+                                       [(path, 30)] * 4)
+        self.assertEqual(sum(allowed), 50)
+
+    def test_endpoint(self):
+        """
+        GET once the rate of the user is spent
+        - Assert:
+            - 429 with a Retry-After header
+        """
+        store = get_store()
+        window = int(time.time() // 86400)
+        store.incr(f'throttle_sales_{self.user.pk}:{window}', 86400, 500)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = self.client.get(reverse('app_crm:customers-list'))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class DatabasePoolTests(AuthTestCase):
+    """
+    In this class we are testing the database connection pool.
+
+    - connections are reused and the pool is bounded
+    - old and failing connections are replaced
+    - the pool stats are served to the management role
+    """
+
+    def test_reuse(self):
+        """
+        two checkouts one after the other
+        - Assert:
+            - the same connection is given twice, opened once
+        """
+        pool = ConnectionPool(FakeConnection, max_size=2)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(pool.created, 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_bounded(self):
+        """
+        checkout of a pool of 1 whose connection is in use
+        - Assert:
+            - PoolTimeout after the timeout
+            - a waiting checkout gets the connection given back
+        """
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.05)
+        connection = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.timeouts, 1)
+
+        pool.timeout = 5
+        checked_out = []
+        thread = threading.Thread(
+            target=lambda: checked_out.append(pool.acquire()))
+        thread.start()
+        while not pool.waiting:
+            time.sleep(0.01)
+        pool.release(connection)
+        thread.join()
+        self.assertEqual(checked_out, [connection])
+        self.assertEqual(pool.created, 1)
+
+    def test_recycle(self):
+        """
+        connection older than max_age, then one failing its check
+        - Assert:
+            - both are closed and replaced by new ones
+        """
+        pool = ConnectionPool(FakeConnection, max_age=0)
+        old = pool.acquire()
+        pool.release(old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.recycled, 1)
+
+        pool.max_age = 300
+        broken = pool.acquire()
+        pool.release(broken)
+        broken.closed = True
+        self.assertIsNot(pool.acquire(), broken)
+        self.assertEqual((pool.failed_checks, pool.created), (1, 3))
+
+    def test_check_unlocked(self):
+        """
+        checkout of an idle connection, the pool stats read by another
+        thread during its check
+        - Assert:
+            - the stats are read before the check ends
+        """
+        stats, read_during_check = [], []
+
+        class CheckedPool(ConnectionPool):
+            def check(self, connection, idle_for):
+                thread = threading.Thread(
+                    target=lambda: stats.append(self.stats()))
+                thread.start()
+                thread.join(1)
+                read_during_check.append(bool(stats))
+                return True
+
+        pool = CheckedPool(FakeConnection)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(read_during_check, [True])
+        self.assertEqual((stats[0]['in_use'], stats[0]['idle']), (1, 0))
+
+    def test_close_all(self):
+        """
+        close the pool while a connection is in use
+        - Assert:
+            - the idle one is closed at once, the other when given back
+        """
+        pool = ConnectionPool(FakeConnection)
+        idle, in_use = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.close_all()
+        self.assertTrue(idle.closed)
+        self.assertFalse(in_use.closed)
+        pool.release(in_use)
+        self.assertTrue(in_use.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_stats_endpoint(self):
+        """
+        GET the pool stats as management
+        - Assert:
+            - 200 with the connections of the default database
+        """
+        User.objects.create_user(username='user_management',
+                                 password=PASSWORD, role='management')
+        response = self.client.post(
+            LOGIN_URL, {'username': 'user_management', 'password': PASSWORD},
+            format='json')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        response = self.client.get(reverse('app_users:db-pool-stats'))
+        self.assertEqual(response.status_code, 200)
+        if connection.settings_dict['ENGINE'] != POOLED_ENGINE:
+            self.skipTest('the database is not pooled')
+        pools = [pool for pool in response.data
+                 if pool['alias'] == 'default']
+        self.assertGreaterEqual(pools[0]['in_use'], 1)
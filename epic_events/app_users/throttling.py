@@ -0,0 +1,202 @@
+# app_users/throttling.py
+# created 19/10/2026 at 16:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 16:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/throttling.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+# third party imports
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+# django imports
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# local application imports
+
+# other imports & constants
+# expired counters are deleted every PURGE_EVERY hits of a connection
+PURGE_EVERY = 1000
+
+
+class SQLiteCounterStore:
+    """
+    Counters kept in a SQLite file, shared by the workers of a server.
+
+    An increment is a single upsert statement, SQLite serializes the
+    writers so the counts are exact across processes. The file is opened
+    in WAL mode, one connection per thread.
+    """
+
+    def __init__(self, path, timeout=5):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS counter ('
+                'key TEXT PRIMARY KEY, count INTEGER NOT NULL, '
+                'expires_at REAL NOT NULL)')
+            self._local.connection = connection
+            self._local.hits = 0
+        return connection
+
+    def incr(self, key, ttl, delta=1):
+        """ Add `delta` to the counter `key` and return its new value """
+        now = time.time()
+        connection = self.connection
+        self._local.hits += 1
+        if self._local.hits % PURGE_EVERY == 0:
+            connection.execute('DELETE FROM counter WHERE expires_at < ?',
+                               (now,))
+        return connection.execute(
+            'INSERT INTO counter (key, count, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET count = count + excluded.count '
+            'RETURNING count', (key, delta, now + ttl)).fetchone()[0]
+
+    def get(self, key):
+        row = self.connection.execute(
+            'SELECT count FROM counter WHERE key = ? AND expires_at >= ?',
+            (key, time.time())).fetchone()
+        return row[0] if row else 0
+
+    def clear(self):
+        self.connection.execute('DELETE FROM counter')
+
+
+class CacheCounterStore:
+    """
+    Counters kept in a Django cache. Increments are atomic with the
+    Redis and Memcached backends only.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def incr(self, key, ttl, delta=1):
+        """ Add `delta` to the counter `key` and return its new value """
+        self.cache.add(key, 0, ttl)
+        try:
+            return self.cache.incr(key, delta)
+        except ValueError:
+            # expired between add() and incr()
+            self.cache.add(key, delta, ttl)
+            return delta
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+    def clear(self):
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    """ The counter store set by the THROTTLE_STORE setting """
+    config = getattr(settings, 'THROTTLE_STORE', {
+        'BACKEND': 'app_users.throttling.CacheCounterStore'})
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    # e.g. the store of the tests, set with override_settings
+    if setting == 'THROTTLE_STORE':
+        get_store.cache_clear()
+
+
+class SlidingWindowMixin:
+    """
+    Sliding window counter replacing the timestamps list of DRF's
+    SimpleRateThrottle, in the shared counter store.
+
+    Each client has one counter per fixed window of `duration` seconds.
+    The requests of the sliding window are estimated as the count of the
+    current window plus the share of the previous one the sliding window
+    still covers. This keeps two counters per client whatever the rate.
+    The counter is incremented first and decremented back when the
+    request is refused, so concurrent workers can not exceed the limit.
+    """
+    # the THROTTLE_STORE one when None
+    store = None
+
+    def allow_request(self, request, view):
+        self.key = self.get_cache_key(request, view)
+        if self.key is None or self.rate is None:
+            return True
+
+        store = self.store or get_store()
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f'{self.key}:{window}'
+        self.elapsed = self.now - window * self.duration
+        self.previous = store.get(f'{self.key}:{window - 1}')
+        self.current = store.incr(current_key, 2 * self.duration)
+        if self.estimate(self.current) <= self.num_requests:
+            return True
+        self.current = store.incr(current_key, 2 * self.duration, -1)
+        return self.throttle_failure()
+
+    def estimate(self, current):
+        weight = 1 - self.elapsed / self.duration
+        return self.previous * weight + current
+
+    def wait(self):
+        """ Seconds until the estimate drops under the limit """
+        available = self.num_requests - 1 - self.current
+        if available < 0 or not self.previous:
+            return self.duration - self.elapsed
+        # the previous window weighs (1 - t / duration)
+        covered = self.duration * (1 - available / self.previous)
+        return max(0.0, covered - self.elapsed)
+
+
+class AnonSlidingWindowThrottle(SlidingWindowMixin, AnonRateThrottle):
+    """ AnonRateThrottle in the shared counter store """
+
+
+class RoleRateThrottle(SlidingWindowMixin, UserRateThrottle):
+    """
+    UserRateThrottle in the shared counter store, with the rate of the
+    role of the user when DEFAULT_THROTTLE_RATES has one, the `user`
+    rate otherwise.
+    """
+
+    def get_cache_key(self, request, view):
+        role = getattr(request.user, 'role', None)
+        if role in self.THROTTLE_RATES:
+            self.scope = role
+            self.rate = self.get_rate()
+            self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().get_cache_key(request, view)
@@ -0,0 +1,98 @@
+# app_users/token_cache.py
+# created 19/10/2026 at 10:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 10:20 by Antoine 'AatroXiss' BEAUDESSON
+
+""" app_users/token_cache.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# third party imports
+
+# django imports
+from django.conf import settings
+
+# local application imports
+
+# other imports & constants
+
+
+class VerifiedTokenCache:
+    """
+    In-process LRU cache of the access tokens already verified.
+
+    Entries are keyed by the SHA-256 digest of the raw token, so the
+    tokens themselves are not kept in memory, and hold the validated
+    token and the token user built from it until the `exp` claim.
+    A hit skips the signature check and the claims decoding.
+    The cache holds at most `maxsize` entries, the least recently used
+    one is evicted first. Every method takes the same lock.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, key):
+        """ Return the (token, user) cached for `key`, or None """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, token, user = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return token, user
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, token, user):
+        with self._lock:
+            self._entries[key] = (token['exp'], token, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = VerifiedTokenCache(getattr(settings, 'TOKEN_CACHE_SIZE', 10000))
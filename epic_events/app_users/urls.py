@@ -1,6 +1,6 @@
 # app_users/urls.py
 # created 09/03/2022 at 09:58 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 24/03/2022 at 10:14 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:09 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_users/urls.py:
     - *
@@ -10,7 +10,7 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.22"
+__version__ = "0.1.26"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
@@ -21,17 +21,28 @@ __status__ = "Development"
 
 # django imports
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView
-)
 
 # local application imports
+from .views import (
+    DatabasePoolStatsView,
+    LoginStatsView,
+    LogoutView,
+    MyTokenObtainView,
+    MyTokenRefreshView,
+    TokenCacheStatsView
+)
 
 # other imports & constants
 
 app_name = 'app_users'
 urlpatterns = [
-    path('login/', TokenObtainPairView.as_view(), name='login'),
-    path('login/refresh/', TokenRefreshView.as_view(), name='refresh'),
+    path('login/', MyTokenObtainView.as_view(), name='login'),
+    path('login/refresh/', MyTokenRefreshView.as_view(), name='refresh'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+    path('auth/token-cache/', TokenCacheStatsView.as_view(),
+         name='token-cache'),
+    path('auth/login-stats/', LoginStatsView.as_view(),
+         name='login-stats'),
+    path('db/pool-stats/', DatabasePoolStatsView.as_view(),
+         name='db-pool-stats'),
 ]
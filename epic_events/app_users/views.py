@@ -1,6 +1,6 @@
 # app_users/views.py
 # created 14/03/2022 at 09:31 by Antoine 'AatroXiss' BEAUDESSON
-# last modified 14/03/2022 at 09:31 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 20:09 by Antoine 'AatroXiss' BEAUDESSON
 
 """ app_users/views.py:
     - *
@@ -10,25 +10,109 @@ __author__ = "Antoine 'AatroXiss' BEAUDESSON"
 __copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
 __credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
 __license__ = ""
-__version__ = "0.1.8"
+__version__ = "0.1.11"
 __maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
 __email__ = "antoine.beaudesson@gmail.com"
 __status__ = "Development"
 
 # standard library imports
+import time
 
 # third party imports
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenViewBase
 
 # django imports
 
 # local application imports
+from app_crm.permissions import IsManagement
+from epic_events.pooled_postgresql.base import pool_stats
+from .login_pool import hashing_pool, login_latency
+from .revocation import revoke_token
 from .serializers import (
-    MyTokenObtainSerializer
+    MyTokenObtainSerializer,
+    MyTokenRefreshSerializer
 )
+from .token_cache import token_cache
 
 # other imports & constants
 
 
 class MyTokenObtainView(TokenViewBase):
+    """
+    Login, its duration is recorded apart from the CRM requests
+    (see LoginStatsView).
+    """
     serializer_class = MyTokenObtainSerializer
+
+    def post(self, request, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().post(request, *args, **kwargs)
+        finally:
+            login_latency.record(time.perf_counter() - start)
+
+
+class MyTokenRefreshView(TokenViewBase):
+    serializer_class = MyTokenRefreshSerializer
+
+
+class LogoutView(APIView):
+    """
+    Revoke the access token of the request and, when it is given in the
+    body, the refresh token.
+    """
+
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        if refresh is not None:
+            try:
+                revoke_token(RefreshToken(refresh))
+            except TokenError as error:
+                raise InvalidToken(error.args[0])
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TokenCacheStatsView(APIView):
+    """
+    Counters of the verified tokens cache of the worker answering.
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+
+    def get(self, request):
+        return Response(token_cache.stats())
+
+
+class LoginStatsView(APIView):
+    """
+    Login latency percentiles, in milliseconds, and hashing pool
+    counters of the worker answering.
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+
+    def get(self, request):
+        return Response({
+            **login_latency.percentiles(50, 90, 99),
+            'count': login_latency.count,
+            'workers': hashing_pool.workers,
+            'max_pending': hashing_pool.max_pending,
+            'rejected': hashing_pool.rejected,
+        })
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Database connection pools of the worker answering: connections in
+    use and idle, checkouts waiting, and checkout wait percentiles, in
+    milliseconds.
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+
+    def get(self, request):
+        return Response(pool_stats())
@@ -2,6 +2,8 @@
 ASGI config for epic_events project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+It is the handler of Django, also sending the async streams of the
+exports (see epic_events.streaming).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -9,8 +11,12 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from epic_events.streaming import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'epic_events.settings')
 
-application = get_asgi_application()
+# as get_asgi_application() does
+django.setup(set_prefix=False)
+application = ASGIHandler()
@@ -0,0 +1,39 @@
+# epic_events/asgi_urls.py
+# created 18/10/2026 at 23:25 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 18/10/2026 at 23:25 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/asgi_urls.py:
+    - URL configuration of the ASGI server (ASGI_URLCONF): the routes of
+      epic_events.urls, with the CRM lists and details served by async
+      views (see app_crm.asynchronous)
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+
+# django imports
+from django.urls import path, include
+
+# local application imports
+from app_crm import urls as crm_urls
+from app_crm.asynchronous import read_path
+from .urls import urlpatterns as wsgi_urlpatterns
+
+# other imports & constants
+
+urlpatterns = [
+    path('crm/', include((read_path(crm_urls.urlpatterns),
+                          crm_urls.app_name))),
+    *[pattern for pattern in wsgi_urlpatterns
+      if str(pattern.pattern) != 'crm/'],
+]
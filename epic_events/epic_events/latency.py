@@ -0,0 +1,64 @@
+# epic_events/latency.py
+# created 19/10/2026 at 13:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 19:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/latency.py:
+    - percentiles of the latest durations of an operation, shared by the
+      login hashing pool and the database connection pools
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import math
+import threading
+from collections import deque
+
+# third party imports
+
+# django imports
+
+# local application imports
+
+# other imports & constants
+
+
+class LatencyRecorder:
+    """
+    Keep the last `size` durations of an operation and report their
+    percentiles, in milliseconds.
+    """
+
+    def __init__(self, size=1000):
+        self._durations = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._durations.append(seconds * 1000)
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self._durations.clear()
+            self.count = 0
+
+    def percentiles(self, *ranks):
+        """ Nearest-rank percentiles of the recorded durations """
+        with self._lock:
+            durations = sorted(self._durations)
+        if not durations:
+            return {f'p{rank}': None for rank in ranks}
+        return {
+            f'p{rank}': round(durations[max(0, math.ceil(
+                rank / 100 * len(durations)) - 1)], 2)
+            for rank in ranks
+        }
@@ -0,0 +1,142 @@
+# epic_events/pooled_postgresql/base.py
+# created 19/10/2026 at 00:45 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 00:45 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/pooled_postgresql/base.py:
+    - PostgreSQL backend whose connections are checked out of a
+      per-process pool (see pool.ConnectionPool) instead of being opened
+      and closed around each request
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import functools
+import os
+import threading
+
+# third party imports
+from psycopg2 import extensions
+
+# django imports
+from django.db.backends.postgresql import base, creation
+
+# local application imports
+from .pool import ConnectionPool
+
+# other imports & constants
+# pools of the worker process, by alias and connection parameters
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+class PostgresPool(ConnectionPool):
+    """
+    ConnectionPool of psycopg2 connections. The idle ones are checked
+    without a round trip, and with a `SELECT 1` when they were idle for
+    more than `ping_after` seconds.
+    """
+
+    def __init__(self, connect, database=None, ping_after=30, **options):
+        super().__init__(connect, **options)
+        self.database = database
+        self.ping_after = ping_after
+
+    def check(self, connection, idle_for):
+        if connection.closed or (connection.get_transaction_status()
+                                 != extensions.TRANSACTION_STATUS_IDLE):
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    def reset(self, connection):
+        """ Roll back the transaction left open, if any """
+        if (connection.get_transaction_status()
+                != extensions.TRANSACTION_STATUS_IDLE):
+            connection.rollback()
+        connection.autocommit = True
+
+
+def get_pool(alias, conn_params, options, connect):
+    """
+    The pool of the worker process for `alias` and `conn_params`,
+    created with the POOL `options` of the alias on first use. A forked
+    worker starts with no pool: the connections of its parent are not
+    its own.
+    """
+    global _pools_pid
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = PostgresPool(
+                connect, database=conn_params.get('database'),
+                **{name.lower(): value for name, value in options.items()})
+        return pool
+
+
+def close_pools(database=None):
+    """ Close the idle connections of the pools (of `database` only) """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        if database is None or pool.database == database:
+            pool.close_all()
+
+
+def pool_stats():
+    """ Stats of the pools of the worker process """
+    with _pools_lock:
+        pools = [(alias, pool) for (alias, _), pool in _pools.items()]
+    return [{'alias': alias, 'database': pool.database, **pool.stats()}
+            for alias, pool in pools]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # idle connections to the test database would prevent its drop
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Connections are checked out of the pool and given back to it when
+    Django closes them, e.g. at the end of each request with
+    CONN_MAX_AGE = 0. The pool is set by the POOL key of the database
+    settings: MAX_SIZE, TIMEOUT, MAX_AGE and PING_AFTER (see
+    PostgresPool).
+    """
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            self.alias, conn_params, self.settings_dict.get('POOL', {}),
+            functools.partial(super().get_new_connection, conn_params))
+        connection = self.pool.acquire()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
@@ -0,0 +1,234 @@
+# epic_events/pooled_postgresql/pool.py
+# created 19/10/2026 at 00:20 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 19:10 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/pooled_postgresql/pool.py:
+    - *
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import os
+import threading
+import time
+
+# third party imports
+
+# django imports
+from django.db import OperationalError
+
+# local application imports
+from epic_events.latency import LatencyRecorder
+
+# other imports & constants
+
+
+class PoolTimeout(OperationalError):
+    """ No connection of the pool was given back before the timeout """
+
+
+class ConnectionPool:
+    """
+    Bounded pool of the database connections of a worker process,
+    shared by its threads (WSGI threads, thread pool of the ASGI event
+    loop).
+
+    At most `max_size` connections are open at once, a checkout waits
+    at most `timeout` seconds for one of them to be given back and
+    raises PoolTimeout after. Idle connections are reused last in,
+    first out, so the extra ones age and get recycled: on checkout or
+    when given back, a connection opened more than `max_age` seconds
+    ago is closed. The idle ones go through check() on checkout, out of
+    the lock, the failing ones are closed and the next one is tried.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=5, max_age=300):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.wait_time = LatencyRecorder()
+        self.pid = os.getpid()
+        self._idle = []
+        # connection -> time it was opened, idle or not
+        self._opened = {}
+        # connections being opened, their slots are taken
+        self._opening = 0
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.failed_checks = 0
+        self.timeouts = 0
+        self.waiting = 0
+
+    def check(self, connection, idle_for):
+        """
+        Whether a `connection` idle for `idle_for` seconds can still be
+        used
+        """
+        return not connection.closed
+
+    def reset(self, connection):
+        """ Make a `connection` given back ready for its next checkout """
+
+    def acquire(self):
+        """ Check out a connection, opened when none is idle """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            connection, idle_for = self._reserve(deadline)
+            if connection is None:
+                connection = self._open()
+                break
+            # checked out of the lock: the ping of check() does not
+            # hold up the other checkouts and releases
+            if self._check(connection, idle_for):
+                break
+        self.wait_time.record(time.perf_counter() - start)
+        return connection
+
+    def _reserve(self, deadline):
+        """
+        Take the last idle connection and the seconds it was idle for,
+        or (None, None) with a slot to open a new one
+        """
+        with self._condition:
+            while True:
+                taken = self._take_idle()
+                if taken is not None:
+                    return taken
+                if len(self._opened) + self._opening < self.max_size:
+                    self._opening += 1
+                    return None, None
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection available within '
+                        f'{self.timeout}s ({self.max_size} in use)')
+                self.waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+    def _take_idle(self):
+        """
+        The last idle connection not too old and the seconds it was idle
+        for, or None, under the lock
+        """
+        while self._idle:
+            connection, released_at = self._idle.pop()
+            now = time.monotonic()
+            if now - self._opened[connection] <= self.max_age:
+                return connection, now - released_at
+            self.recycled += 1
+            self._discard(connection)
+        return None
+
+    def _check(self, connection, idle_for):
+        """ Count the checkout of an idle connection passing check() """
+        try:
+            usable = self.check(connection, idle_for)
+        except Exception:
+            usable = False
+        with self._condition:
+            if usable:
+                self.checkouts += 1
+                return True
+            self.failed_checks += 1
+            self._opened.pop(connection, None)
+            self._condition.notify()
+        self._close(connection)
+        return False
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._opened[connection] = time.monotonic()
+            self.created += 1
+            self.checkouts += 1
+        return connection
+
+    def release(self, connection):
+        """ Give back a checked out connection """
+        with self._condition:
+            if connection not in self._opened:
+                # opened before a reset of the pool (fork, close_all)
+                self._close(connection)
+                return
+            expired = (time.monotonic() - self._opened[connection]
+                       > self.max_age)
+        try:
+            usable = not expired and not connection.closed
+            if usable:
+                self.reset(connection)
+        except Exception:
+            usable = False
+        with self._condition:
+            if expired:
+                self.recycled += 1
+            if usable and connection in self._opened:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+            self._condition.notify()
+
+    def _discard(self, connection):
+        """ Close a connection and free its slot, under the lock """
+        self._opened.pop(connection, None)
+        self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """
+        Close the idle connections and forget the checked out ones, they
+        are closed when given back.
+        """
+        with self._condition:
+            for connection, _ in self._idle:
+                self._close(connection)
+            self._idle.clear()
+            self._opened = {}
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            size = len(self._opened) + self._opening
+            idle = len(self._idle)
+            return {
+                'pid': self.pid,
+                'max_size': self.max_size,
+                'size': size,
+                'in_use': size - idle,
+                'idle': idle,
+                'waiting': self.waiting,
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'recycled': self.recycled,
+                'failed_checks': self.failed_checks,
+                'timeouts': self.timeouts,
+                'wait_ms': self.wait_time.percentiles(50, 99),
+            }
@@ -30,6 +30,7 @@ from secret import (
     PORT_DB,
     SENTRY_DSN,
 )
+from epic_events.tracing import sample_traces
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'app_crm',
     'app_users',
     'rest_framework',
@@ -65,6 +67,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app_crm.timing.server_timing',
+    'epic_events.tracing.keep_slow_traces',
+    'app_crm.asynchronous.asgi_urlconf',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,6 +80,11 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'epic_events.urls'
+# URLconf of the ASGI server, whose CRM lists and details are async views
+ASGI_URLCONF = 'epic_events.asgi_urls'
+# threads of each ASGI worker running the CRM reads, each holding one of
+# the MAX_SIZE pooled database connections
+ASGI_READ_THREADS = 10
 
 TEMPLATES = [
     {
@@ -98,17 +108,37 @@ WSGI_APPLICATION = 'epic_events.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# The connections are checked out of a pool of each worker process and
+# given back at the end of the requests (CONN_MAX_AGE = 0): at most
+# MAX_SIZE connections, TIMEOUT seconds to wait for one, recycled after
+# MAX_AGE seconds, pinged when idle for more than PING_AFTER seconds
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'epic_events.pooled_postgresql',
         'NAME': NAME_DB,
         'USER': USERNAME_DB,
         'PASSWORD': PASSWORD_DB,
         'HOST': HOST_DB,
         'PORT': PORT_DB,
+        'POOL': {
+            'MAX_SIZE': 10,
+            'TIMEOUT': 5,
+            'MAX_AGE': 300,
+            'PING_AFTER': 30,
+        },
     }
 }
 
+# aliases of DATABASES serving the safe requests of the CRM views: read
+# replicas of 'default', left out while more than REPLICA_MAX_LAG
+# seconds behind (measured every REPLICA_CHECK_INTERVAL seconds). The
+# reads of a user go to 'default' for REPLICA_STICKY_SECONDS after their
+# own writes, keep it above the lag allowed
+DATABASE_ROUTERS = ['app_crm.replicas.ReplicaRouter']
+READ_REPLICAS = []
+REPLICA_MAX_LAG = 5
+REPLICA_CHECK_INTERVAL = 2
+REPLICA_STICKY_SECONDS = 10
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -132,6 +162,9 @@ AUTH_PASSWORD_VALIDATORS = [
 # Auth user model
 AUTH_USER_MODEL = 'app_users.User'
 
+# Password checks run on the bounded login hashing pool
+AUTHENTICATION_BACKENDS = ['app_users.backends.PooledModelBackend']
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -160,30 +193,94 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'app_users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_THROTTLE_CLASSES': (
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'app_users.throttling.AnonSlidingWindowThrottle',
+        'app_users.throttling.RoleRateThrottle'
     ),
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '500/day'
+        'user': '500/day',
+        'sales': '500/day',
+        'support': '500/day',
+        'management': '500/day',
     },
+    'DEFAULT_PAGINATION_CLASS': 'app_crm.pagination.CRMCursorPagination',
+    'PAGE_SIZE': 50,
 }
+# items accepted by a request to the bulk create endpoints of the CRM
+BULK_CREATE_MAX_ITEMS = 5000
+# rows fetched at once by the exports of the CRM
+EXPORT_CHUNK_SIZE = 2000
+# rows validated and merged at once by the imports of the CRM
+IMPORT_CHUNK_SIZE = 5000
 
 # JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
+    'TOKEN_USER_CLASS': 'app_users.authentication.RoleTokenUser',
+}
+# seconds before the active flag and the role of a token user are
+# checked again against the database
+USER_STATE_TTL = 30
+# verified access tokens kept in memory by each worker
+TOKEN_CACHE_SIZE = 10000
+# seconds between two refreshes of the revoked tokens filter of a worker
+REVOCATION_REFRESH_INTERVAL = 2
+# password hashes run at once by each worker, logins waiting for one of
+# them, the others are answered 503 right away
+LOGIN_HASH_WORKERS = 2
+LOGIN_MAX_PENDING = 16
+# seconds a login waits for its hash before giving up
+LOGIN_HASH_TIMEOUT = 10
+
+# shared store of the throttling counters, every worker of the server
+# uses the same file. To share them between servers, use
+# 'app_users.throttling.CacheCounterStore' with a Redis cache alias
+THROTTLE_STORE = {
+    'BACKEND': 'app_users.throttling.SQLiteCounterStore',
+    'OPTIONS': {'path': BASE_DIR / 'throttle.sqlite3'},
+}
+
+# traces sent to sentry: rate of each endpoint (URL name) or
+# DEFAULT_RATE, times the weight of the role of the user, lowered to
+# send at most MAX_PER_SECOND traces of an endpoint per second and
+# worker. The requests answered with a 5xx or slower than
+# TRACES_SLOW_REQUEST_MS are traced anyway
+TRACES_SAMPLER = {
+    'DEFAULT_RATE': 0.1,
+    'ENDPOINT_RATES': {
+        'app_users:login': 0.01,
+        'app_users:refresh': 0.01,
+    },
+    'ROLE_WEIGHTS': {},
+    'MAX_PER_SECOND': 1,
+}
+TRACES_SLOW_REQUEST_MS = 1000
+
+# the durations of each request are sent in its Server-Timing header,
+# and logged as JSON by the app_crm.timing logger when it lasts at
+# least SERVER_TIMING_LOG_MS (None: never)
+SERVER_TIMING_LOG_MS = None
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'app_crm.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
 }
 
 # logging
 sentry_sdk.init(
     dsn=SENTRY_DSN,
     integrations=[DjangoIntegration()],
-    traces_sample_rate=1.0,
+    traces_sampler=sample_traces,
     send_default_pii=True
 )
@@ -0,0 +1,89 @@
+# epic_events/streaming.py
+# created 19/10/2026 at 20:40 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 20:40 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/streaming.py:
+    - streaming responses whose body is an async iterator
+    - ASGI handler sending them, Django 4.0 iterates the streaming
+      responses synchronously, in the event loop
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+
+# third party imports
+from asgiref.sync import sync_to_async
+
+# django imports
+from django.core.handlers import asgi
+from django.http import StreamingHttpResponse
+
+# local application imports
+
+# other imports & constants
+
+
+class AsyncStreamingResponse(StreamingHttpResponse):
+    """
+    Streaming response whose body is `parts`, an async generator of
+    bytes. Only ASGIHandler sends it.
+    """
+
+    def __init__(self, parts, *args, **kwargs):
+        super().__init__((), *args, **kwargs)
+        self.parts = parts
+
+    def __iter__(self):
+        raise TypeError('AsyncStreamingResponse is sent by '
+                        'epic_events.streaming.ASGIHandler only')
+
+
+def response_headers(response):
+    """ Headers and cookies of `response`, as ASGI sends them """
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode('ascii')
+        if isinstance(value, str):
+            value = value.encode('latin1')
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+    return headers
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    ASGI handler of Django, sending the body of an AsyncStreamingResponse
+    part by part as its async generator yields it.
+    """
+
+    async def send_response(self, response, send):
+        if not isinstance(response, AsyncStreamingResponse):
+            return await super().send_response(response, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers(response),
+        })
+        try:
+            async for part in response.parts:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await response.parts.aclose()
+            await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,204 @@
+# epic_events/tracing.py
+# created 19/10/2026 at 02:30 by Antoine 'AatroXiss' BEAUDESSON
+# last modified 19/10/2026 at 02:30 by Antoine 'AatroXiss' BEAUDESSON
+
+""" epic_events/tracing.py:
+    - traces sampler of sentry_sdk.init, by endpoint and role and
+      adapted to the request rate of each endpoint
+    - middleware keeping the traces of the slow and failed requests
+"""
+
+__author__ = "Antoine 'AatroXiss' BEAUDESSON"
+__copyright__ = "Copyright 2021, Antoine 'AatroXiss' BEAUDESSON"
+__credits__ = ["Antoine 'AatroXiss' BEAUDESSON"]
+__license__ = ""
+__version__ = "0.1.0"
+__maintainer__ = "Antoine 'AatroXiss' BEAUDESSON"
+__email__ = "antoine.beaudesson@gmail.com"
+__status__ = "Development"
+
+# standard library imports
+import asyncio
+import base64
+import binascii
+import json
+import threading
+import time
+from functools import lru_cache
+
+# third party imports
+import sentry_sdk
+
+# django imports
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils.decorators import sync_and_async_middleware
+
+# local application imports
+
+# other imports & constants
+# spans kept by a transaction, as sentry_sdk.Hub.start_transaction does
+MAX_SPANS = 1000
+
+
+class RateMeter:
+    """
+    Requests per second of each key, over a sliding window of `window`
+    seconds: the count of the current window plus the share of the
+    previous one the sliding window still covers.
+    """
+
+    def __init__(self, window=10):
+        self.window = window
+        # key -> [index of the current window, current, previous]
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, now=None):
+        """ Count a request of `key`, return the rate of `key` """
+        now = time.monotonic() if now is None else now
+        index = int(now // self.window)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None or counts[0] < index - 1:
+                counts = self._counts[key] = [index, 0, 0]
+            elif counts[0] == index - 1:
+                counts[:] = [index, 0, counts[1]]
+            counts[1] += 1
+            current, previous = counts[1], counts[2]
+        weight = 1 - (now - index * self.window) / self.window
+        return (current + previous * weight) / self.window
+
+
+@lru_cache(maxsize=4096)
+def endpoint(path):
+    """ Name of the URL pattern of `path`, e.g. app_crm:customers-list """
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        return None
+
+
+def token_role(authorization):
+    """
+    The role claim of a bearer token, read without checking the
+    signature: it only chooses a sample rate.
+    """
+    if not authorization.startswith('Bearer '):
+        return None
+    try:
+        payload = authorization[7:].split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(
+            payload + '=' * (-len(payload) % 4)))
+    except (IndexError, ValueError, binascii.Error):
+        return None
+    return claims.get('role') if isinstance(claims, dict) else None
+
+
+def request_of(sampling_context):
+    """ The (path, Authorization header) of a WSGI or ASGI request """
+    environ = sampling_context.get('wsgi_environ')
+    if environ is not None:
+        return (environ.get('PATH_INFO', ''),
+                environ.get('HTTP_AUTHORIZATION', ''))
+    scope = sampling_context.get('asgi_scope')
+    if scope is not None:
+        headers = dict(scope.get('headers', ()))
+        return (scope.get('path', ''),
+                headers.get(b'authorization', b'').decode('latin1'))
+    return None, ''
+
+
+class TracesSampler:
+    """
+    traces_sampler of sentry_sdk.init.
+
+    A request is sampled at the rate of its endpoint (`endpoint_rates`,
+    by URL name, `default_rate` for the others) times the weight of the
+    role of its token (`role_weights`, 1 by default). The rate is then
+    lowered so each endpoint sends at most `max_per_second` traces per
+    second from each worker, whatever its traffic. The decision of the
+    parent trace of a distributed request is kept. The slow and failed
+    requests are traced anyway (see keep_slow_traces).
+    """
+
+    def __init__(self, default_rate=0.1, endpoint_rates=None,
+                 role_weights=None, max_per_second=1, window=10):
+        self.default_rate = default_rate
+        self.endpoint_rates = endpoint_rates or {}
+        self.role_weights = role_weights or {}
+        self.max_per_second = max_per_second
+        self.meter = RateMeter(window)
+
+    def rate(self, name, role):
+        rate = (self.endpoint_rates.get(name, self.default_rate)
+                * self.role_weights.get(role, 1))
+        requests_per_second = self.meter.hit(name)
+        return min(rate, self.max_per_second / requests_per_second, 1)
+
+    def __call__(self, sampling_context):
+        if sampling_context.get('parent_sampled') is not None:
+            return sampling_context['parent_sampled']
+        path, authorization = request_of(sampling_context)
+        if path is None:
+            return self.default_rate
+        return self.rate(endpoint(path), token_role(authorization))
+
+
+def keep(transaction, reason):
+    """ Send an unsampled `transaction`, with its root span only """
+    if transaction is None or transaction.sampled:
+        return
+    transaction.sampled = True
+    transaction.init_span_recorder(maxlen=MAX_SPANS)
+    transaction.set_tag('kept', reason)
+
+
+def check_response(start, response, slow_ms):
+    reason = None
+    if response.status_code >= 500:
+        reason = 'error'
+    elif (time.perf_counter() - start) * 1000 >= slow_ms:
+        reason = 'slow'
+    if reason is not None:
+        keep(sentry_sdk.Hub.current.scope.transaction, reason)
+
+
+@sync_and_async_middleware
+def keep_slow_traces(get_response):
+    """
+    Trace the requests answered with a 5xx or slower than
+    TRACES_SLOW_REQUEST_MS, even when their transaction was not
+    sampled. Their spans were not recorded, the root one is sent with
+    its duration and a `kept` tag.
+    """
+    slow_ms = getattr(settings, 'TRACES_SLOW_REQUEST_MS', 1000)
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            start = time.perf_counter()
+            response = await get_response(request)
+            check_response(start, response, slow_ms)
+            return response
+    else:
+        def middleware(request):
+            start = time.perf_counter()
+            response = get_response(request)
+            check_response(start, response, slow_ms)
+            return response
+    return middleware
+
+
+@lru_cache(maxsize=None)
+def get_sampler():
+    """ The TracesSampler set by the TRACES_SAMPLER setting """
+    return TracesSampler(**{
+        name.lower(): value
+        for name, value in getattr(settings, 'TRACES_SAMPLER', {}).items()})
+
+
+def sample_traces(sampling_context):
+    """
+    traces_sampler of sentry_sdk.init, set up in the settings: the
+    sampler is built from them on the first request.
+    """
+    return get_sampler()(sampling_context)